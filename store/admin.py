@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Project, BlogPost, ContactMessage, Order, ProjectImage, OrderReview,Profile
+from django.utils import timezone
+from .models import Project, BlogPost, ContactMessage, Order, ProjectImage, OrderReview,Profile, Job, ScheduledJob, OrderEvent, ChunkedUpload, DailySales
+from . import analytics, orders
 
 
 class ProjectImageInline(admin.TabularInline):
@@ -20,16 +22,20 @@ class OrderReviewAdmin(admin.ModelAdmin):
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
-    list_display = ('title', 'category', 'level', 'price', 'is_active', 'is_featured', 'created_at')
+    list_display = ('title', 'category', 'level', 'price', 'is_active', 'is_featured', 'view_count', 'created_at')
     list_filter = ('category', 'level', 'is_active', 'is_featured', 'created_at')
     search_fields = ('title', 'short_description', 'description', 'tech_stack', 'slug')
+    # counters kept by store/signals.py / store/hits.py: shown, never written by the form
+    readonly_fields = ('rating_sum', 'rating_count', 'orders_completed', 'view_count')
     inlines = [ProjectImageInline]
+    # adds the resumable deliverable upload (store/uploads.py)
+    change_form_template = 'admin/store/project/change_form.html'
 
 
 @admin.register(BlogPost)
 class BlogPostAdmin(admin.ModelAdmin):
-    list_display = ('title', 'is_published', 'created_at')
-    list_filter = ('is_published', 'created_at')
+    list_display = ('title', 'is_published', 'content_format', 'view_count', 'created_at')
+    list_filter = ('is_published', 'content_format', 'created_at')
     search_fields = ('title', 'content')
 
 
@@ -44,8 +50,101 @@ class OrderAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'project', 'status', 'created_at')
     list_filter = ('status', 'created_at')
     search_fields = ('user__username', 'project__title')
+    actions = ['mark_contacted', 'mark_completed', 'mark_cancelled']
+
+    def save_model(self, request, obj, form, change):
+        # recorded on the OrderEvent written by store/signals.py
+        obj._status_actor = request.user
+        super().save_model(request, obj, form, change)
+
+    def _set_status(self, request, queryset, status):
+        # one batch for the whole selection (store/orders.py)
+        moved, skipped = orders.bulk_set_status(queryset, status, actor=request.user)
+        message = f"{moved} order(s) marked {status}."
+        if skipped:
+            message += f" {skipped} skipped (status doesn't allow it)."
+        self.message_user(request, message)
+
+    @admin.action(description="Mark selected orders as contacted")
+    def mark_contacted(self, request, queryset):
+        self._set_status(request, queryset, "contacted")
+
+    @admin.action(description="Mark selected orders as completed")
+    def mark_completed(self, request, queryset):
+        self._set_status(request, queryset, "completed")
+
+    @admin.action(description="Cancel selected orders")
+    def mark_cancelled(self, request, queryset):
+        self._set_status(request, queryset, "cancelled")
 
 
 @admin.register(ProjectImage)
 class ProjectImageAdmin(admin.ModelAdmin):
     list_display = ('project', 'caption')
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task', 'status', 'priority', 'attempts', 'run_at', 'created_at')
+    list_filter = ('status', 'task')
+    search_fields = ('task', 'idempotency_key', 'last_error')
+    actions = ['retry_jobs']
+
+    @admin.action(description="Retry selected jobs now")
+    def retry_jobs(self, request, queryset):
+        updated = queryset.exclude(status=Job.STATUS_RUNNING).update(
+            status=Job.STATUS_QUEUED, run_at=timezone.now(), attempts=0, last_error='',
+        )
+        self.message_user(request, f"{updated} job(s) queued again.")
+
+
+@admin.register(ScheduledJob)
+class ScheduledJobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'task', 'interval_seconds', 'next_run_at', 'is_active')
+    list_filter = ('is_active',)
+
+
+@admin.register(OrderEvent)
+class OrderEventAdmin(admin.ModelAdmin):
+    list_display = ('order', 'from_status', 'to_status', 'actor', 'created_at')
+    list_filter = ('to_status', 'created_at')
+    search_fields = ('order__id', 'user__username')
+    raw_id_fields = ('order', 'user', 'actor')
+
+
+@admin.register(ChunkedUpload)
+class ChunkedUploadAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'project', 'progress', 'created_by', 'created_at', 'updated_at', 'completed_at')
+    list_filter = ('completed_at', 'created_at')
+    search_fields = ('filename', 'project__title')
+    readonly_fields = ('id', 'project', 'created_by', 'filename', 'length', 'offset', 'sha256', 'created_at', 'completed_at')
+
+    @admin.display(description='Progress')
+    def progress(self, obj):
+        return f"{obj.offset * 100 // obj.length}%" if obj.length else "-"
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(admin.ModelAdmin):
+    """Sales dashboard: reads only the rollups (store/analytics.py), never Order."""
+    list_display = ('day', 'category', 'level', 'orders', 'completed', 'cancelled', 'revenue', 'views', 'cart_adds')
+    list_filter = ('category', 'level')
+    date_hierarchy = 'day'
+    change_list_template = 'admin/store/dailysales/change_list.html'
+    SUMMARY_DAYS = 30
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = dict(extra_context or {}, summary=analytics.summary(self.SUMMARY_DAYS))
+        return super().changelist_view(request, extra_context)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
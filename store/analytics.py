@@ -0,0 +1,154 @@
+# store/analytics.py
+"""
+Sales rollups for the admin dashboard (DailySales: one row per day,
+category and level).
+
+refresh() recomputes only the days that have orders created or changed
+since the last run (Order.updated_at > AnalyticsState.orders_through),
+a few days per transaction, so the GROUP BY over Order + Project runs
+on a handful of days instead of the whole table on every page load.
+Detail-page views and cart adds are counted by store/hits.py into the
+same rows, which gives views -> orders and cart -> orders conversion
+without joining anything (the cart only lives in the session).
+
+Revenue sums Order.price, the price when the order was placed, so
+repricing a project never rewrites past days (orders older than that
+field carry the project's price at migration time).
+
+Days are local dates (TIME_ZONE). Deleting an order doesn't touch
+updated_at; `refresh_sales_rollups --full` picks deletions up.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import AnalyticsState, DailySales, Order, Project
+
+# orders saved in a transaction that started before the last run may
+# commit with an older updated_at: look back a little (re-doing a day
+# is harmless)
+OVERLAP = timedelta(minutes=5)
+DAYS_PER_BATCH = 31
+ORDER_FIELDS = ["orders", "completed", "cancelled", "revenue"]
+
+
+def changed_days(since=None):
+    orders = Order.objects.all()
+    if since is not None:
+        orders = orders.filter(updated_at__gte=since - OVERLAP)
+    return set(
+        orders.annotate(day=TruncDate("created_at"))
+        .values_list("day", flat=True)
+        .distinct()
+    )
+
+
+def rollup_rows(days):
+    rows = (
+        Order.objects.filter(created_at__date__in=days)
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "project__category", "project__level")
+        .annotate(
+            orders=Count("id"),
+            completed=Count("id", filter=Q(status="completed")),
+            cancelled=Count("id", filter=Q(status="cancelled")),
+            revenue=Sum("price", filter=Q(status="completed"), default=0),
+        )
+        .order_by()
+    )
+    return [
+        DailySales(
+            day=row["day"],
+            category=row["project__category"],
+            level=row["project__level"],
+            orders=row["orders"],
+            completed=row["completed"],
+            cancelled=row["cancelled"],
+            revenue=row["revenue"],
+        )
+        for row in rows
+    ]
+
+
+def refresh(full=False):
+    """Bring DailySales up to date with Order; returns the number of days redone."""
+    state = AnalyticsState.load()
+    started = timezone.now()
+    if full:
+        days = changed_days() | set(
+            DailySales.objects.filter(orders__gt=0).values_list("day", flat=True)
+        )
+    else:
+        days = changed_days(state.orders_through)
+
+    days = sorted(days)
+    for i in range(0, len(days), DAYS_PER_BATCH):
+        batch = days[i:i + DAYS_PER_BATCH]
+        with transaction.atomic():
+            # days/groups that lost all their orders drop back to 0
+            DailySales.objects.filter(day__in=batch).update(**{name: 0 for name in ORDER_FIELDS})
+            DailySales.objects.bulk_create(
+                rollup_rows(batch),
+                update_conflicts=True,
+                unique_fields=["day", "category", "level"],
+                update_fields=ORDER_FIELDS,
+            )
+
+    state.orders_through = started
+    state.save(update_fields=["orders_through"])
+    return len(days)
+
+
+def add_counts(counts, field):
+    """Add {project pk: n} to `field` ("views" / "cart_adds") of today's rows (hits.flush)."""
+    groups = {}
+    for pk, category, level in Project.objects.filter(pk__in=counts).values_list("pk", "category", "level"):
+        groups[category, level] = groups.get((category, level), 0) + counts[pk]
+
+    day = timezone.localdate()
+    for (category, level), n in groups.items():
+        row, _ = DailySales.objects.get_or_create(day=day, category=category, level=level)
+        DailySales.objects.filter(pk=row.pk).update(**{field: F(field) + n})
+
+
+# ---- DASHBOARD ----
+
+
+def _rate(part, whole):
+    return f"{part * 100 / whole:.1f}%" if whole else "-"
+
+
+def _with_rates(row):
+    row["conversion"] = _rate(row["orders"], row["views"])
+    row["cart_conversion"] = _rate(row["orders"], row["cart_adds"])
+    row["cancellation"] = _rate(row["cancelled"], row["orders"])
+    return row
+
+
+def summary(days=30):
+    """Dashboard tables for the last `days` days, from DailySales only."""
+    since = timezone.localdate() - timedelta(days=days - 1)
+    rows = DailySales.objects.filter(day__gte=since).order_by()
+    totals = {
+        "orders": Sum("orders"),
+        "completed": Sum("completed"),
+        "cancelled": Sum("cancelled"),
+        "revenue": Sum("revenue"),
+        "views": Sum("views"),
+        "cart_adds": Sum("cart_adds"),
+    }
+    return {
+        "days": days,
+        "since": since,
+        "total": _with_rates(
+            {name: value or 0 for name, value in rows.aggregate(**totals).items()}
+        ),
+        "per_day": [_with_rates(r) for r in rows.values("day").annotate(**totals).order_by("-day")],
+        "per_category": [
+            _with_rates(r) for r in rows.values("category").annotate(**totals).order_by("-revenue")
+        ],
+        "per_level": [_with_rates(r) for r in rows.values("level").annotate(**totals).order_by("-revenue")],
+    }
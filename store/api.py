@@ -0,0 +1,287 @@
+# store/api.py
+"""
+Read-only JSON API (v1) for projects, blog posts and the user's orders.
+
+- sparse fieldsets:   ?fields=id,title,slug   (only those columns are loaded)
+- cursor pagination:  ?limit=20&cursor=<opaque>  -> "next" link in the body
+- weak ETags built from the catalog / orders version counters, so a client
+  sending If-None-Match gets a 304 before any catalog query runs.
+"""
+import base64
+import hashlib
+from functools import wraps
+
+from django.db.models import Q
+from django.http import HttpResponseNotModified, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+
+from .catalog import get_catalog_version, get_orders_version
+from .models import BlogPost, Order, Project
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+# -------------------------------------------------------------------
+# FIELD MAPS: api name -> (model columns needed, value getter)
+# -------------------------------------------------------------------
+def _file_url(f):
+    return f.url if f else None
+
+
+PROJECT_FIELDS = {
+    "id": (["id"], lambda p: p.id),
+    "slug": (["slug"], lambda p: p.slug),
+    "title": (["title"], lambda p: p.title),
+    "short_description": (["short_description"], lambda p: p.short_description),
+    "description": (["description"], lambda p: p.description),
+    "description_html": (["description_html"], lambda p: p.description_html),
+    "excerpt": (["excerpt"], lambda p: p.excerpt),
+    "tech_stack": (["tech_stack"], lambda p: p.tech_stack),
+    "category": (["category"], lambda p: p.category),
+    "level": (["level"], lambda p: p.level),
+    "duration_weeks": (["duration_weeks"], lambda p: p.duration_weeks),
+    "price": (["price"], lambda p: str(p.price)),
+    "thumbnail": (["thumbnail"], lambda p: _file_url(p.thumbnail)),
+    "rating_average": (["rating_sum", "rating_count"], lambda p: p.rating_average),
+    "rating_count": (["rating_count"], lambda p: p.rating_count),
+    "created_at": (["created_at"], lambda p: p.created_at.isoformat()),
+    "updated_at": (["updated_at"], lambda p: p.updated_at.isoformat()),
+    "url": (["slug"], lambda p: reverse("store:project_detail", args=[p.slug])),
+}
+PROJECT_LIST_DEFAULT = [
+    "id", "slug", "title", "short_description", "tech_stack", "category",
+    "level", "price", "thumbnail", "rating_average", "url",
+]
+
+POST_FIELDS = {
+    "id": (["id"], lambda p: p.id),
+    "slug": (["slug"], lambda p: p.slug),
+    "title": (["title"], lambda p: p.title),
+    "content": (["content"], lambda p: p.content),
+    "content_html": (["content_html"], lambda p: p.content_html),
+    "excerpt": (["excerpt"], lambda p: p.excerpt),
+    "reading_time": (["reading_time"], lambda p: p.reading_time),
+    "image": (["image"], lambda p: _file_url(p.image)),
+    "created_at": (["created_at"], lambda p: p.created_at.isoformat()),
+    "updated_at": (["updated_at"], lambda p: p.updated_at.isoformat()),
+    "url": (["id"], lambda p: reverse("store:blog_detail", args=[p.pk])),
+}
+POST_LIST_DEFAULT = ["id", "slug", "title", "excerpt", "reading_time", "image", "created_at", "url"]
+
+ORDER_FIELDS = {
+    "id": (["id"], lambda o: o.id),
+    "status": (["status"], lambda o: o.status),
+    "notes": (["notes"], lambda o: o.notes),
+    "created_at": (["created_at"], lambda o: o.created_at.isoformat()),
+    "project": (
+        ["project", "project__slug", "project__title"],
+        lambda o: {"slug": o.project.slug, "title": o.project.title},
+    ),
+    "url": (["id"], lambda o: reverse("store:order_detail", args=[o.id])),
+}
+ORDER_LIST_DEFAULT = list(ORDER_FIELDS)
+
+
+def error(message, status):
+    return JsonResponse({"error": message}, status=status)
+
+
+def selected_fields(request, field_map, default):
+    """Fields requested with ?fields=a,b (unknown names are ignored)."""
+    raw = request.GET.get("fields")
+    if not raw:
+        return default
+    fields = [f for f in (x.strip() for x in raw.split(",")) if f in field_map]
+    return fields or default
+
+
+def columns_for(field_map, fields):
+    # created_at / id are always needed for the cursor
+    columns = {"id", "created_at"}
+    for name in fields:
+        columns.update(field_map[name][0])
+    return sorted(columns)
+
+
+def serialize(obj, field_map, fields):
+    return {name: field_map[name][1](obj) for name in fields}
+
+
+# -------------------------------------------------------------------
+# CURSOR PAGINATION over (-created_at, -id)
+# -------------------------------------------------------------------
+def encode_cursor(obj):
+    raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.rsplit("|", 1)
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            return None
+        return created_at, int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def paginate(request, queryset, field_map, fields):
+    try:
+        limit = min(max(int(request.GET.get("limit", DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        return error("invalid limit", 400)
+
+    cursor = request.GET.get("cursor")
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            return error("invalid cursor", 400)
+        created_at, pk = position
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+        )
+
+    rows = list(queryset.order_by("-created_at", "-pk")[: limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_url = None
+    if has_more:
+        params = request.GET.copy()
+        params["cursor"] = encode_cursor(rows[-1])
+        next_url = f"{request.path}?{params.urlencode()}"
+
+    return JsonResponse({
+        "results": [serialize(obj, field_map, fields) for obj in rows],
+        "next": next_url,
+    })
+
+
+# -------------------------------------------------------------------
+# CONDITIONAL GET
+# -------------------------------------------------------------------
+def weak_etag(*parts):
+    digest = hashlib.md5("|".join(str(p) for p in parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request, etag):
+    header = request.headers.get("If-None-Match", "")
+    if header.strip() == "*":
+        return True
+    # weak comparison: ignore the W/ prefix on both sides
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def versioned(get_version, private=False):
+    """
+    GET/HEAD only. The ETag is derived from `get_version(request)` plus the
+    full path, so a matching If-None-Match is answered with 304 without
+    running the view. `get_version` may return None to skip the check.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return error("method not allowed", 405)
+
+            version = get_version(request)
+            etag = weak_etag("v1", version, request.get_full_path()) if version else None
+            cache_control = "private, no-cache" if private else "public, no-cache"
+
+            if etag and etag_matches(request, etag):
+                response = HttpResponseNotModified()
+            else:
+                response = view(request, *args, **kwargs)
+
+            if etag and response.status_code in (200, 304):
+                response["ETag"] = etag
+                response["Cache-Control"] = cache_control
+                if private:
+                    response["Vary"] = "Cookie"
+            return response
+        return wrapper
+    return decorator
+
+
+def catalog_version(request):
+    return f"catalog-{get_catalog_version()}"
+
+
+def user_orders_version(request):
+    if not request.user.is_authenticated:
+        return None
+    # project titles are embedded in orders, so the catalog version counts too
+    return (
+        f"orders-{request.user.pk}-{get_orders_version(request.user.pk)}"
+        f"-catalog-{get_catalog_version()}"
+    )
+
+
+# -------------------------------------------------------------------
+# ENDPOINTS
+# -------------------------------------------------------------------
+@versioned(catalog_version)
+def project_list(request):
+    fields = selected_fields(request, PROJECT_FIELDS, PROJECT_LIST_DEFAULT)
+    projects = Project.objects.filter(is_active=True)
+
+    category = request.GET.get("category", "").strip()
+    level = request.GET.get("level", "").strip()
+    if category:
+        projects = projects.filter(category=category)
+    if level:
+        projects = projects.filter(level=level)
+
+    projects = projects.only(*columns_for(PROJECT_FIELDS, fields))
+    return paginate(request, projects, PROJECT_FIELDS, fields)
+
+
+@versioned(catalog_version)
+def project_detail(request, slug):
+    fields = selected_fields(request, PROJECT_FIELDS, list(PROJECT_FIELDS))
+    project = get_object_or_404(
+        Project.objects.only(*columns_for(PROJECT_FIELDS, fields)),
+        slug=slug,
+        is_active=True,
+    )
+    return JsonResponse(serialize(project, PROJECT_FIELDS, fields))
+
+
+@versioned(catalog_version)
+def post_list(request):
+    fields = selected_fields(request, POST_FIELDS, POST_LIST_DEFAULT)
+    posts = BlogPost.objects.filter(is_published=True).only(
+        *columns_for(POST_FIELDS, fields)
+    )
+    return paginate(request, posts, POST_FIELDS, fields)
+
+
+@versioned(catalog_version)
+def post_detail(request, pk):
+    fields = selected_fields(request, POST_FIELDS, list(POST_FIELDS))
+    post = get_object_or_404(
+        BlogPost.objects.only(*columns_for(POST_FIELDS, fields)),
+        pk=pk,
+        is_published=True,
+    )
+    return JsonResponse(serialize(post, POST_FIELDS, fields))
+
+
+@versioned(user_orders_version, private=True)
+def order_list(request):
+    if not request.user.is_authenticated:
+        return error("authentication required", 401)
+
+    fields = selected_fields(request, ORDER_FIELDS, ORDER_LIST_DEFAULT)
+    orders = Order.objects.filter(user=request.user)
+    if "project" in fields:
+        orders = orders.select_related("project")
+    orders = orders.only(*columns_for(ORDER_FIELDS, fields))
+    return paginate(request, orders, ORDER_FIELDS, fields)
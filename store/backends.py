@@ -0,0 +1,55 @@
+# store/backends.py
+"""
+Authentication backend for the login page.
+
+Same as ModelBackend, but when the password is right and the account is
+inactive (email not verified yet) it flags the request, so user_login can
+show the right message without looking the user up a second time.
+
+get_user() (run once per request by AuthenticationMiddleware) joins the
+profile, so request.user.profile costs no extra query.
+
+ModelBackend stays in AUTHENTICATION_BACKENDS after this one: sessions
+store the path of the backend that logged them in, and Django logs out
+any session whose backend is no longer listed. A username/password login
+this backend rejected raises PermissionDenied, so ModelBackend does not
+look the user up and hash the password a second time.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+
+UserModel = get_user_model()
+
+
+class LoginBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # hash anyway so unknown usernames take as long as wrong passwords
+            UserModel().set_password(password)
+            raise PermissionDenied
+
+        # check_password re-hashes with the preferred hasher when it is outdated
+        if not user.check_password(password):
+            raise PermissionDenied
+
+        if self.user_can_authenticate(user):
+            return user
+
+        if request is not None:
+            request.login_inactive_user = True
+        raise PermissionDenied
+
+    def get_user(self, user_id):
+        try:
+            user = UserModel._default_manager.select_related("profile").get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,119 @@
+# store/catalog.py
+"""
+Version counters used to tell when cached things are stale.
+
+The catalog version is a monotonic counter stored in the CatalogState row.
+It is bumped after every Project / BlogPost save or delete commits
+(store/signals.py) and mirrored in the shared cache, so readers almost
+never touch the database. The bump is its own short autocommit UPDATE:
+done inside the writer's transaction, the row lock on the single
+CatalogState row would serialize every catalog write until commit. Each
+user's order version is a cache counter; without a shared cache it is
+derived from the user's Order rows instead, since another worker's bump
+would never reach this process's LocMemCache.
+
+Use catalog_freshness_key() / freshness_key(obj) wherever a cheap
+"has anything changed?" key is needed (ETags, template fragment caches,
+per-process indexes).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from .models import CatalogState, Order
+
+CATALOG_STATE_KEY = "catalog:state"
+# bounds how long a reader racing with a bump can keep an old value
+CATALOG_STATE_TTL = 60
+
+
+def shared_cache():
+    """False for the per-process LocMemCache (no Redis configured)."""
+    return not settings.CACHES["default"]["BACKEND"].endswith("LocMemCache")
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # key evicted / never set: start again above any value a reader saw
+        cache.add(key, 1, timeout=None)
+        return cache.incr(key)
+
+
+def get_catalog_state():
+    """(version, changed_at unix timestamp), from the cache when possible."""
+    state = cache.get(CATALOG_STATE_KEY)
+    if state is None:
+        row = CatalogState.load()
+        state = (row.version, int(row.changed_at.timestamp()))
+        cache.add(CATALOG_STATE_KEY, state, timeout=CATALOG_STATE_TTL)
+    return state
+
+
+def get_catalog_version():
+    return get_catalog_state()[0]
+
+
+def catalog_last_modified():
+    """Unix timestamp of the last catalog change (save or delete)."""
+    return get_catalog_state()[1]
+
+
+def _increment_state():
+    return CatalogState.objects.filter(pk=CatalogState.SINGLETON_ID).update(
+        version=F("version") + 1,
+        changed_at=timezone.now(),
+    )
+
+
+def _commit_bump():
+    if not _increment_state():
+        CatalogState.load()
+        _increment_state()
+    cache.delete(CATALOG_STATE_KEY)
+
+
+def bump_catalog_version():
+    """
+    Increment the catalog version once the caller's transaction commits
+    (right away outside one); a rolled-back change bumps nothing.
+    """
+    transaction.on_commit(_commit_bump)
+
+
+def catalog_freshness_key():
+    return f"catalog-{get_catalog_version()}"
+
+
+def freshness_key(obj):
+    """Changes whenever `obj` (a Project / BlogPost) is saved."""
+    return f"{obj._meta.model_name}-{obj.pk}-{obj.updated_at.timestamp():.6f}"
+
+
+def orders_version_key(user_id):
+    return f"orders:version:{user_id}"
+
+
+def get_orders_version(user_id):
+    if not shared_cache():
+        # one indexed aggregate: any save moves updated_at (bulk_set_status
+        # sets it by hand), any delete moves the count
+        state = Order.objects.filter(user_id=user_id).aggregate(n=Count("id"), last=Max("updated_at"))
+        last = state["last"].timestamp() if state["last"] else 0
+        return f"{state['n']}.{last:.6f}"
+    return get_version(orders_version_key(user_id))
+
+
+def bump_orders_version(user_id):
+    return bump_version(orders_version_key(user_id))
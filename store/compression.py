@@ -0,0 +1,137 @@
+# store/compression.py
+"""
+Dynamic response compression for HTML / JSON (static files are already
+pre-compressed by WhiteNoise).
+
+- brotli when the client accepts it and the `brotli` package is installed,
+  gzip otherwise
+- nothing below COMPRESSION_MIN_SIZE bytes
+- streaming responses are compressed chunk by chunk
+- BREACH: pages that carry a CSRF token are only gzipped, with Django's
+  random-length gzip header padding ("Heal The Breach"), never brotli
+"""
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+from .http_cache import carries_csrf_token
+
+try:
+    import brotli
+except ImportError:  # optional: fall back to gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/xml",
+    "application/json",
+    "application/xml",
+    "application/rss+xml",
+    "application/atom+xml",
+    "application/javascript",
+)
+
+# random bytes added to the gzip header of CSRF-bearing pages
+MAX_RANDOM_BYTES = 100
+
+ACCEPT_RE = re.compile(r"\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?")
+
+
+def accepted_encodings(header):
+    encodings = set()
+    for part in header.split(","):
+        match = ACCEPT_RE.match(part)
+        if not match:
+            continue
+        coding, q = match.groups()
+        try:
+            if q is not None and float(q) == 0:
+                continue
+        except ValueError:
+            continue
+        encodings.add(coding.lower())
+    return encodings
+
+
+def brotli_compress(data):
+    return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+
+def brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+    for chunk in sequence:
+        data = compressor.process(chunk)
+        # flush per chunk so every streamed piece reaches the client promptly
+        data += compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.compress(request, response)
+
+    def choose_encoding(self, request):
+        accepted = accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if brotli is not None and "br" in accepted and not carries_csrf_token(request):
+            return "br"
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip"
+        return None
+
+    def compress(self, request, response):
+        if response.has_header("Content-Encoding") or response.status_code != 200:
+            return response
+
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                # async streams (e.g. SSE) are left alone
+                return response
+        elif len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        encoding = self.choose_encoding(request)
+        if encoding is None:
+            return response
+
+        padding = MAX_RANDOM_BYTES if carries_csrf_token(request) else None
+
+        if response.streaming:
+            if encoding == "br":
+                response.streaming_content = brotli_sequence(response.streaming_content)
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content, max_random_bytes=padding
+                )
+            del response.headers["Content-Length"]
+        else:
+            if encoding == "br":
+                compressed = brotli_compress(response.content)
+            else:
+                compressed = compress_string(response.content, max_random_bytes=padding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # a strong ETag must not survive a change of representation
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,98 @@
+# store/content.py
+"""
+Text derived from BlogPost.content / Project.description, computed once
+on save (see the models' save()) instead of on every request:
+
+- sanitized HTML (Markdown or plain text), stored with a hash of its
+  source so it is only re-rendered when the source changes
+- plain-text excerpt and reading time for list pages
+
+`python manage.py backfill_content` recomputes it for existing rows
+(e.g. after bumping RENDERER_VERSION).
+"""
+import hashlib
+import html
+import math
+import re
+
+from django.utils.html import escape, linebreaks, strip_tags
+from django.utils.text import Truncator
+
+try:
+    import markdown
+except ImportError:  # optional: Markdown sources render as plain text
+    markdown = None
+
+try:
+    import nh3
+except ImportError:  # optional: without it raw HTML in Markdown is escaped
+    nh3 = None
+
+FORMAT_PLAIN = "plain"
+FORMAT_MARKDOWN = "markdown"
+FORMAT_CHOICES = [
+    (FORMAT_PLAIN, "Plain text"),
+    (FORMAT_MARKDOWN, "Markdown"),
+]
+
+# bump to force every stored body to be re-rendered by backfill_content
+RENDERER_VERSION = 2
+
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists"]
+
+# links and images with any other scheme (javascript:, data:, ...) lose
+# their URL; relative URLs have no scheme and are kept
+SAFE_URL_SCHEMES = {"http", "https", "mailto"}
+
+EXCERPT_WORDS = 40
+WORDS_PER_MINUTE = 200
+
+_whitespace = re.compile(r"\s+")
+_url_attribute = re.compile(r'\s(?:href|src)="([^"]*)"')
+_url_scheme = re.compile(r"([a-z][a-z0-9+.\-]*):", re.IGNORECASE)
+_ignored_in_urls = re.compile(r"[\x00-\x20]")
+
+
+def source_hash(source, fmt=FORMAT_PLAIN):
+    raw = f"{RENDERER_VERSION}:{fmt}:{source or ''}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def safe_url(url):
+    # browsers decode entities and skip control characters / whitespace
+    # before they look at the scheme ("java&#9;script:" is javascript:)
+    match = _url_scheme.match(_ignored_in_urls.sub("", html.unescape(url)))
+    return match is None or match.group(1).lower() in SAFE_URL_SCHEMES
+
+
+def sanitize(fragment):
+    if nh3 is None:
+        # raw HTML was escaped before Markdown ran (render()), so only its
+        # own tags are left; their URLs still come from the author
+        return _url_attribute.sub(lambda m: m.group(0) if safe_url(m.group(1)) else "", fragment)
+    return nh3.clean(fragment, link_rel="noopener noreferrer nofollow", url_schemes=SAFE_URL_SCHEMES)
+
+
+def render(source, fmt=FORMAT_PLAIN):
+    """Source text -> safe HTML."""
+    source = source or ""
+    if fmt == FORMAT_MARKDOWN and markdown is not None:
+        if nh3 is None:
+            source = escape(source)
+        return sanitize(markdown.markdown(source, extensions=MARKDOWN_EXTENSIONS))
+    return linebreaks(source, autoescape=True)
+
+
+def plain_text(source):
+    """Text of an HTML fragment (or plain text), whitespace collapsed."""
+    return _whitespace.sub(" ", html.unescape(strip_tags(source or ""))).strip()
+
+
+def make_excerpt(source, words=EXCERPT_WORDS):
+    return Truncator(plain_text(source)).words(words)
+
+
+def reading_time(source):
+    """Whole minutes, at least 1."""
+    words = len(plain_text(source).split())
+    return max(1, math.ceil(words / WORDS_PER_MINUTE))
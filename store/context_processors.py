@@ -0,0 +1,13 @@
+# store/context_processors.py
+from django.utils.functional import SimpleLazyObject
+
+from .catalog import get_catalog_version
+
+
+def catalog(request):
+    """
+    `catalog_version` for templates, e.g. as a fragment cache key:
+        {% cache 600 latest_projects catalog_version %}
+    Lazy: costs nothing unless a template uses it.
+    """
+    return {"catalog_version": SimpleLazyObject(get_catalog_version)}
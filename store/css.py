@@ -0,0 +1,1066 @@
+# store/css.py
+"""
+Offline build of the site's utility CSS (replaces the Tailwind Play CDN).
+
+The CDN script downloaded ~100 KB of JS and compiled every page's classes
+in the browser before first paint. `python manage.py build_css` instead
+scans CONTENT for class candidates, the way Tailwind's own extractor
+does, and writes only the rules they need to OUTPUT. collectstatic
+(ManifestStaticFilesStorage) gives it a content-hashed name and
+WhiteNoise serves it with far-future cache headers.
+
+It implements the subset of Tailwind v3 the templates use: preflight,
+layout, spacing, sizing, typography, colours with /opacity modifiers,
+arbitrary values ([#hex], [10px], [minmax(0,1fr)_...]), gradients,
+shadows/rings, transforms, filters, transitions and animations, plus
+the responsive, hover/focus/..., placeholder and group-hover variants.
+Candidates it doesn't know are skipped, as Tailwind does.
+"""
+import re
+from pathlib import Path
+
+from django.conf import settings
+
+# globs relative to BASE_DIR (admin templates don't load app.css)
+CONTENT = [
+    "store/templates/*.html",
+    "store/templates/store/**/*.html",
+    "store/static/js/**/*.js",
+    "store/forms.py",
+]
+OUTPUT = "store/static/css/app.css"
+
+SCREENS = {"sm": 640, "md": 768, "lg": 1024, "xl": 1280, "2xl": 1536}
+
+# in the order Tailwind emits them
+PSEUDO_VARIANTS = {
+    "placeholder": "::placeholder",
+    "first": ":first-child",
+    "last": ":last-child",
+    "odd": ":nth-child(odd)",
+    "even": ":nth-child(even)",
+    "focus-within": ":focus-within",
+    "hover": ":hover",
+    "focus": ":focus",
+    "focus-visible": ":focus-visible",
+    "active": ":active",
+    "disabled": ":disabled",
+}
+GROUP_VARIANTS = {"group-hover": ":hover", "group-focus": ":focus"}
+VARIANT_ORDER = list(PSEUDO_VARIANTS) + list(GROUP_VARIANTS)
+
+# ---- THEME (Tailwind v3 defaults) ----
+
+COLORS = {
+    "slate": ["#f8fafc", "#f1f5f9", "#e2e8f0", "#cbd5e1", "#94a3b8", "#64748b",
+              "#475569", "#334155", "#1e293b", "#0f172a", "#020617"],
+    "gray": ["#f9fafb", "#f3f4f6", "#e5e7eb", "#d1d5db", "#9ca3af", "#6b7280",
+             "#4b5563", "#374151", "#1f2937", "#111827", "#030712"],
+    "red": ["#fef2f2", "#fee2e2", "#fecaca", "#fca5a5", "#f87171", "#ef4444",
+            "#dc2626", "#b91c1c", "#991b1b", "#7f1d1d", "#450a0a"],
+    "amber": ["#fffbeb", "#fef3c7", "#fde68a", "#fcd34d", "#fbbf24", "#f59e0b",
+              "#d97706", "#b45309", "#92400e", "#78350f", "#451a03"],
+    "yellow": ["#fefce8", "#fef9c3", "#fef08a", "#fde047", "#facc15", "#eab308",
+               "#ca8a04", "#a16207", "#854d0e", "#713f12", "#422006"],
+    "green": ["#f0fdf4", "#dcfce7", "#bbf7d0", "#86efac", "#4ade80", "#22c55e",
+              "#16a34a", "#15803d", "#166534", "#14532d", "#052e16"],
+    "emerald": ["#ecfdf5", "#d1fae5", "#a7f3d0", "#6ee7b7", "#34d399", "#10b981",
+                "#059669", "#047857", "#065f46", "#064e3b", "#022c22"],
+    "cyan": ["#ecfeff", "#cffafe", "#a5f3fc", "#67e8f9", "#22d3ee", "#06b6d4",
+             "#0891b2", "#0e7490", "#155e75", "#164e63", "#083344"],
+    "sky": ["#f0f9ff", "#e0f2fe", "#bae6fd", "#7dd3fc", "#38bdf8", "#0ea5e9",
+            "#0284c7", "#0369a1", "#075985", "#0c4a6e", "#082f49"],
+    "blue": ["#eff6ff", "#dbeafe", "#bfdbfe", "#93c5fd", "#60a5fa", "#3b82f6",
+             "#2563eb", "#1d4ed8", "#1e40af", "#1e3a8a", "#172554"],
+    "indigo": ["#eef2ff", "#e0e7ff", "#c7d2fe", "#a5b4fc", "#818cf8", "#6366f1",
+               "#4f46e5", "#4338ca", "#3730a3", "#312e81", "#1e1b4b"],
+    "violet": ["#f5f3ff", "#ede9fe", "#ddd6fe", "#c4b5fd", "#a78bfa", "#8b5cf6",
+               "#7c3aed", "#6d28d9", "#5b21b6", "#4c1d95", "#2e1065"],
+    "rose": ["#fff1f2", "#ffe4e6", "#fecdd3", "#fda4af", "#fb7185", "#f43f5e",
+             "#e11d48", "#be123c", "#9f1239", "#881337", "#4c0519"],
+}
+SHADES = ["50", "100", "200", "300", "400", "500", "600", "700", "800", "900", "950"]
+NAMED_COLORS = {
+    "white": "#ffffff",
+    "black": "#000000",
+    "transparent": "transparent",
+    "current": "currentColor",
+    "inherit": "inherit",
+}
+
+SPACING = {"px": "1px", "0": "0px"}
+for _n in ["0.5", "1", "1.5", "2", "2.5", "3", "3.5"] + [
+    str(n) for n in [4, 5, 6, 7, 8, 9, 10, 11, 12, 14, 16, 20, 24, 28, 32, 36,
+                     40, 44, 48, 52, 56, 60, 64, 72, 80, 96]
+]:
+    SPACING[_n] = f"{float(_n) / 4:g}rem"
+
+FONT_SIZES = {
+    "xs": ("0.75rem", "1rem"),
+    "sm": ("0.875rem", "1.25rem"),
+    "base": ("1rem", "1.5rem"),
+    "lg": ("1.125rem", "1.75rem"),
+    "xl": ("1.25rem", "1.75rem"),
+    "2xl": ("1.5rem", "2rem"),
+    "3xl": ("1.875rem", "2.25rem"),
+    "4xl": ("2.25rem", "2.5rem"),
+    "5xl": ("3rem", "1"),
+    "6xl": ("3.75rem", "1"),
+    "7xl": ("4.5rem", "1"),
+}
+FONT_WEIGHTS = {
+    "thin": "100", "extralight": "200", "light": "300", "normal": "400",
+    "medium": "500", "semibold": "600", "bold": "700", "extrabold": "800",
+    "black": "900",
+}
+LEADING = {
+    "none": "1", "tight": "1.25", "snug": "1.375", "normal": "1.5",
+    "relaxed": "1.625", "loose": "2",
+}
+TRACKING = {
+    "tighter": "-0.05em", "tight": "-0.025em", "normal": "0em",
+    "wide": "0.025em", "wider": "0.05em", "widest": "0.1em",
+}
+MAX_WIDTHS = {
+    "none": "none", "xs": "20rem", "sm": "24rem", "md": "28rem", "lg": "32rem",
+    "xl": "36rem", "2xl": "42rem", "3xl": "48rem", "4xl": "56rem",
+    "5xl": "64rem", "6xl": "72rem", "7xl": "80rem", "full": "100%",
+    "prose": "65ch",
+}
+RADII = {
+    "none": "0px", "sm": "0.125rem", "": "0.25rem", "md": "0.375rem",
+    "lg": "0.5rem", "xl": "0.75rem", "2xl": "1rem", "3xl": "1.5rem",
+    "full": "9999px",
+}
+SHADOWS = {
+    "sm": "0 1px 2px 0 rgb(0 0 0 / 0.05)",
+    "": "0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)",
+    "md": "0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)",
+    "lg": "0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)",
+    "xl": "0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)",
+    "2xl": "0 25px 50px -12px rgb(0 0 0 / 0.25)",
+    "inner": "inset 0 2px 4px 0 rgb(0 0 0 / 0.05)",
+    "none": "0 0 #0000",
+}
+BLURS = {
+    "none": "0", "sm": "4px", "": "8px", "md": "12px", "lg": "16px",
+    "xl": "24px", "2xl": "40px", "3xl": "64px",
+}
+EASE = "cubic-bezier(0.4, 0, 0.2, 1)"
+TRANSITIONS = {
+    "": "color, background-color, border-color, text-decoration-color, fill, "
+        "stroke, opacity, box-shadow, transform, filter, backdrop-filter",
+    "all": "all",
+    "colors": "color, background-color, border-color, text-decoration-color, fill, stroke",
+    "opacity": "opacity",
+    "shadow": "box-shadow",
+    "transform": "transform",
+}
+KEYFRAMES = {
+    "spin": "@keyframes spin{to{transform:rotate(360deg)}}",
+    "ping": "@keyframes ping{75%,100%{transform:scale(2);opacity:0}}",
+    "pulse": "@keyframes pulse{50%{opacity:.5}}",
+    "bounce": (
+        "@keyframes bounce{0%,100%{transform:translateY(-25%);"
+        "animation-timing-function:cubic-bezier(0.8,0,1,1)}"
+        "50%{transform:none;animation-timing-function:cubic-bezier(0,0,0.2,1)}}"
+    ),
+}
+ANIMATIONS = {
+    "none": "none",
+    "spin": "spin 1s linear infinite",
+    "ping": "ping 1s cubic-bezier(0, 0, 0.2, 1) infinite",
+    "pulse": "pulse 2s cubic-bezier(0.4, 0, 0.6, 1) infinite",
+    "bounce": "bounce 1s infinite",
+}
+
+PREFLIGHT = """\
+*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb;\
+--tw-translate-x:0;--tw-translate-y:0;--tw-rotate:0;--tw-scale-x:1;--tw-scale-y:1;\
+--tw-ring-offset-shadow:0 0 #0000;--tw-ring-shadow:0 0 #0000;--tw-shadow:0 0 #0000;\
+--tw-ring-color:rgb(59 130 246 / 0.5)}
+html{line-height:1.5;-webkit-text-size-adjust:100%;tab-size:4;font-family:ui-sans-serif,system-ui,\
+sans-serif,"Apple Color Emoji","Segoe UI Emoji","Segoe UI Symbol","Noto Color Emoji"}
+body{margin:0;line-height:inherit}
+hr{height:0;color:inherit;border-top-width:1px}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+code,kbd,samp,pre{font-family:ui-monospace,SFMono-Regular,Menlo,Monaco,Consolas,"Liberation Mono",\
+"Courier New",monospace;font-size:1em}
+small{font-size:80%}
+table{text-indent:0;border-color:inherit;border-collapse:collapse}
+button,input,optgroup,select,textarea{font-family:inherit;font-size:100%;font-weight:inherit;\
+line-height:inherit;color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,[type='button'],[type='reset'],[type='submit']{-webkit-appearance:button;\
+background-color:transparent;background-image:none}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+fieldset{margin:0;padding:0}
+legend{padding:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+textarea{resize:vertical}
+input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}
+button,[role="button"]{cursor:pointer}
+:disabled{cursor:default}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]{display:none}
+"""
+
+# ---- VALUES ----
+
+
+def _arbitrary(value):
+    if value.startswith("[") and value.endswith("]") and len(value) > 2:
+        return value[1:-1].replace("_", " ")
+    return None
+
+
+def _hex_to_rgb(value):
+    value = value.lstrip("#")
+    if len(value) == 3:
+        value = "".join(c * 2 for c in value)
+    if len(value) != 6:
+        return None
+    try:
+        return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+    except ValueError:
+        return None
+
+
+def _split_modifier(value):
+    """'slate-200/50' -> ('slate-200', '50'), ignoring '/' inside [...]."""
+    depth = 0
+    for i, ch in enumerate(value):
+        if ch == "[":
+            depth += 1
+        elif ch == "]":
+            depth -= 1
+        elif ch == "/" and depth == 0:
+            return value[:i], value[i + 1:]
+    return value, None
+
+
+def _alpha(modifier):
+    if modifier is None:
+        return None
+    raw = _arbitrary(modifier)
+    if raw is not None:
+        return raw
+    if modifier.isdigit() and int(modifier) <= 100:
+        return f"{int(modifier) / 100:g}"
+    return False
+
+
+def color(value, alpha_default=None):
+    """Tailwind colour value (with optional /opacity) -> CSS colour."""
+    value, modifier = _split_modifier(value)
+    alpha = _alpha(modifier)
+    if alpha is False:
+        return None
+    raw = _arbitrary(value)
+    if raw is not None:
+        if not (raw.startswith("#") or raw.startswith(("rgb", "hsl"))):
+            return None
+        base = raw
+    elif value in NAMED_COLORS:
+        base = NAMED_COLORS[value]
+    else:
+        family, _, shade = value.rpartition("-")
+        if family not in COLORS or shade not in SHADES:
+            return None
+        base = COLORS[family][SHADES.index(shade)]
+    if alpha is None:
+        alpha = alpha_default
+    if alpha is None or not base.startswith("#"):
+        return base
+    rgb = _hex_to_rgb(base)
+    if rgb is None:
+        return None
+    return f"rgb({rgb[0]} {rgb[1]} {rgb[2]} / {alpha})"
+
+
+def spacing(value, negative=False, extra=None):
+    result = _arbitrary(value)
+    if result is None:
+        result = (extra or {}).get(value) or SPACING.get(value)
+    if result is None:
+        return None
+    if negative and result not in ("0px", "auto"):
+        result = f"calc({result} * -1)" if result.startswith(("calc", "var")) else "-" + result
+    return result
+
+
+def _fraction(value):
+    a, _, b = value.partition("/")
+    if a.isdigit() and b.isdigit() and int(b):
+        return f"{int(a) / int(b) * 100:g}%"
+    if value == "full":
+        return "100%"
+    return None
+
+
+def size(value, negative=False, screen=None):
+    extra = {"auto": "auto", "min": "min-content", "max": "max-content", "fit": "fit-content"}
+    if screen:
+        extra["screen"] = screen
+    result = spacing(value, negative, extra)
+    if result is None:
+        result = _fraction(value)
+        if result is not None and negative:
+            result = "-" + result
+    return result
+
+
+def _length(raw):
+    return raw is not None and bool(re.match(r"^-?[\d.]+(px|rem|em|%|vh|vw|ch)$|^calc\(", raw))
+
+
+# ---- PLUGINS ----
+# Each takes the utility (variants stripped, leading '-' removed) and
+# whether it was negated, and returns None or a list of rules
+# (selector suffix, [(property, value), ...]). Their order here is the
+# order rules are emitted in, so later plugins win ties (px-4 pl-2).
+
+
+def rule(*decls, suffix=""):
+    return [(suffix, list(decls))]
+
+
+def _table(table, prop):
+    def plugin(u, neg):
+        if neg or u not in table:
+            return None
+        return rule((prop, table[u]))
+    return plugin
+
+
+def _prefixed(prefix, fn):
+    """Call fn(rest, neg) for utilities starting with prefix + '-'."""
+    def plugin(u, neg):
+        if not u.startswith(prefix + "-"):
+            return None
+        return fn(u[len(prefix) + 1:], neg)
+    return plugin
+
+
+def _sides(mapping, value_fn):
+    """{'mt': ('margin-top',), ...} -> plugin."""
+    def plugin(u, neg):
+        name, _, value = u.partition("-")
+        if name not in mapping or not value:
+            return None
+        result = value_fn(value, neg)
+        if result is None:
+            return None
+        return rule(*((prop, result) for prop in mapping[name]))
+    return plugin
+
+
+def _position(u, neg):
+    if not neg and u in ("static", "fixed", "absolute", "relative", "sticky"):
+        return rule(("position", u))
+
+
+INSET_ALL = {"inset": ("top", "right", "bottom", "left")}
+INSET_AXIS = {"inset-x": ("left", "right"), "inset-y": ("top", "bottom")}
+INSET_SIDE = {"top": ("top",), "right": ("right",), "bottom": ("bottom",), "left": ("left",)}
+
+
+def _inset(mapping):
+    def plugin(u, neg):
+        for name, props in mapping.items():
+            if u.startswith(name + "-"):
+                value = size(u[len(name) + 1:], neg)
+                if value is not None:
+                    return rule(*((p, value) for p in props))
+        return None
+    return plugin
+
+
+def _z(u, neg):
+    if not u.startswith("z-"):
+        return None
+    value = u[2:]
+    raw = _arbitrary(value)
+    if raw is None and not (value.isdigit() or value == "auto"):
+        return None
+    value = raw or value
+    return rule(("z-index", "-" + value if neg else value))
+
+
+def _col_span(u, neg):
+    if neg or not u.startswith("col-span-"):
+        return None
+    value = u[len("col-span-"):]
+    if value == "full":
+        return rule(("grid-column", "1 / -1"))
+    if value.isdigit():
+        return rule(("grid-column", f"span {value} / span {value}"))
+
+
+def _margin_value(value, neg):
+    return spacing(value, neg, {"auto": "auto"})
+
+
+def _line_clamp(u, neg):
+    if neg or not u.startswith("line-clamp-"):
+        return None
+    value = u[len("line-clamp-"):]
+    if value == "none":
+        return rule(("overflow", "visible"), ("display", "block"),
+                    ("-webkit-box-orient", "horizontal"), ("-webkit-line-clamp", "none"))
+    if value.isdigit():
+        return rule(("overflow", "hidden"), ("display", "-webkit-box"),
+                    ("-webkit-box-orient", "vertical"), ("-webkit-line-clamp", value))
+
+
+DISPLAY = {
+    "block": "block", "inline-block": "inline-block", "inline": "inline",
+    "flex": "flex", "inline-flex": "inline-flex", "table": "table",
+    "grid": "grid", "inline-grid": "inline-grid", "contents": "contents",
+    "list-item": "list-item", "hidden": "none",
+}
+
+
+def _dimension(prefix, prop, screen, extra=None):
+    def plugin(u, neg):
+        if neg or not u.startswith(prefix + "-"):
+            return None
+        value = u[len(prefix) + 1:]
+        result = (extra or {}).get(value) or size(value, screen=screen)
+        if result is not None:
+            return rule((prop, result))
+    return plugin
+
+
+FLEX = {"1": "1 1 0%", "auto": "1 1 auto", "initial": "0 1 auto", "none": "none"}
+
+
+def _flex_grow_shrink(u, neg):
+    for prefix, prop in (("flex-shrink", "flex-shrink"), ("shrink", "flex-shrink"),
+                         ("flex-grow", "flex-grow"), ("grow", "flex-grow")):
+        if u == prefix:
+            return rule((prop, "1"))
+        if u == prefix + "-0":
+            return rule((prop, "0"))
+    return None
+
+
+TRANSFORM = (
+    "translate(var(--tw-translate-x), var(--tw-translate-y)) rotate(var(--tw-rotate)) "
+    "scaleX(var(--tw-scale-x)) scaleY(var(--tw-scale-y))"
+)
+
+
+def _translate(u, neg):
+    for axis in ("x", "y"):
+        prefix = f"translate-{axis}-"
+        if u.startswith(prefix):
+            value = size(u[len(prefix):], neg)
+            if value is not None:
+                return rule((f"--tw-translate-{axis}", value), ("transform", TRANSFORM))
+    return None
+
+
+def _scale(u, neg):
+    for prefix, axes in (("scale-x-", "x"), ("scale-y-", "y"), ("scale-", "xy")):
+        if u.startswith(prefix):
+            value = u[len(prefix):]
+            if not value.isdigit():
+                return None
+            value = f"{int(value) / 100:g}"
+            decls = [(f"--tw-scale-{a}", value) for a in axes]
+            return rule(*decls, ("transform", TRANSFORM))
+    return None
+
+
+def _rotate(u, neg):
+    if u.startswith("rotate-") and u[7:].isdigit():
+        return rule(("--tw-rotate", f"{'-' if neg else ''}{u[7:]}deg"), ("transform", TRANSFORM))
+
+
+def _transform(u, neg):
+    if u == "transform":
+        return rule(("transform", TRANSFORM))
+    if u == "transform-none":
+        return rule(("transform", "none"))
+
+
+def _animate(u, neg):
+    if not neg and u.startswith("animate-") and u[8:] in ANIMATIONS:
+        return rule(("animation", ANIMATIONS[u[8:]]))
+
+
+CURSORS = {
+    "cursor-" + c: c
+    for c in ("auto", "default", "pointer", "wait", "text", "move", "help",
+              "not-allowed", "none", "grab", "zoom-in", "zoom-out")
+}
+SELECT = {"select-none": "none", "select-text": "text", "select-all": "all", "select-auto": "auto"}
+RESIZE = {"resize-none": "none", "resize-y": "vertical", "resize-x": "horizontal", "resize": "both"}
+LIST_STYLE = {"list-none": "none", "list-disc": "disc", "list-decimal": "decimal"}
+
+
+def _grid_cols(u, neg):
+    if neg or not u.startswith("grid-cols-"):
+        return None
+    value = u[len("grid-cols-"):]
+    if value == "none":
+        return rule(("grid-template-columns", "none"))
+    if value.isdigit():
+        return rule(("grid-template-columns", f"repeat({value}, minmax(0, 1fr))"))
+    raw = _arbitrary(value)
+    if raw is not None:
+        return rule(("grid-template-columns", raw))
+
+
+FLEX_DIRECTION = {
+    "flex-row": "row", "flex-row-reverse": "row-reverse",
+    "flex-col": "column", "flex-col-reverse": "column-reverse",
+}
+FLEX_WRAP = {"flex-wrap": "wrap", "flex-wrap-reverse": "wrap-reverse", "flex-nowrap": "nowrap"}
+ALIGN_ITEMS = {
+    "items-start": "flex-start", "items-end": "flex-end", "items-center": "center",
+    "items-baseline": "baseline", "items-stretch": "stretch",
+}
+JUSTIFY = {
+    "justify-start": "flex-start", "justify-end": "flex-end",
+    "justify-center": "center", "justify-between": "space-between",
+    "justify-around": "space-around", "justify-evenly": "space-evenly",
+}
+SELF = {
+    "self-auto": "auto", "self-start": "flex-start", "self-end": "flex-end",
+    "self-center": "center", "self-stretch": "stretch",
+}
+GAP = {"gap": ("gap",), "gap-x": ("column-gap",), "gap-y": ("row-gap",)}
+
+
+def _gap(u, neg):
+    if neg:
+        return None
+    for name in ("gap-x", "gap-y", "gap"):
+        if u.startswith(name + "-"):
+            value = spacing(u[len(name) + 1:])
+            if value is not None:
+                return rule(*((p, value) for p in GAP[name]))
+            return None
+    return None
+
+
+def _space(u, neg):
+    for axis, prop in (("x", "margin-left"), ("y", "margin-top")):
+        prefix = f"space-{axis}-"
+        if u.startswith(prefix):
+            value = spacing(u[len(prefix):], neg)
+            if value is not None:
+                return rule((prop, value), suffix=" > :not([hidden]) ~ :not([hidden])")
+    return None
+
+
+def _overflow(u, neg):
+    m = re.match(r"^overflow(-[xy])?-(auto|hidden|visible|scroll|clip)$", u)
+    if m and not neg:
+        return rule((f"overflow{m.group(1) or ''}", m.group(2)))
+
+
+TEXT_OVERFLOW = {
+    "truncate": [("overflow", "hidden"), ("text-overflow", "ellipsis"), ("white-space", "nowrap")],
+    "text-ellipsis": [("text-overflow", "ellipsis")],
+    "text-clip": [("text-overflow", "clip")],
+}
+WHITESPACE = {
+    "whitespace-" + v: v
+    for v in ("normal", "nowrap", "pre", "pre-line", "pre-wrap", "break-spaces")
+}
+WORD_BREAK = {
+    "break-normal": [("overflow-wrap", "normal"), ("word-break", "normal")],
+    "break-words": [("overflow-wrap", "break-word")],
+    "break-all": [("word-break", "break-all")],
+}
+
+RADIUS_ALL = {"rounded": ("border-radius",)}
+RADIUS_SIDES = {
+    "rounded-t": ("border-top-left-radius", "border-top-right-radius"),
+    "rounded-r": ("border-top-right-radius", "border-bottom-right-radius"),
+    "rounded-b": ("border-bottom-right-radius", "border-bottom-left-radius"),
+    "rounded-l": ("border-top-left-radius", "border-bottom-left-radius"),
+}
+RADIUS_CORNERS = {
+    "rounded-tl": ("border-top-left-radius",),
+    "rounded-tr": ("border-top-right-radius",),
+    "rounded-br": ("border-bottom-right-radius",),
+    "rounded-bl": ("border-bottom-left-radius",),
+}
+
+
+def _radius(mapping):
+    def plugin(u, neg):
+        if neg:
+            return None
+        for name, props in mapping.items():
+            if u == name or u.startswith(name + "-"):
+                key = u[len(name) + 1:]
+                value = RADII.get(key)
+                if value is None:
+                    value = _arbitrary(key)
+                if value is not None:
+                    return rule(*((p, value) for p in props))
+        return None
+    return plugin
+
+
+BORDER_ALL = {"border": ("border-width",)}
+BORDER_AXIS = {
+    "border-x": ("border-left-width", "border-right-width"),
+    "border-y": ("border-top-width", "border-bottom-width"),
+}
+BORDER_SIDE = {
+    "border-t": ("border-top-width",), "border-r": ("border-right-width",),
+    "border-b": ("border-bottom-width",), "border-l": ("border-left-width",),
+}
+
+
+def _border_width(mapping):
+    def plugin(u, neg):
+        if neg:
+            return None
+        for name, props in mapping.items():
+            if u == name:
+                value = "1px"
+            elif u.startswith(name + "-"):
+                key = u[len(name) + 1:]
+                raw = _arbitrary(key)
+                if key in ("0", "2", "4", "8"):
+                    value = key + "px"
+                elif _length(raw):
+                    value = raw
+                else:
+                    continue
+            else:
+                continue
+            return rule(*((p, value) for p in props))
+        return None
+    return plugin
+
+
+BORDER_STYLE = {
+    "border-" + s: s for s in ("solid", "dashed", "dotted", "double", "hidden", "none")
+}
+
+
+def _color_plugin(prefix, *props):
+    def plugin(u, neg):
+        if neg or not u.startswith(prefix + "-"):
+            return None
+        value = color(u[len(prefix) + 1:])
+        if value is not None:
+            return rule(*((p, value) for p in props))
+    return plugin
+
+
+GRADIENT_DIRECTIONS = {
+    "t": "to top", "tr": "to top right", "r": "to right", "br": "to bottom right",
+    "b": "to bottom", "bl": "to bottom left", "l": "to left", "tl": "to top left",
+}
+
+
+def _background_image(u, neg):
+    if u.startswith("bg-gradient-to-") and u[15:] in GRADIENT_DIRECTIONS:
+        direction = GRADIENT_DIRECTIONS[u[15:]]
+        return rule(("background-image", f"linear-gradient({direction}, var(--tw-gradient-stops))"))
+    if u == "bg-none":
+        return rule(("background-image", "none"))
+    raw = _arbitrary(u[3:]) if u.startswith("bg-") else None
+    if raw is not None and raw.startswith("url("):
+        return rule(("background-image", raw))
+
+
+def _gradient_stop(prefix):
+    def plugin(u, neg):
+        if neg or not u.startswith(prefix + "-"):
+            return None
+        return _gradient_rule(prefix, u[len(prefix) + 1:])
+    return plugin
+
+
+def _gradient_rule(prefix, value):
+    css = color(value)
+    if css is None:
+        return None
+    if prefix == "to":
+        return rule(("--tw-gradient-to", css))
+    # the far end fades to the same colour at zero opacity
+    fade = color(_split_modifier(value)[0], alpha_default="0")
+    if fade == css or not fade.startswith("rgb"):
+        fade = "rgb(255 255 255 / 0)"
+    if prefix == "from":
+        return rule(
+            ("--tw-gradient-from", css),
+            ("--tw-gradient-to", fade),
+            ("--tw-gradient-stops", "var(--tw-gradient-from), var(--tw-gradient-to)"),
+        )
+    return rule(
+        ("--tw-gradient-to", fade),
+        ("--tw-gradient-stops", f"var(--tw-gradient-from), {css}, var(--tw-gradient-to)"),
+    )
+
+
+BG_CLIP = {
+    "bg-clip-border": "border-box", "bg-clip-padding": "padding-box",
+    "bg-clip-content": "content-box", "bg-clip-text": "text",
+}
+
+
+def _bg_clip(u, neg):
+    if u in BG_CLIP:
+        return rule(("-webkit-background-clip", BG_CLIP[u]), ("background-clip", BG_CLIP[u]))
+
+
+OBJECT_FIT = {"object-" + v: v for v in ("contain", "cover", "fill", "none", "scale-down")}
+
+PADDING_ALL = {"p": ("padding",)}
+PADDING_AXIS = {"px": ("padding-left", "padding-right"), "py": ("padding-top", "padding-bottom")}
+PADDING_SIDE = {
+    "pt": ("padding-top",), "pr": ("padding-right",),
+    "pb": ("padding-bottom",), "pl": ("padding-left",),
+}
+MARGIN_ALL = {"m": ("margin",)}
+MARGIN_AXIS = {"mx": ("margin-left", "margin-right"), "my": ("margin-top", "margin-bottom")}
+MARGIN_SIDE = {
+    "mt": ("margin-top",), "mr": ("margin-right",),
+    "mb": ("margin-bottom",), "ml": ("margin-left",),
+}
+
+TEXT_ALIGN = {"text-" + v: v for v in ("left", "center", "right", "justify", "start", "end")}
+VERTICAL_ALIGN = {"align-" + v: v for v in ("baseline", "top", "middle", "bottom", "text-top")}
+FONT_FAMILY = {
+    "font-sans": 'ui-sans-serif, system-ui, sans-serif, "Apple Color Emoji", '
+                 '"Segoe UI Emoji", "Segoe UI Symbol", "Noto Color Emoji"',
+    "font-mono": 'ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, '
+                 '"Liberation Mono", "Courier New", monospace',
+}
+
+
+def _font_size(u, neg):
+    if neg or not u.startswith("text-"):
+        return None
+    value = u[5:]
+    if value in FONT_SIZES:
+        font_size, line_height = FONT_SIZES[value]
+        return rule(("font-size", font_size), ("line-height", line_height))
+    raw = _arbitrary(value)
+    if _length(raw):
+        return rule(("font-size", raw))
+
+
+def _font_weight(u, neg):
+    if u.startswith("font-") and u[5:] in FONT_WEIGHTS:
+        return rule(("font-weight", FONT_WEIGHTS[u[5:]]))
+
+
+TEXT_TRANSFORM = {
+    "uppercase": "uppercase", "lowercase": "lowercase",
+    "capitalize": "capitalize", "normal-case": "none",
+}
+FONT_STYLE = {"italic": "italic", "not-italic": "normal"}
+
+
+def _leading(u, neg):
+    if neg or not u.startswith("leading-"):
+        return None
+    value = u[8:]
+    result = LEADING.get(value) or _arbitrary(value)
+    if result is None and value.isdigit() and 3 <= int(value) <= 10:
+        result = SPACING[value]
+    if result is not None:
+        return rule(("line-height", result))
+
+
+def _tracking(u, neg):
+    if u.startswith("tracking-") and u[9:] in TRACKING:
+        return rule(("letter-spacing", TRACKING[u[9:]]))
+
+
+TEXT_DECORATION = {
+    "underline": "underline", "overline": "overline",
+    "line-through": "line-through", "no-underline": "none",
+}
+
+
+def _opacity(u, neg):
+    if neg or not u.startswith("opacity-"):
+        return None
+    value = u[8:]
+    if value.isdigit() and int(value) <= 100:
+        return rule(("opacity", f"{int(value) / 100:g}"))
+
+
+BOX_SHADOW = "var(--tw-ring-offset-shadow), var(--tw-ring-shadow), var(--tw-shadow)"
+
+
+def _shadow(u, neg):
+    if neg or not (u == "shadow" or u.startswith("shadow-")):
+        return None
+    key = u[7:]
+    if key in SHADOWS:
+        return rule(("--tw-shadow", SHADOWS[key]), ("box-shadow", BOX_SHADOW))
+
+
+OUTLINE = {
+    "outline-none": [("outline", "2px solid transparent"), ("outline-offset", "2px")],
+    "outline": [("outline-style", "solid")],
+}
+
+
+def _ring_width(u, neg):
+    if neg or not (u == "ring" or u.startswith("ring-")):
+        return None
+    key = u[5:] or "3"
+    if key == "inset":
+        return None
+    if key not in ("0", "1", "2", "4", "8", "3"):
+        return None
+    return rule(
+        ("--tw-ring-shadow", f"0 0 0 {key}px var(--tw-ring-color)"),
+        ("box-shadow", BOX_SHADOW),
+    )
+
+
+def _filter(prefix, prop):
+    def plugin(u, neg):
+        if neg or not (u == prefix or u.startswith(prefix + "-")):
+            return None
+        key = u[len(prefix) + 1:]
+        value = BLURS.get(key) if key in BLURS else _arbitrary(key)
+        if value is None:
+            return None
+        decls = [(prop, f"blur({value})")]
+        if prop == "backdrop-filter":
+            decls.insert(0, ("-webkit-backdrop-filter", f"blur({value})"))
+        return rule(*decls)
+    return plugin
+
+
+def _transition(u, neg):
+    if neg or not (u == "transition" or u.startswith("transition-")):
+        return None
+    key = u[11:]
+    if key == "none":
+        return rule(("transition-property", "none"))
+    if key in TRANSITIONS:
+        return rule(
+            ("transition-property", TRANSITIONS[key]),
+            ("transition-timing-function", EASE),
+            ("transition-duration", "150ms"),
+        )
+
+
+def _duration(u, neg):
+    for prefix, prop in (("duration-", "transition-duration"), ("delay-", "transition-delay")):
+        if u.startswith(prefix) and u[len(prefix):].isdigit() and not neg:
+            return rule((prop, u[len(prefix):] + "ms"))
+    return None
+
+
+EASING = {
+    "ease-linear": "linear", "ease-in": "cubic-bezier(0.4, 0, 1, 1)",
+    "ease-out": "cubic-bezier(0, 0, 0.2, 1)", "ease-in-out": EASE,
+}
+
+PLUGINS = [
+    _position,
+    _inset(INSET_ALL),
+    _inset(INSET_AXIS),
+    _inset(INSET_SIDE),
+    _z,
+    _col_span,
+    _sides(MARGIN_ALL, _margin_value),
+    _sides(MARGIN_AXIS, _margin_value),
+    _sides(MARGIN_SIDE, _margin_value),
+    _line_clamp,
+    _table(DISPLAY, "display"),
+    _dimension("h", "height", "100vh"),
+    _dimension("max-h", "max-height", "100vh"),
+    _dimension("min-h", "min-height", "100vh"),
+    _dimension("w", "width", "100vw"),
+    _dimension("min-w", "min-width", "100vw"),
+    _dimension("max-w", "max-width", None, MAX_WIDTHS),
+    _prefixed("flex", lambda v, neg: None if neg or v not in FLEX else rule(("flex", FLEX[v]))),
+    _flex_grow_shrink,
+    _translate,
+    _rotate,
+    _scale,
+    _transform,
+    _animate,
+    _table(CURSORS, "cursor"),
+    _table(SELECT, "user-select"),
+    _table(RESIZE, "resize"),
+    _table(LIST_STYLE, "list-style-type"),
+    _grid_cols,
+    _table(FLEX_DIRECTION, "flex-direction"),
+    _table(FLEX_WRAP, "flex-wrap"),
+    _table(ALIGN_ITEMS, "align-items"),
+    _table(JUSTIFY, "justify-content"),
+    _gap,
+    _space,
+    _table(SELF, "align-self"),
+    _overflow,
+    lambda u, neg: None if neg or u not in TEXT_OVERFLOW else [("", TEXT_OVERFLOW[u])],
+    _table(WHITESPACE, "white-space"),
+    lambda u, neg: None if neg or u not in WORD_BREAK else [("", WORD_BREAK[u])],
+    _radius(RADIUS_ALL),
+    _radius(RADIUS_SIDES),
+    _radius(RADIUS_CORNERS),
+    _border_width(BORDER_ALL),
+    _border_width(BORDER_AXIS),
+    _border_width(BORDER_SIDE),
+    _table(BORDER_STYLE, "border-style"),
+    _color_plugin("border", "border-color"),
+    _color_plugin("bg", "background-color"),
+    _background_image,
+    _gradient_stop("from"),
+    _gradient_stop("via"),
+    _gradient_stop("to"),
+    _bg_clip,
+    _table(OBJECT_FIT, "object-fit"),
+    _sides(PADDING_ALL, spacing),
+    _sides(PADDING_AXIS, spacing),
+    _sides(PADDING_SIDE, spacing),
+    _table(TEXT_ALIGN, "text-align"),
+    _table(VERTICAL_ALIGN, "vertical-align"),
+    _table(FONT_FAMILY, "font-family"),
+    _font_size,
+    _font_weight,
+    _table(TEXT_TRANSFORM, "text-transform"),
+    _table(FONT_STYLE, "font-style"),
+    _leading,
+    _tracking,
+    _color_plugin("text", "color"),
+    _table(TEXT_DECORATION, "text-decoration-line"),
+    _color_plugin("placeholder", "color"),
+    _opacity,
+    _shadow,
+    lambda u, neg: None if neg or u not in OUTLINE else [("", OUTLINE[u])],
+    _ring_width,
+    _color_plugin("ring", "--tw-ring-color"),
+    _filter("blur", "filter"),
+    _filter("backdrop-blur", "backdrop-filter"),
+    _transition,
+    _duration,
+    _table(EASING, "transition-timing-function"),
+]
+
+# ---- BUILD ----
+
+_TEMPLATE_TAG = re.compile(r"\{[%{#].*?[%}#]\}", re.S)
+_CANDIDATE = re.compile(r"[^\s\"'`<>{}=;\\]+")
+
+
+def candidates(text):
+    """Every token in text that could be a class name."""
+    found = set()
+    for token in _CANDIDATE.findall(_TEMPLATE_TAG.sub(" ", text)):
+        found.add(token)
+        trimmed = token.strip("(),.:")
+        if trimmed:
+            found.add(trimmed)
+    return found
+
+
+def escape(name):
+    """CSS identifier escaping for a class name."""
+    escaped = re.sub(r"([^a-zA-Z0-9_-])", r"\\\1", name)
+    if name[:1].isdigit():
+        escaped = f"\\3{name[0]} " + escaped[1:]
+    return escaped
+
+
+def _split_variants(candidate):
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(candidate):
+        if ch == "[":
+            depth += 1
+        elif ch == "]":
+            depth -= 1
+        elif ch == ":" and depth == 0:
+            parts.append(candidate[start:i])
+            start = i + 1
+    parts.append(candidate[start:])
+    return parts[:-1], parts[-1]
+
+
+def compile_candidate(candidate):
+    """
+    -> (sort key, media query or None, css text, animation name or None),
+    or None if the candidate isn't a known utility.
+    """
+    variants, utility = _split_variants(candidate)
+    screens = [v for v in variants if v in SCREENS]
+    states = [v for v in variants if v not in SCREENS]
+    if len(screens) > 1 or any(v not in VARIANT_ORDER for v in states):
+        return None
+
+    negative = utility.startswith("-")
+    if negative:
+        utility = utility[1:]
+    for index, plugin in enumerate(PLUGINS):
+        rules = plugin(utility, negative)
+        if rules:
+            break
+    else:
+        return None
+
+    selector = "." + escape(candidate)
+    for state in states:
+        if state in GROUP_VARIANTS:
+            selector = f".group{GROUP_VARIANTS[state]} {selector}"
+        else:
+            selector += PSEUDO_VARIANTS[state]
+
+    css = "".join(
+        selector + suffix + "{" + ";".join(f"{p}:{v}" for p, v in decls) + "}"
+        for suffix, decls in rules
+    )
+    screen = screens[0] if screens else None
+    key = (
+        list(SCREENS).index(screen) + 1 if screen else 0,
+        sorted(VARIANT_ORDER.index(v) for v in states),
+        index,
+        candidate,
+    )
+    animation = None
+    if utility.startswith("animate-") and utility[8:] in KEYFRAMES:
+        animation = utility[8:]
+    return key, screen, css, animation
+
+
+def content_files(base_dir=None):
+    base_dir = Path(base_dir or settings.BASE_DIR)
+    files = set()
+    for pattern in CONTENT:
+        files.update(p for p in base_dir.glob(pattern) if p.is_file())
+    return sorted(files)
+
+
+def build(files=None):
+    """-> (stylesheet text, number of utilities)."""
+    found = set()
+    for path in files if files is not None else content_files():
+        found |= candidates(Path(path).read_text(encoding="utf-8"))
+
+    compiled = [c for c in map(compile_candidate, found) if c is not None]
+    compiled.sort(key=lambda c: c[0])
+
+    out = ["/* Generated by `python manage.py build_css`; do not edit. */\n", PREFLIGHT]
+    for name in sorted({c[3] for c in compiled if c[3]}):
+        out.append(KEYFRAMES[name] + "\n")
+    for key, screen, css, _ in compiled:
+        if screen is None:
+            out.append(css + "\n")
+    for screen, width in SCREENS.items():
+        rules = [css for _, s, css, _ in compiled if s == screen]
+        if rules:
+            out.append(f"@media (min-width:{width}px){{\n" + "\n".join(rules) + "\n}\n")
+    return "".join(out), len(compiled)
@@ -0,0 +1,43 @@
+# store/db.py
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def sqlite_pragmas():
+    """
+    PRAGMAs applied to every new SQLite connection.
+    Returns an empty dict when tuning is switched off (SQLITE_TUNING=False).
+    """
+    if not getattr(settings, "SQLITE_TUNING", True):
+        return {}
+    return getattr(settings, "SQLITE_PRAGMAS", {})
+
+
+def apply_sqlite_pragmas(cursor, pragmas=None):
+    """
+    Run `PRAGMA key=value` for each entry on a DB-API cursor.
+    Works for Django cursors and plain sqlite3 cursors (used by bench_sqlite).
+    """
+    if pragmas is None:
+        pragmas = sqlite_pragmas()
+
+    for key, value in pragmas.items():
+        try:
+            cursor.execute(f"PRAGMA {key}={value}")
+        except Exception:
+            # e.g. WAL on a read-only file: keep the connection usable
+            logger.warning("Could not apply PRAGMA %s=%s", key, value, exc_info=True)
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """
+    `connection_created` receiver: tune SQLite connections, ignore the rest.
+    """
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        apply_sqlite_pragmas(cursor)
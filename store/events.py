@@ -0,0 +1,238 @@
+# store/events.py
+"""
+Live order status updates over Server-Sent Events.
+
+Every Order status change writes an OrderEvent (store/signals.py) and,
+once committed, publishes it on the in-process broker below. Each open
+order_detail / my_orders page holds one async stream that sleeps on its
+queue, so idle watchers cost no queries.
+
+Changes made by another process (another web worker, the job worker, a
+shell) never reach this process's broker; for those the stream falls
+back to polling every ORDER_EVENTS_POLL_SECONDS. With a shared cache
+the poll is a single cache read of the user's orders version
+(store/catalog.py) and the DB is only queried when it moved. Without
+one, every poll is a query, so an idle stream polls less and less often
+(up to MAX_POLL_BACKOFF intervals apart) and keeps sending keepalives
+in between.
+
+Django 4.2 stops listening to the client once the request body is read,
+so a stream would run on for up to STREAM_SECONDS after the page was
+closed. cancel_on_disconnect() (wrapped around the ASGI application in
+techsense/asgi.py) cancels an event-stream request when the client goes.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+
+from .catalog import get_orders_version, shared_cache
+from .models import OrderEvent
+
+# the browser reconnects (with Last-Event-ID) after this many ms
+RETRY_MS = 3000
+# cap a single stream so proxies / deploys never see a stuck connection
+STREAM_SECONDS = 5 * 60
+# without a shared cache, an idle stream polls the DB at most this many
+# ORDER_EVENTS_POLL_SECONDS apart
+MAX_POLL_BACKOFF = 4
+
+
+class Broker:
+    """In-process pub/sub: user id -> queues of the streams watching it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, user_id):
+        subscription = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            self._subscribers[user_id].discard(subscription)
+            if not self._subscribers[user_id]:
+                del self._subscribers[user_id]
+
+    def publish(self, user_id, payload):
+        # called from sync code (signals, any thread)
+        with self._lock:
+            subscriptions = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscriptions:
+            loop.call_soon_threadsafe(queue.put_nowait, payload)
+
+
+broker = Broker()
+
+
+def event_payload(event):
+    return {
+        "id": event.pk,
+        "order_id": event.order_id,
+        "status": event.to_status,
+        "status_display": event.get_to_status_display(),
+        "created_at": event.created_at.isoformat(),
+    }
+
+
+def publish(event):
+    broker.publish(event.user_id, event_payload(event))
+
+
+def last_event_id(user_id):
+    return (
+        OrderEvent.objects.filter(user_id=user_id)
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+    ) or 0
+
+
+def events_after(user_id, after_id, order_id=None):
+    events = OrderEvent.objects.filter(user_id=user_id, id__gt=after_id)
+    if order_id is not None:
+        events = events.filter(order_id=order_id)
+    return [event_payload(e) for e in events.order_by("id")[:100]]
+
+
+def sse(payload):
+    return f"id: {payload['id']}\nevent: status\ndata: {json.dumps(payload)}\n\n"
+
+
+async def stream(user_id, after_id, order_id=None):
+    loop = asyncio.get_running_loop()
+    subscription = broker.subscribe(user_id)
+    queue = subscription[1]
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+
+        version = await sync_to_async(get_orders_version)(user_id)
+        for payload in await sync_to_async(events_after)(user_id, after_id, order_id):
+            after_id = payload["id"]
+            yield sse(payload)
+
+        backoff = idle = 0
+        deadline = loop.time() + STREAM_SECONDS
+        while loop.time() < deadline:
+            try:
+                payload = await asyncio.wait_for(queue.get(), settings.ORDER_EVENTS_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                payload = None
+
+            if payload is not None:
+                if payload["id"] > after_id and order_id in (None, payload["order_id"]):
+                    after_id = payload["id"]
+                    yield sse(payload)
+                continue
+
+            # fallback: changes committed by other processes
+            if shared_cache():
+                current = await sync_to_async(get_orders_version)(user_id)
+                if current == version:
+                    yield ": keepalive\n\n"
+                    continue
+                version = current
+            elif idle < backoff:
+                idle += 1
+                yield ": keepalive\n\n"
+                continue
+
+            sent = False
+            for payload in await sync_to_async(events_after)(user_id, after_id, order_id):
+                after_id = payload["id"]
+                sent = True
+                yield sse(payload)
+            if not sent:
+                yield ": keepalive\n\n"
+            # 0, 1, 3, 3, ... intervals skipped between polls that found nothing
+            backoff = 0 if sent else min(2 * backoff + 1, MAX_POLL_BACKOFF - 1)
+            idle = 0
+    finally:
+        broker.unsubscribe(user_id, subscription)
+
+
+def _wants_event_stream(scope):
+    return scope["type"] == "http" and any(
+        name == b"accept" and b"text/event-stream" in value for name, value in scope["headers"]
+    )
+
+
+def cancel_on_disconnect(app):
+    """
+    ASGI wrapper: keeps listening to an EventSource request (Accept:
+    text/event-stream) after its body was read, and cancels the request
+    when the client disconnects. Other requests pass straight through.
+    """
+    async def application(scope, receive, send):
+        if not _wants_event_stream(scope):
+            return await app(scope, receive, send)
+
+        body_read = asyncio.Event()
+
+        async def receive_body():
+            message = await receive()
+            if message["type"] != "http.request" or not message.get("more_body"):
+                body_read.set()
+            return message
+
+        async def listen():
+            await body_read.wait()
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            handler.cancel()
+
+        handler = asyncio.ensure_future(app(scope, receive_body, send))
+        listener = asyncio.ensure_future(listen())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not listener.done():
+                raise  # cancelled by the server, not by the client leaving
+        finally:
+            listener.cancel()
+
+    return application
+
+
+def _parse_id(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+async def order_events(request):
+    """
+    GET /orders/events/?after=<event id>[&order=<order id>]
+    text/event-stream of the user's order status changes.
+    """
+    user = await sync_to_async(lambda: request.user if request.user.is_authenticated else None)()
+    if user is None:
+        return JsonResponse({"error": "authentication required"}, status=401)
+
+    if not isinstance(request, ASGIRequest):
+        # WSGI would buffer the whole stream; 204 tells EventSource to stop
+        return HttpResponse(status=204)
+
+    # EventSource resends the last id it saw when it reconnects
+    after_id = _parse_id(request.headers.get("Last-Event-ID"))
+    if after_id is None:
+        after_id = _parse_id(request.GET.get("after"))
+    if after_id is None:
+        after_id = await sync_to_async(last_event_id)(user.pk)
+    order_id = _parse_id(request.GET.get("order"))
+
+    response = StreamingHttpResponse(
+        stream(user.pk, after_id, order_id), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,74 @@
+# store/feeds.py
+from django.contrib.syndication.views import Feed
+from django.urls import reverse, reverse_lazy
+from django.utils.feedgenerator import Atom1Feed
+
+from .models import BlogPost, Project
+
+FEED_SIZE = 20
+
+
+class LatestPostsFeed(Feed):
+    title = "Techsense Blog"
+    link = reverse_lazy("store:blog_list")
+    description = "New articles from the Techsense blog."
+
+    def items(self):
+        return (
+            BlogPost.objects.filter(is_published=True)
+            .only("id", "title", "excerpt", "created_at", "updated_at")
+            .order_by("-created_at")[:FEED_SIZE]
+        )
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_link(self, item):
+        return reverse("store:blog_detail", args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.created_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class LatestProjectsFeed(Feed):
+    title = "Techsense – New Projects"
+    link = reverse_lazy("store:project_list")
+    description = "Projects recently added to the Techsense store."
+
+    def items(self):
+        return (
+            Project.objects.filter(is_active=True)
+            .only("id", "slug", "title", "short_description", "tech_stack", "created_at", "updated_at")
+            .order_by("-created_at")[:FEED_SIZE]
+        )
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return f"{item.short_description} ({item.tech_stack})"
+
+    def item_link(self, item):
+        return reverse("store:project_detail", args=[item.slug])
+
+    def item_pubdate(self, item):
+        return item.created_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+
+class LatestProjectsAtomFeed(LatestProjectsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestProjectsFeed.description
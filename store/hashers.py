@@ -0,0 +1,31 @@
+# store/hashers.py
+"""
+Password hashers used by settings.PASSWORD_HASHER_PROFILE.
+
+The first entry of PASSWORD_HASHERS hashes new passwords. On every
+successful login Django re-hashes the stored password when its algorithm
+or cost parameters differ from that hasher's, so switching profile (or
+changing the ARGON2_* costs) upgrades users transparently.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    argon2id with memory / time cost taken from settings. Keeps Django's
+    algorithm name, so hashes made by the stock Argon2 hasher still verify
+    and are re-hashed when the costs differ.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM
@@ -0,0 +1,200 @@
+# store/hits.py
+"""
+Buffered page-view counters for Project and BlogPost (and cart adds,
+which only feed the sales rollups).
+
+An UPDATE per detail view would turn every page view into a write. Hits
+go through three stages instead:
+
+1. record() adds to a Counter in this process (no I/O);
+2. every VIEW_COUNT_FLUSH_SECONDS the process adds its counts to
+   per-object keys in the shared cache (cache.incr), which is where the
+   workers' counts meet;
+3. one flush per interval (the first process to take FLUSH_LOCK enqueues
+   the flush_view_counts job) moves the cached counts to the database
+   with a single UPDATE ... CASE per model, decays Project.trending_score
+   and adds the new views to it and to today's DailySales rows.
+
+Both times a flush keeps live in the ViewCounterState row, not in the
+cache, so they are the same for every process even with a per-process
+LocMemCache (where each process flushes its own counts):
+
+- flushed_at: trending_score decays by the time since the last flush by
+  any process, claimed with a conditional UPDATE, so N processes
+  flushing every interval still decay it at wall-clock speed;
+- changed_at (views_changed_at()): the last flush that changed a count.
+  The pages ordered by views (home's Trending section, ?sort=popular /
+  trending) add it to their ETag and cache version: the catalog version
+  only moves on edits, and bumping it every flush would expire every
+  catalog page every VIEW_COUNT_FLUSH_SECONDS.
+
+Counts are at-least-once: a crash between the UPDATE and the cache decr
+counts that batch twice. Anonymous 304 revalidations never reach the
+view (store/http_cache.py) and are not counted.
+"""
+import atexit
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from . import analytics
+from .catalog import CATALOG_STATE_TTL, shared_cache
+from .models import BlogPost, Project, ViewCounterState
+
+KIND_PROJECT = "project"
+KIND_POST = "post"
+# first add of a project to a session cart (store/analytics.py)
+KIND_CART = "cart"
+MODELS = {KIND_PROJECT: Project, KIND_POST: BlogPost}
+
+FLUSH_LOCK = "hits:flush"
+# cached copy of ViewCounterState.changed_at, as a unix time
+CHANGED_AT = "hits:changed_at"
+# trending scores below this are rounded down to 0 (and stop being decayed)
+MIN_TRENDING_SCORE = 0.01
+
+_lock = threading.Lock()
+_pending = Counter()
+_pushed_at = time.monotonic()
+
+
+def cache_key(kind, pk):
+    return f"hits:{kind}:{pk}"
+
+
+def record(kind, pk):
+    """Count one view; cheap enough to call on every detail page."""
+    global _pushed_at
+    with _lock:
+        _pending[(kind, pk)] += 1
+        if time.monotonic() - _pushed_at < settings.VIEW_COUNT_FLUSH_SECONDS:
+            return
+        batch = dict(_pending)
+        _pending.clear()
+        _pushed_at = time.monotonic()
+    push(batch)
+    schedule_flush()
+
+
+def push(batch):
+    """Add {(kind, pk): n} to the shared per-object counters."""
+    for (kind, pk), n in batch.items():
+        key = cache_key(kind, pk)
+        try:
+            cache.incr(key, n)
+        except ValueError:
+            # not there yet (or evicted)
+            if not cache.add(key, n, timeout=None):
+                cache.incr(key, n)
+
+
+def push_pending():
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+    if batch:
+        push(batch)
+
+
+# don't drop the last few seconds of views on a graceful worker restart
+atexit.register(push_pending)
+
+
+def schedule_flush():
+    if not cache.add(FLUSH_LOCK, 1, timeout=settings.VIEW_COUNT_FLUSH_SECONDS):
+        return  # another process flushed during this interval
+    if shared_cache():
+        from .jobs import enqueue
+
+        enqueue("flush_view_counts")
+    else:
+        # a per-process cache: the job worker could never see these counts
+        flush()
+
+
+def views_changed_at():
+    """Unix time of the last flush that changed a view count (0 if never)."""
+    changed_at = cache.get(CHANGED_AT)
+    if changed_at is None:
+        state = ViewCounterState.load()
+        changed_at = state.changed_at.timestamp() if state.changed_at else 0
+        cache.add(CHANGED_AT, changed_at, timeout=CATALOG_STATE_TTL)
+    return changed_at
+
+
+def _claim_interval(now):
+    """
+    Seconds since the previous flush by any process, moving the watermark
+    to `now`; 0 when another flush moved it first (its decay already
+    covers this interval).
+    """
+    last = ViewCounterState.load().flushed_at
+    if not ViewCounterState.objects.filter(pk=ViewCounterState.SINGLETON_ID, flushed_at=last).update(
+        flushed_at=now
+    ):
+        return 0
+    return (now - last).total_seconds() if last else settings.VIEW_COUNT_FLUSH_SECONDS
+
+
+def _delta(counts):
+    return Case(*(When(pk=pk, then=Value(n)) for pk, n in counts.items()), default=Value(0))
+
+
+def _cached_counts(kind, model):
+    keys = {cache_key(kind, pk): pk for pk in model.objects.values_list("pk", flat=True)}
+    return {keys[key]: n for key, n in cache.get_many(keys).items() if n}
+
+
+def _forget(kind, counts):
+    # only after the write: hits that arrived since get_many() stay in the cache
+    for pk, n in counts.items():
+        try:
+            cache.decr(cache_key(kind, pk), n)
+        except ValueError:
+            pass
+
+
+def flush():
+    """Move the cached counts to the database; returns the number of views."""
+    now = timezone.now()
+    total = 0
+    for kind, model in MODELS.items():
+        counts = _cached_counts(kind, model)
+
+        with transaction.atomic():
+            if model is Project:
+                decay = 0.5 ** (_claim_interval(now) / (settings.TRENDING_HALF_LIFE_HOURS * 3600))
+                if decay < 1:
+                    model.objects.filter(trending_score__gt=0).update(
+                        trending_score=Case(
+                            When(trending_score__lt=MIN_TRENDING_SCORE / decay, then=Value(0.0)),
+                            default=F("trending_score") * decay,
+                        )
+                    )
+            if counts:
+                values = {"view_count": F("view_count") + _delta(counts)}
+                if model is Project:
+                    values["trending_score"] = F("trending_score") + _delta(counts)
+                model.objects.filter(pk__in=counts).update(**values)
+                if model is Project:
+                    analytics.add_counts(counts, "views")
+
+        _forget(kind, counts)
+        total += sum(counts.values())
+
+    if total:
+        ViewCounterState.objects.filter(pk=ViewCounterState.SINGLETON_ID).update(changed_at=now)
+        cache.delete(CHANGED_AT)
+
+    # cart adds only feed the sales rollups
+    counts = _cached_counts(KIND_CART, Project)
+    if counts:
+        analytics.add_counts(counts, "cart_adds")
+        _forget(KIND_CART, counts)
+    return total
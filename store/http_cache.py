@@ -0,0 +1,149 @@
+# store/http_cache.py
+"""
+HTTP caching for the public catalog pages (home, projects, blog).
+
+Views opt in with @catalog_cache(...). For anonymous GET/HEAD requests
+ConditionalCatalogMiddleware computes the ETag / Last-Modified from the
+cached catalog version and answers 304 before the view runs, so a
+revalidating browser or CDN costs no database queries at all.
+Logged-in users always get `private, no-cache` responses.
+"""
+import hashlib
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
+
+from .api import weak_etag
+from .catalog import catalog_last_modified, get_catalog_version
+
+
+def catalog_cache(max_age=60, stale_while_revalidate=300, extra_state=None):
+    """
+    Mark a view as cacheable for anonymous visitors. If the page also shows
+    data the catalog version doesn't cover (view counts), extra_state(request)
+    returns its (version, unix timestamp), or None when this request doesn't
+    depend on it.
+    """
+    def decorator(view):
+        # read by ConditionalCatalogMiddleware.process_view
+        view.http_cache_policy = {
+            "max_age": max_age,
+            "stale_while_revalidate": stale_while_revalidate,
+            "extra_state": extra_state,
+        }
+        return view
+    return decorator
+
+
+def cache_per_catalog_version(timeout=24 * 60 * 60):
+    """
+    Keep the whole rendered response in the shared cache, keyed by catalog
+    version and absolute URL. Used for sitemaps and feeds so crawler traffic
+    never reaches the ORM between catalog changes.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            url_hash = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+            key = f"catalog:page:{get_catalog_version()}:{url_hash}"
+
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            response = view(request, *args, **kwargs)
+            if hasattr(response, "render") and callable(response.render):
+                response = response.render()
+            if response.status_code == 200 and not response.streaming:
+                cache.set(key, (response.content, response["Content-Type"]), timeout)
+            return response
+        return wrapper
+    return decorator
+
+
+def carries_csrf_token(request):
+    """
+    True when the response embeds a CSRF token. Django marks the request
+    with CSRF_COOKIE_NEEDS_UPDATE as soon as get_token() is called (the
+    value is reset to False once the cookie is written, the key stays).
+    """
+    return "CSRF_COOKIE_NEEDS_UPDATE" in request.META
+
+
+def is_cacheable_request(request):
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if request.user.is_authenticated:
+        return False
+    # a pending flash message makes the page personal
+    return "messages" not in request.COOKIES
+
+
+class ConditionalCatalogMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        policy = getattr(request, "_http_cache_policy", None)
+        if policy is None:
+            return response
+
+        patch_vary_headers(response, ("Cookie",))
+
+        if not request._http_cache_public or response.status_code not in (200, 304):
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        if response.cookies or carries_csrf_token(request):
+            # page carries a CSRF token / sets a cookie: must not be shared
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        response["ETag"] = request._http_cache_etag
+        if request._http_cache_last_modified:
+            response["Last-Modified"] = http_date(request._http_cache_last_modified)
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=policy["max_age"],
+            stale_while_revalidate=policy["stale_while_revalidate"],
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        policy = getattr(view_func, "http_cache_policy", None)
+        if policy is None:
+            return None
+
+        request._http_cache_policy = policy
+        request._http_cache_public = is_cacheable_request(request)
+        if not request._http_cache_public:
+            return None
+
+        versions = [get_catalog_version()]
+        last_modified = catalog_last_modified()
+        extra = policy["extra_state"](request) if policy["extra_state"] else None
+        if extra is not None:
+            versions.append(extra[0])
+            last_modified = max(last_modified, int(extra[1]))
+
+        request._http_cache_etag = weak_etag("html", *versions, request.get_full_path())
+        request._http_cache_last_modified = last_modified or None
+
+        not_modified = get_conditional_response(
+            request,
+            etag=request._http_cache_etag,
+            last_modified=request._http_cache_last_modified,
+        )
+        # None means "modified": let the view render the page
+        return not_modified
@@ -0,0 +1,252 @@
+# store/jobs.py
+"""
+Small DB-backed job queue (no external broker).
+
+    from store.jobs import enqueue
+    enqueue("send_email", {"to": ..., "subject": ..., "body": ...},
+            idempotency_key=f"verify-email:{user.pk}")
+
+- tasks are plain functions registered with @task (see store/tasks.py)
+- enqueue() writes a Job row in the caller's transaction, so a job only
+  becomes visible to workers once the request that created it commits
+- `python manage.py run_worker --processes N` claims jobs by priority
+  (higher first), then run_at; failures are retried with exponential
+  backoff until max_attempts
+- an idempotency_key can only ever be enqueued once (while the Job row
+  exists: DONE jobs are deleted after JOBS_KEEP_DONE_DAYS)
+- a dedup_key collapses repeated requests for the same work into the one
+  job still waiting to run (e.g. ten edits of a project -> one refresh);
+  the key is released when a worker claims the job, so a change made
+  while it runs queues a fresh one
+- enqueue_many() queues a batch (e.g. one email per order) in one INSERT
+- ScheduledJob rows are turned into Jobs every interval_seconds
+- JOBS_EAGER=True runs jobs in-process right after commit (local dev)
+"""
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job, ScheduledJob
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+# retry delay: BACKOFF_BASE * 2**(attempt-1) seconds, capped, with jitter
+BACKOFF_BASE = 10
+BACKOFF_MAX = 60 * 60
+# a RUNNING job whose worker died is claimable again after this long
+LOCK_TIMEOUT = timedelta(minutes=10)
+
+
+def task(name=None, priority=0, max_attempts=5):
+    """Register a function as a job task."""
+    def decorator(func):
+        func.task_name = name or func.__name__
+        func.task_priority = priority
+        func.task_max_attempts = max_attempts
+        TASKS[func.task_name] = func
+        return func
+    return decorator
+
+
+def get_task(name):
+    try:
+        return TASKS[name]
+    except KeyError:
+        raise LookupError(f"Unknown job task {name!r}") from None
+
+
+def enqueue(task_name, kwargs=None, priority=None, delay=None, run_at=None,
+            idempotency_key=None, max_attempts=None, dedup_key=None):
+    """
+    Queue `task_name` (a registered name or @task function) with JSON
+    kwargs. Returns the Job; with an idempotency_key that was already
+    used, or the dedup_key of a job not yet claimed, returns the existing
+    Job instead of creating a new one.
+    """
+    func = get_task(getattr(task_name, "task_name", task_name))
+    if run_at is None:
+        run_at = timezone.now() + (delay or timedelta(0))
+
+    job = Job(
+        task=func.task_name,
+        kwargs=kwargs or {},
+        priority=func.task_priority if priority is None else priority,
+        max_attempts=func.task_max_attempts if max_attempts is None else max_attempts,
+        run_at=run_at,
+        idempotency_key=idempotency_key,
+        dedup_key=dedup_key,
+    )
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        if idempotency_key is not None:
+            return Job.objects.get(idempotency_key=idempotency_key)
+        if dedup_key is None:
+            raise
+        existing = Job.objects.filter(dedup_key=dedup_key).first()
+        if existing is not None:
+            return existing
+        # the pending job was claimed in between, which freed the key
+        with transaction.atomic():
+            job.save()
+
+    if settings.JOBS_EAGER:
+        transaction.on_commit(lambda: run_job(job, worker_id="eager"))
+    return job
+
+
+def enqueue_many(task_name, items, priority=None, delay=None):
+    """
+    Queue one job per (kwargs, idempotency_key) pair with a single bulk
+    INSERT; pairs whose key was already used are skipped.
+    """
+    func = get_task(getattr(task_name, "task_name", task_name))
+    run_at = timezone.now() + (delay or timedelta(0))
+    jobs = [
+        Job(
+            task=func.task_name,
+            kwargs=kwargs or {},
+            priority=func.task_priority if priority is None else priority,
+            max_attempts=func.task_max_attempts,
+            run_at=run_at,
+            idempotency_key=idempotency_key,
+        )
+        for kwargs, idempotency_key in items
+    ]
+    Job.objects.bulk_create(jobs, batch_size=500, ignore_conflicts=True)
+
+    if settings.JOBS_EAGER and jobs:
+        # ignore_conflicts leaves pk unset: look the new rows up by key
+        def run_all():
+            keys = [job.idempotency_key for job in jobs]
+            for job in Job.objects.filter(idempotency_key__in=keys, status=Job.STATUS_QUEUED):
+                run_job(job, worker_id="eager")
+        transaction.on_commit(run_all)
+
+
+# -------------------------------------------------------------------
+# WORKER SIDE
+# -------------------------------------------------------------------
+def claimable(now):
+    return Job.objects.filter(
+        Q(status=Job.STATUS_QUEUED, run_at__lte=now)
+        | Q(status=Job.STATUS_RUNNING, locked_at__lt=now - LOCK_TIMEOUT, attempts__lt=F("max_attempts"))
+    )
+
+
+def fail_abandoned(now):
+    """
+    Mark FAILED the RUNNING jobs whose worker died on their last attempt
+    (a job that crashes its worker would otherwise be retried forever).
+    """
+    return Job.objects.filter(
+        status=Job.STATUS_RUNNING, locked_at__lt=now - LOCK_TIMEOUT, attempts__gte=F("max_attempts")
+    ).update(
+        status=Job.STATUS_FAILED,
+        finished_at=now,
+        locked_by="",
+        locked_at=None,
+        last_error="Worker stopped responding on the last attempt (lock expired)",
+    )
+
+
+def claim(worker_id, batch=10):
+    """
+    Take the next due job. Each candidate is claimed with a conditional
+    UPDATE, so two workers never run the same job (works on SQLite and
+    Postgres alike).
+    """
+    now = timezone.now()
+    fail_abandoned(now)
+    candidates = claimable(now).order_by("-priority", "run_at", "pk").values_list(
+        "pk", "status", "locked_at"
+    )[:batch]
+    for pk, status, locked_at in candidates:
+        claimed = Job.objects.filter(pk=pk, status=status, locked_at=locked_at).update(
+            status=Job.STATUS_RUNNING,
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+            dedup_key=None,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def backoff(attempts):
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def run_job(job, worker_id):
+    if job.status != Job.STATUS_RUNNING:
+        # eager mode: claim it the same way a worker would
+        if not Job.objects.filter(pk=job.pk, status=Job.STATUS_QUEUED).update(
+            status=Job.STATUS_RUNNING, locked_by=worker_id,
+            locked_at=timezone.now(), attempts=F("attempts") + 1, dedup_key=None,
+        ):
+            return
+        job.refresh_from_db()
+
+    try:
+        get_task(job.task)(**job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Job %s failed (attempt %s/%s)", job, job.attempts, job.max_attempts)
+        if job.attempts >= job.max_attempts:
+            update = {"status": Job.STATUS_FAILED, "finished_at": timezone.now()}
+        else:
+            update = {
+                "status": Job.STATUS_QUEUED,
+                "run_at": timezone.now() + backoff(job.attempts),
+            }
+        Job.objects.filter(pk=job.pk, locked_by=worker_id).update(
+            last_error=error, locked_by="", locked_at=None, **update
+        )
+        return False
+
+    Job.objects.filter(pk=job.pk, locked_by=worker_id).update(
+        status=Job.STATUS_DONE, finished_at=timezone.now(), locked_by="", locked_at=None,
+    )
+    return True
+
+
+def enqueue_scheduled():
+    """Turn every due ScheduledJob into a Job (once per slot, across workers)."""
+    now = timezone.now()
+    count = 0
+    for scheduled in ScheduledJob.objects.filter(is_active=True, next_run_at__lte=now):
+        slot = scheduled.next_run_at
+        # move next_run_at forward past now, skipping slots missed while down
+        missed = int((now - slot).total_seconds() // scheduled.interval_seconds) + 1
+        next_run_at = slot + timedelta(seconds=missed * scheduled.interval_seconds)
+        if not ScheduledJob.objects.filter(pk=scheduled.pk, next_run_at=slot).update(
+            next_run_at=next_run_at
+        ):
+            continue  # another worker took this slot
+        enqueue(
+            scheduled.task,
+            scheduled.kwargs,
+            priority=scheduled.priority,
+            idempotency_key=f"scheduled:{scheduled.name}:{slot.isoformat()}",
+        )
+        count += 1
+    return count
+
+
+def prune_done(now=None):
+    """Delete DONE jobs older than JOBS_KEEP_DONE_DAYS; returns how many."""
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=settings.JOBS_KEEP_DONE_DAYS)
+    deleted, _ = Job.objects.filter(status=Job.STATUS_DONE, finished_at__lt=cutoff).delete()
+    return deleted
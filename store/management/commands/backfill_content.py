@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from store.catalog import bump_catalog_version
+from store.content import make_excerpt, reading_time, render, source_hash
+from store.models import BlogPost, Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the stored HTML, excerpt and reading_time of blog posts "
+        "and projects (e.g. after changing store/content.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report rows whose stored values are out of date",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        post_fields = ["content_html", "content_hash", "excerpt", "reading_time"]
+        posts = []
+        for post in BlogPost.objects.only("id", "content", "content_format", *post_fields).iterator(
+            chunk_size=batch_size
+        ):
+            digest = source_hash(post.content, post.content_format)
+            html = post.content_html
+            if digest != post.content_hash:
+                html = render(post.content, post.content_format)
+            values = {
+                "content_html": html,
+                "content_hash": digest,
+                "excerpt": make_excerpt(html),
+                "reading_time": reading_time(html),
+            }
+            if any(getattr(post, k) != v for k, v in values.items()):
+                for k, v in values.items():
+                    setattr(post, k, v)
+                posts.append(post)
+
+        project_fields = ["description_html", "description_hash", "excerpt"]
+        projects = []
+        for project in Project.objects.only("id", "description", *project_fields).iterator(
+            chunk_size=batch_size
+        ):
+            digest = source_hash(project.description)
+            html = project.description_html
+            if digest != project.description_hash:
+                html = render(project.description)
+            values = {
+                "description_html": html,
+                "description_hash": digest,
+                "excerpt": make_excerpt(html),
+            }
+            if any(getattr(project, k) != v for k, v in values.items()):
+                for k, v in values.items():
+                    setattr(project, k, v)
+                projects.append(project)
+
+        if not options["dry_run"] and (posts or projects):
+            with transaction.atomic():
+                BlogPost.objects.bulk_update(posts, post_fields, batch_size=batch_size)
+                Project.objects.bulk_update(projects, project_fields, batch_size=batch_size)
+                # bulk_update skips the signals that invalidate cached pages
+                bump_catalog_version()
+
+        verb = "out of date" if options["dry_run"] else "updated"
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(posts)} post(s) and {len(projects)} project(s) {verb}.")
+        )
@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark password checks per second on one core for each hasher "
+        "profile in settings.PASSWORD_HASHER_PROFILES (the CPU cost of a login)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=3.0, help="Duration of each run")
+        parser.add_argument("--password", default="correct horse battery staple")
+
+    def handle(self, *args, **options):
+        rows = []
+        for profile, hashers in settings.PASSWORD_HASHER_PROFILES.items():
+            hasher = import_string(hashers[0])()
+            try:
+                encoded = make_password(options["password"], hasher=hasher)
+            except ValueError as exc:
+                # e.g. argon2-cffi not installed
+                self.stdout.write(self.style.WARNING(f"{profile}: skipped ({exc})"))
+                continue
+            if not check_password(options["password"], encoded) or check_password("wrong", encoded):
+                raise CommandError(f"{profile}: {hasher.algorithm} does not verify its own hash")
+            rows.append((profile, hasher.algorithm, self.run(encoded, options)))
+
+        current = get_hasher().algorithm
+        self.stdout.write("")
+        self.stdout.write(f"{'profile':<10}{'algorithm':<16}{'ms/login':>10}{'logins/s/core':>16}")
+        for profile, algorithm, (checks, seconds) in rows:
+            marker = "  <- active" if profile == settings.PASSWORD_HASHER_PROFILE else ""
+            self.stdout.write(
+                f"{profile:<10}{algorithm:<16}{seconds / checks * 1000:>10.2f}"
+                f"{checks / seconds:>16.1f}{marker}"
+            )
+        self.stdout.write(f"\nnew passwords are hashed with: {current}")
+
+    def run(self, encoded, options):
+        password = options["password"]
+        checks = 0
+        start = time.perf_counter()
+        deadline = start + options["seconds"]
+        while time.perf_counter() < deadline:
+            if not check_password(password, encoded):
+                raise CommandError("password check failed during the benchmark")
+            checks += 1
+        return checks, time.perf_counter() - start
@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from store.db import apply_sqlite_pragmas
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark SQLite reader throughput while a writer is inserting rows, "
+        "with and without the SQLITE_PRAGMAS connection hook."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run")
+        parser.add_argument("--readers", type=int, default=4, help="Number of reader threads")
+        parser.add_argument("--rows", type=int, default=2000, help="Rows seeded before the run")
+
+    def handle(self, *args, **options):
+        results = []
+        for label, pragmas in (
+            ("default pragmas", {}),
+            ("tuned pragmas", settings.SQLITE_PRAGMAS),
+        ):
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "bench.sqlite3")
+                results.append(
+                    (label, self.run(path, pragmas, options["seconds"], options["readers"], options["rows"]))
+                )
+
+        self.stdout.write("")
+        self.stdout.write(f"{'mode':<18}{'reads/s':>12}{'writes/s':>12}{'locked':>10}")
+        for label, r in results:
+            self.stdout.write(
+                f"{label:<18}{r['reads'] / r['seconds']:>12.0f}"
+                f"{r['writes'] / r['seconds']:>12.0f}{r['locked']:>10}"
+            )
+
+    def connect(self, path, pragmas):
+        # same defaults as Django's sqlite3 backend (5s busy handler)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        apply_sqlite_pragmas(conn.cursor(), pragmas)
+        return conn
+
+    def run(self, path, pragmas, seconds, readers, rows):
+        conn = self.connect(path, pragmas)
+        conn.execute(
+            "CREATE TABLE message (id INTEGER PRIMARY KEY, name TEXT, body TEXT, created REAL)"
+        )
+        conn.executemany(
+            "INSERT INTO message (name, body, created) VALUES (?, ?, ?)",
+            [(f"user{i}", "x" * 200, time.time()) for i in range(rows)],
+        )
+        conn.commit()
+        conn.close()
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        totals = {"reads": 0, "writes": 0, "locked": 0}
+
+        def bump(key, n=1):
+            with lock:
+                totals[key] += n
+
+        def writer():
+            w = self.connect(path, pragmas)
+            while not stop.is_set():
+                try:
+                    w.execute(
+                        "INSERT INTO message (name, body, created) VALUES (?, ?, ?)",
+                        ("writer", "y" * 200, time.time()),
+                    )
+                    w.commit()
+                    bump("writes")
+                except sqlite3.OperationalError:
+                    w.rollback()
+                    bump("locked")
+            w.close()
+
+        def reader():
+            r = self.connect(path, pragmas)
+            while not stop.is_set():
+                try:
+                    r.execute(
+                        "SELECT id, name FROM message ORDER BY id DESC LIMIT 20"
+                    ).fetchall()
+                    bump("reads")
+                except sqlite3.OperationalError:
+                    bump("locked")
+            r.close()
+
+        threads = [threading.Thread(target=writer)]
+        threads += [threading.Thread(target=reader) for _ in range(readers)]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+
+        totals["seconds"] = seconds
+        return totals
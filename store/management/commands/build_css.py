@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from store import css
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile the Tailwind utility classes used by the templates into "
+        f"{css.OUTPUT} (offline; run it after changing classes in a template)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Don't write; exit with an error if the stylesheet is out of date",
+        )
+
+    def handle(self, *args, **options):
+        output = Path(settings.BASE_DIR) / css.OUTPUT
+        stylesheet, count = css.build()
+        current = output.read_text(encoding="utf-8") if output.exists() else None
+
+        if options["check"]:
+            if current != stylesheet:
+                raise CommandError(f"{css.OUTPUT} is out of date; run `manage.py build_css`.")
+            self.stdout.write(self.style.SUCCESS(f"{css.OUTPUT} is up to date."))
+            return
+
+        if current != stylesheet:
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(stylesheet, encoding="utf-8")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{css.OUTPUT}: {count} utilities, {len(stylesheet.encode()) / 1024:.1f} KB."
+            )
+        )
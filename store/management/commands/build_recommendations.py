@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from store import recommend
+from store.models import RelatedItem
+
+
+class Command(BaseCommand):
+    help = "Rebuild the precomputed related-projects / related-posts table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind",
+            choices=[RelatedItem.KIND_PROJECT, RelatedItem.KIND_POST],
+            help="Only rebuild one kind (default: both)",
+        )
+
+    def handle(self, *args, **options):
+        kinds = [options["kind"]] if options["kind"] else [
+            RelatedItem.KIND_PROJECT,
+            RelatedItem.KIND_POST,
+        ]
+        for kind in kinds:
+            count = recommend.rebuild(kind)
+            self.stdout.write(self.style.SUCCESS(f"{kind}: {count} related row(s) written."))
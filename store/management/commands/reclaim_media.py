@@ -0,0 +1,108 @@
+import os
+import shutil
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from store.catalog import bump_catalog_version
+from store.models import BlogPost, Project, ProjectImage
+from store.storage import content_storage, file_digest, hashed_name, is_hashed
+
+MEDIA_FIELDS = [
+    (Project, "thumbnail"),
+    (Project, "project_file"),
+    (ProjectImage, "image"),
+    (BlogPost, "image"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Move uploads into the content-addressed layout (merging duplicates) "
+        "and delete media files no row refers to."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would be moved and deleted",
+        )
+        parser.add_argument(
+            "--grace-minutes",
+            type=int,
+            default=60,
+            help="Keep unreferenced files younger than this (uploads whose row isn't saved yet)",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        storage = content_storage
+
+        # ---- 1. legacy names -> content hashes ----
+        targets = {}  # old name -> hashed name
+        updates = []  # (model, field, pk, new name)
+        missing = 0
+        for model, field in MEDIA_FIELDS:
+            rows = model.objects.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True})
+            for pk, name in rows.values_list("pk", field):
+                if is_hashed(name):
+                    continue
+                if name not in targets:
+                    if not storage.exists(name):
+                        missing += 1
+                        self.stdout.write(self.style.WARNING(f"missing: {name}"))
+                        continue
+                    with storage.open(name) as f:
+                        targets[name] = hashed_name(name, file_digest(f))
+                updates.append((model, field, pk, targets[name]))
+
+        if not dry_run:
+            for old, new in targets.items():
+                if not storage.exists(new):
+                    os.makedirs(os.path.dirname(storage.path(new)), exist_ok=True)
+                    shutil.copy2(storage.path(old), storage.path(new))
+            with transaction.atomic():
+                for model, field, pk, new in updates:
+                    model.objects.filter(pk=pk).update(**{field: new})
+                if updates:
+                    # .update() skips the signals that invalidate cached pages
+                    bump_catalog_version()
+
+        # ---- 2. orphans ----
+        referenced = set()
+        for model, field in MEDIA_FIELDS:
+            referenced.update(model.objects.values_list(field, flat=True))
+        if dry_run:
+            referenced = {targets.get(name, name) for name in referenced}
+        referenced.discard(None)
+        referenced.discard("")
+
+        cutoff = time.time() - options["grace_minutes"] * 60
+        orphans, reclaimed = 0, 0
+        upload_dirs = {model._meta.get_field(field).upload_to.strip("/") for model, field in MEDIA_FIELDS}
+        for upload_dir in sorted(upload_dirs):
+            root = storage.path(upload_dir)
+            for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    name = os.path.relpath(path, storage.location).replace(os.sep, "/")
+                    if name in referenced or os.path.getmtime(path) > cutoff:
+                        continue
+                    orphans += 1
+                    reclaimed += os.path.getsize(path)
+                    self.stdout.write(f"orphan: {name}")
+                    if not dry_run:
+                        os.remove(path)
+                if not dry_run and dirpath != root and not os.listdir(dirpath):
+                    os.rmdir(dirpath)
+
+        verb = "would be" if dry_run else "were"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(updates)} reference(s) to {len(targets)} file(s) {verb} rehashed; "
+                f"{orphans} orphan(s) ({reclaimed / 1024:.0f} KB) {verb} deleted; "
+                f"{missing} missing."
+            )
+        )
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from store.catalog import bump_catalog_version
+from store.models import Order, OrderReview, Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the denormalized Project counters "
+        "(rating_sum, rating_count, orders_completed) from orders and reviews."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report projects whose counters are out of sync",
+        )
+
+    def handle(self, *args, **options):
+        # two grouped queries for the whole catalog instead of one per project
+        ratings = {
+            row["order__project"]: (row["total"], row["count"])
+            for row in OrderReview.objects.values("order__project").annotate(
+                total=Sum("rating"), count=Count("id")
+            )
+        }
+        completed = dict(
+            Order.objects.filter(status="completed")
+            .values("project")
+            .annotate(count=Count("id"))
+            .values_list("project", "count")
+        )
+
+        changed = []
+        projects = Project.objects.only(
+            "id", "rating_sum", "rating_count", "orders_completed"
+        )
+        for project in projects.iterator(chunk_size=options["batch_size"]):
+            rating_sum, rating_count = ratings.get(project.id, (0, 0))
+            orders_completed = completed.get(project.id, 0)
+            if (
+                project.rating_sum != rating_sum
+                or project.rating_count != rating_count
+                or project.orders_completed != orders_completed
+            ):
+                project.rating_sum = rating_sum
+                project.rating_count = rating_count
+                project.orders_completed = orders_completed
+                changed.append(project)
+
+        if not options["dry_run"] and changed:
+            with transaction.atomic():
+                Project.objects.bulk_update(
+                    changed,
+                    ["rating_sum", "rating_count", "orders_completed"],
+                    batch_size=options["batch_size"],
+                )
+                # bulk_update sends no signals: refresh ETags / cached pages
+                bump_catalog_version()
+
+        verb = "out of sync" if options["dry_run"] else "updated"
+        self.stdout.write(self.style.SUCCESS(f"{len(changed)} project(s) {verb}."))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from store import analytics
+from store.models import AnalyticsState
+
+
+class Command(BaseCommand):
+    help = (
+        "Update the DailySales rollups behind the admin sales dashboard "
+        "with the orders created or changed since the last run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recompute every day (also picks up deleted orders)",
+        )
+
+    def handle(self, *args, **options):
+        days = analytics.refresh(full=options["full"])
+        through = timezone.localtime(AnalyticsState.load().orders_through)
+        self.stdout.write(
+            self.style.SUCCESS(f"{days} day(s) recomputed; rollups current through {through:%Y-%m-%d %H:%M:%S}.")
+        )
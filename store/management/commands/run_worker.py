@@ -0,0 +1,74 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from store.jobs import claim, enqueue_scheduled, prune_done, run_job
+
+# how often each worker deletes old DONE jobs
+PRUNE_INTERVAL = 60 * 60
+
+
+class Command(BaseCommand):
+    help = "Run background job workers for the DB-backed queue (store/jobs.py)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=1, help="Worker processes to start")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty")
+        parser.add_argument("--once", action="store_true", help="Drain due jobs and exit")
+
+    def handle(self, *args, **options):
+        processes = max(options["processes"], 1)
+        if processes == 1 or options["once"]:
+            self.work(0, options)
+            return
+
+        # children must not share the parent's DB connections
+        connections.close_all()
+        children = [
+            multiprocessing.Process(target=self.work, args=(i, options), daemon=True)
+            for i in range(processes)
+        ]
+        for child in children:
+            child.start()
+        self.stdout.write(f"Started {processes} workers")
+
+        def stop(signum, frame):
+            for child in children:
+                if child.is_alive():
+                    os.kill(child.pid, signal.SIGTERM)
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        for child in children:
+            child.join()
+
+    def work(self, index, options):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+        stopping = []
+        # finish the current job, then exit
+        signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+        signal.signal(signal.SIGINT, lambda signum, frame: stopping.append(signum))
+
+        processed = 0
+        pruned_at = None
+        while not stopping:
+            close_old_connections()
+            enqueue_scheduled()
+            if pruned_at is None or time.monotonic() - pruned_at > PRUNE_INTERVAL:
+                prune_done()
+                pruned_at = time.monotonic()
+            job = claim(worker_id)
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+                continue
+            run_job(job, worker_id)
+            processed += 1
+
+        self.stdout.write(f"Worker {worker_id} stopped after {processed} jobs")
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0007_profile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='orders_completed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0008_project_rating_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('project', 'Project'), ('post', 'Blog post')], max_length=10)),
+                ('source_id', models.PositiveIntegerField()),
+                ('target_id', models.PositiveIntegerField()),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'source_id', 'rank'], name='store_relat_kind_7bcc78_idx'), models.Index(fields=['kind', 'target_id'], name='store_relat_kind_b3d9c0_idx')],
+            },
+        ),
+    ]
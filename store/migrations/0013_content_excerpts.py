@@ -0,0 +1,67 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:22
+
+import html
+import math
+import re
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+# Frozen copies of store/content.py as of this migration: a migration
+# must keep producing the same data when the live helpers change.
+EXCERPT_WORDS = 40
+WORDS_PER_MINUTE = 200
+
+_whitespace = re.compile(r"\s+")
+
+
+def plain_text(source):
+    return _whitespace.sub(" ", html.unescape(strip_tags(source or ""))).strip()
+
+
+def make_excerpt(source):
+    return Truncator(plain_text(source)).words(EXCERPT_WORDS)
+
+
+def reading_time(source):
+    return max(1, math.ceil(len(plain_text(source).split()) / WORDS_PER_MINUTE))
+
+
+def backfill(apps, schema_editor):
+    # same as `manage.py backfill_content`, with the historical models
+    BlogPost = apps.get_model("store", "BlogPost")
+    Project = apps.get_model("store", "Project")
+    for post in BlogPost.objects.only("id", "content").iterator():
+        BlogPost.objects.filter(pk=post.pk).update(
+            excerpt=make_excerpt(post.content),
+            reading_time=reading_time(post.content),
+        )
+    for project in Project.objects.only("id", "description").iterator():
+        Project.objects.filter(pk=project.pk).update(excerpt=make_excerpt(project.description))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0012_orderevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=1, editable=False, help_text='Minutes'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:24
+
+import hashlib
+import html
+import math
+import re
+
+from django.db import migrations, models
+from django.utils.html import escape, linebreaks, strip_tags
+from django.utils.text import Truncator
+
+try:
+    import markdown
+except ImportError:
+    markdown = None
+
+try:
+    import nh3
+except ImportError:
+    nh3 = None
+
+# Frozen copies of store/content.py as of this migration: a migration
+# must keep producing the same data when the live helpers change. Rows
+# rendered here carry RENDERER_VERSION 1 in their hash, so a later
+# renderer bump re-renders them through `manage.py backfill_content`.
+RENDERER_VERSION = 1
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists"]
+EXCERPT_WORDS = 40
+WORDS_PER_MINUTE = 200
+
+_whitespace = re.compile(r"\s+")
+
+
+def source_hash(source, fmt="plain"):
+    raw = f"{RENDERER_VERSION}:{fmt}:{source or ''}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def render(source, fmt="plain"):
+    source = source or ""
+    if fmt == "markdown" and markdown is not None:
+        if nh3 is None:
+            return markdown.markdown(escape(source), extensions=MARKDOWN_EXTENSIONS)
+        return nh3.clean(
+            markdown.markdown(source, extensions=MARKDOWN_EXTENSIONS),
+            link_rel="noopener noreferrer nofollow",
+        )
+    return linebreaks(source, autoescape=True)
+
+
+def plain_text(source):
+    return _whitespace.sub(" ", html.unescape(strip_tags(source or ""))).strip()
+
+
+def make_excerpt(source):
+    return Truncator(plain_text(source)).words(EXCERPT_WORDS)
+
+
+def reading_time(source):
+    return max(1, math.ceil(len(plain_text(source).split()) / WORDS_PER_MINUTE))
+
+
+def render_existing(apps, schema_editor):
+    # same as `manage.py backfill_content`, with the historical models
+    BlogPost = apps.get_model("store", "BlogPost")
+    Project = apps.get_model("store", "Project")
+    for post in BlogPost.objects.only("id", "content", "content_format").iterator():
+        html = render(post.content, post.content_format)
+        BlogPost.objects.filter(pk=post.pk).update(
+            content_html=html,
+            content_hash=source_hash(post.content, post.content_format),
+            excerpt=make_excerpt(html),
+            reading_time=reading_time(html),
+        )
+    for project in Project.objects.only("id", "description").iterator():
+        html = render(project.description)
+        Project.objects.filter(pk=project.pk).update(
+            description_html=html,
+            description_hash=source_hash(project.description),
+            excerpt=make_excerpt(html),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0013_content_excerpts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_format',
+            field=models.CharField(choices=[('plain', 'Plain text'), ('markdown', 'Markdown')], default='plain', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='description_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='description_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:32
+
+from django.db import migrations, models
+import store.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0014_rendered_html'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blogpost',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=store.storage.ContentAddressedStorage(), upload_to='blog_images/'),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='project_file',
+            field=models.FileField(blank=True, null=True, storage=store.storage.ContentAddressedStorage(), upload_to='projects/'),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='thumbnail',
+            field=models.ImageField(blank=True, null=True, storage=store.storage.ContentAddressedStorage(), upload_to='thumbnails/'),
+        ),
+        migrations.AlterField(
+            model_name='projectimage',
+            name='image',
+            field=models.ImageField(storage=store.storage.ContentAddressedStorage(), upload_to='project_images/'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0016_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['is_active', '-view_count'], name='project_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['is_active', '-trending_score'], name='project_trending_idx'),
+        ),
+    ]
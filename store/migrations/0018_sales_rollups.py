@@ -0,0 +1,46 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0017_view_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('orders_through', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('category', models.CharField(choices=[('web', 'Web Development'), ('ml', 'Machine Learning / AI'), ('desktop', 'Desktop Application'), ('mobile', 'Mobile App'), ('iot', 'IoT / Hardware'), ('other', 'Other')], max_length=20)),
+                ('level', models.CharField(choices=[('beginner', 'Beginner'), ('intermediate', 'Intermediate'), ('advanced', 'Advanced')], max_length=20)),
+                ('orders', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('cancelled', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('views', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'daily sales',
+            },
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddConstraint(
+            model_name='dailysales',
+            constraint=models.UniqueConstraint(fields=('day', 'category', 'level'), name='daily_sales_unique'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0018_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailysales',
+            name='cart_adds',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
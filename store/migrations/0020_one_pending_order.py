@@ -0,0 +1,44 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:44
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def cancel_duplicate_pending_orders(apps, schema_editor):
+    # keep the oldest pending order per (user, project), cancel the repeats
+    Order = apps.get_model("store", "Order")
+    OrderEvent = apps.get_model("store", "OrderEvent")
+    kept = {}
+    for order in Order.objects.filter(status="pending").order_by("created_at", "id"):
+        first = kept.setdefault((order.user_id, order.project_id), order.id)
+        if first == order.id:
+            continue
+        note = f"Cancelled automatically: duplicate of order #{first}."
+        Order.objects.filter(pk=order.pk).update(
+            status="cancelled",
+            notes=f"{order.notes}\n{note}".strip(),
+            updated_at=timezone.now(),
+        )
+        OrderEvent.objects.create(
+            order_id=order.pk, user_id=order.user_id, from_status="pending", to_status="cancelled",
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0019_dailysales_cart_adds'),
+    ]
+
+    operations = [
+        migrations.RunPython(cancel_duplicate_pending_orders, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='order',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddConstraint(
+            model_name='order',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('user', 'project'), name='one_pending_order_per_project'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-19 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0020_one_pending_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='dedup_key',
+            field=models.CharField(blank=True, max_length=200, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.27 on 2026-10-19 17:40
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_project_prices(apps, schema_editor):
+    # the price at order time was never stored: the current one is the
+    # best there is for existing orders
+    Order = apps.get_model("store", "Order")
+    Project = apps.get_model("store", "Project")
+    Order.objects.update(price=Subquery(Project.objects.filter(pk=OuterRef("project_id")).values("price")[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0022_chunkedupload_activity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='price',
+            field=models.DecimalField(decimal_places=2, editable=False, max_digits=8, null=True),
+        ),
+        migrations.RunPython(copy_project_prices, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='order',
+            name='price',
+            field=models.DecimalField(decimal_places=2, editable=False, max_digits=8),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-19 21:05
+
+from django.db import migrations
+
+SCHEDULE = [
+    # name, task, priority, interval_seconds
+    # also enqueued by store/hits.py after a view; this keeps trending
+    # decaying when nobody is browsing
+    ("flush-view-counts", "flush_view_counts", -5, 60),
+    ("refresh-sales-rollups", "refresh_sales_rollups", -10, 15 * 60),
+]
+
+
+def schedule_jobs(apps, schema_editor):
+    # get_or_create: intervals changed in the admin are left alone
+    ScheduledJob = apps.get_model("store", "ScheduledJob")
+    for name, task, priority, interval in SCHEDULE:
+        ScheduledJob.objects.get_or_create(
+            name=name, defaults={"task": task, "priority": priority, "interval_seconds": interval},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0024_project_counters_not_editable'),
+    ]
+
+    operations = [
+        migrations.RunPython(schedule_jobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.27 on 2026-10-19 21:40
+
+from django.db import migrations
+
+
+def schedule_expire_uploads(apps, schema_editor):
+    # get_or_create: an interval changed in the admin is left alone
+    ScheduledJob = apps.get_model("store", "ScheduledJob")
+    ScheduledJob.objects.get_or_create(
+        name="expire-uploads",
+        defaults={"task": "expire_uploads", "kwargs": {"hours": 24}, "priority": -10, "interval_seconds": 60 * 60},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0025_schedule_view_flush_and_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(schedule_expire_uploads, migrations.RunPython.noop),
+    ]
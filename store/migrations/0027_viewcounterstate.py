@@ -0,0 +1,21 @@
+# Generated by Django 4.2.27 on 2026-10-19 22:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0026_schedule_expire_uploads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewCounterState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('flushed_at', models.DateTimeField(blank=True, null=True)),
+                ('changed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
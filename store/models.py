@@ -1,5 +1,11 @@
+import uuid
+
 from django.db import models
+from django.utils import timezone
 from django.utils.text import slugify
+
+from .content import FORMAT_CHOICES, FORMAT_PLAIN, make_excerpt, reading_time, render, source_hash
+from .storage import content_storage
 from django.contrib.auth.models import User
 from django.db import models
 
@@ -11,6 +17,22 @@ class Profile(models.Model):
     phone = models.CharField(max_length=15, unique=True)
 
 
+# written only with queryset UPDATEs (view counts by store/hits.py, the
+# review / order counters by store/signals.py); a full save() of an instance
+# loaded earlier (e.g. the admin form) must not put old values back
+COUNTER_FIELDS = ("view_count", "trending_score", "rating_sum", "rating_count", "orders_completed")
+
+
+def skip_counters(instance, kwargs):
+    if instance._state.adding or kwargs.get("force_insert") or kwargs.get("update_fields") is not None:
+        return
+    deferred = instance.get_deferred_fields()
+    kwargs["update_fields"] = [
+        f.name for f in instance._meta.concrete_fields
+        if not f.primary_key and f.attname not in deferred and f.name not in COUNTER_FIELDS
+    ]
+
+
 class Project(models.Model):
     CATEGORY_CHOICES = [
         ('web', 'Web Development'),
@@ -36,15 +58,46 @@ class Project(models.Model):
     level = models.CharField(max_length=20, choices=LEVEL_CHOICES, default='beginner')
     duration_weeks = models.PositiveIntegerField(default=4, help_text="Approx. time to complete (in weeks)")
     price = models.DecimalField(max_digits=8, decimal_places=2)
-    thumbnail = models.ImageField(upload_to='thumbnails/', blank=True, null=True)
-    project_file = models.FileField(upload_to='projects/', blank=True, null=True)
+    thumbnail = models.ImageField(upload_to='thumbnails/', storage=content_storage, blank=True, null=True)
+    project_file = models.FileField(upload_to='projects/', storage=content_storage, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     is_active = models.BooleanField(default=True)
     is_featured = models.BooleanField(default=True)
 
+    # denormalized counters, kept in sync by store/signals.py
+    # (run `manage.py reconcile_project_stats` to rebuild them)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    orders_completed = models.PositiveIntegerField(default=0, editable=False)
+
+    # page views, flushed in batches by store/hits.py; trending_score is
+    # the view count with older views decayed (half-life TRENDING_HALF_LIFE_HOURS)
+    view_count = models.PositiveIntegerField(default=0, editable=False)
+    trending_score = models.FloatField(default=0, editable=False)
+
+    # derived from description on save (store/content.py): detail pages
+    # show the stored HTML, list pages the excerpt (and defer() the rest)
+    description_html = models.TextField(blank=True, editable=False)
+    description_hash = models.CharField(max_length=64, blank=True, editable=False)
+    excerpt = models.TextField(blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # project_list ?sort=popular / ?sort=trending and the home page
+            models.Index(fields=['is_active', '-view_count'], name='project_popular_idx'),
+            models.Index(fields=['is_active', '-trending_score'], name='project_trending_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
+    @property
+    def rating_average(self):
+        if not self.rating_count:
+            return None
+        return round(self.rating_sum / self.rating_count, 1)
+
     def save(self, *args, **kwargs):
         # Auto-generate slug from title if not set
         if not self.slug:
@@ -59,6 +112,19 @@ class Project(models.Model):
 
             self.slug = slug
 
+        skip_counters(self, kwargs)
+        if "description" not in self.get_deferred_fields():
+            digest = source_hash(self.description)
+            if digest != self.description_hash:
+                self.description_html = render(self.description)
+                self.description_hash = digest
+                self.excerpt = make_excerpt(self.description_html)
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "description" in update_fields:
+                kwargs["update_fields"] = {
+                    *update_fields, "description_html", "description_hash", "excerpt",
+                }
+
         super().save(*args, **kwargs)
 
 
@@ -69,19 +135,48 @@ class BlogPost(models.Model):
     slug = models.SlugField(unique=True, blank=True)
 
     content = models.TextField()
+    content_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default=FORMAT_PLAIN)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     is_published = models.BooleanField(default=False)
 
     # NEW: blog image / thumbnail
     image = models.ImageField(
         upload_to='blog_images/',
+        storage=content_storage,
         blank=True,
         null=True
     )
 
+    # derived from content on save (store/content.py): detail pages show
+    # the stored HTML, list pages the excerpt (and defer() the rest)
+    content_html = models.TextField(blank=True, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+    excerpt = models.TextField(blank=True, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=1, editable=False, help_text="Minutes")
+
+    # page views, flushed in batches by store/hits.py
+    view_count = models.PositiveIntegerField(default=0, editable=False)
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        skip_counters(self, kwargs)
+        if not {"content", "content_format"} & self.get_deferred_fields():
+            digest = source_hash(self.content, self.content_format)
+            if digest != self.content_hash:
+                self.content_html = render(self.content, self.content_format)
+                self.content_hash = digest
+                self.excerpt = make_excerpt(self.content_html)
+                self.reading_time = reading_time(self.content_html)
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and {"content", "content_format"} & set(update_fields):
+                kwargs["update_fields"] = {
+                    *update_fields, "content_html", "content_hash", "excerpt", "reading_time",
+                }
+        super().save(*args, **kwargs)
+
 
 
 class ContactMessage(models.Model):
@@ -116,22 +211,54 @@ class Order(models.Model):
         related_name='orders'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # watermark for the sales rollups (store/analytics.py); set it by hand
+    # in queryset.update() calls
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
         default='pending'
     )
     notes = models.TextField(blank=True)
+    # Project.price when the order was placed: revenue (store/analytics.py)
+    # must not change when the project is repriced later
+    price = models.DecimalField(max_digits=8, decimal_places=2, editable=False)
+    # from the buy form: a resubmitted form finds its order instead of
+    # creating another (views.buy_project)
+    idempotency_key = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'project'],
+                condition=models.Q(status='pending'),
+                name='one_pending_order_per_project',
+            ),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} - {self.user.username} - {self.project.title}"
+
+    def save(self, *args, **kwargs):
+        if self.price is None:
+            self.price = self.project.price
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the stored status so signals can detect transitions
+        instance._loaded_status = instance.__dict__.get("status")
+        return instance
+
+
 class ProjectImage(models.Model):
     project = models.ForeignKey(
         Project,
         on_delete=models.CASCADE,
         related_name='images'
     )
-    image = models.ImageField(upload_to='project_images/')
+    image = models.ImageField(upload_to='project_images/', storage=content_storage)
     caption = models.CharField(max_length=200, blank=True)
 
     def __str__(self):
@@ -149,6 +276,13 @@ class OrderReview(models.Model):
 
     def __str__(self):
         return f"Review for Order #{self.order.id}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the stored rating so signals can apply the difference
+        instance._loaded_rating = instance.__dict__.get("rating")
+        return instance
     
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
@@ -165,4 +299,218 @@ class Profile(models.Model):
         return f"Profile of {self.user.username}"
 
 
+class RelatedItem(models.Model):
+    """
+    Precomputed top-K "related" table (see store/recommend.py).
+    One row per (source, neighbour); looked up by (kind, source_id).
+    """
+    KIND_PROJECT = 'project'
+    KIND_POST = 'post'
+    KIND_CHOICES = [
+        (KIND_PROJECT, 'Project'),
+        (KIND_POST, 'Blog post'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    source_id = models.PositiveIntegerField()
+    target_id = models.PositiveIntegerField()
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'source_id', 'rank']),
+            models.Index(fields=['kind', 'target_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.source_id} -> {self.target_id} ({self.score:.3f})"
+
+
+class CatalogState(models.Model):
+    """
+    Single row holding the global catalog version and the time of the last
+    Project / BlogPost change (see store/catalog.py).
+    """
+    SINGLETON_ID = 1
+
+    version = models.PositiveBigIntegerField(default=1)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Catalog v{self.version}"
+
+    @classmethod
+    def load(cls):
+        obj, _ = cls.objects.get_or_create(pk=cls.SINGLETON_ID)
+        return obj
+
+
+class ViewCounterState(models.Model):
+    """
+    Single row holding when store/hits.py last flushed the view counts
+    (trending decay runs from there) and when a flush last changed one.
+    """
+    SINGLETON_ID = 1
+
+    flushed_at = models.DateTimeField(null=True, blank=True)
+    changed_at = models.DateTimeField(null=True, blank=True)
+
+    @classmethod
+    def load(cls):
+        obj, _ = cls.objects.get_or_create(pk=cls.SINGLETON_ID)
+        return obj
+
+
+class Job(models.Model):
+    """
+    Background job for the DB-backed queue (see store/jobs.py).
+    Claimed by `python manage.py run_worker`.
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    task = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0)  # higher runs first
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    idempotency_key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    # only set while QUEUED: cleared when a worker claims the job
+    dedup_key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at', '-priority']),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
+
+
+class ScheduledJob(models.Model):
+    """
+    Recurring job: run_worker enqueues `task` every `interval_seconds`.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    task = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0)
+    interval_seconds = models.PositiveIntegerField()
+    next_run_at = models.DateTimeField(default=timezone.now)
+    is_active = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"{self.name} (every {self.interval_seconds}s)"
+
+
+class OrderEvent(models.Model):
+    """
+    One row per Order status change (written by store/signals.py);
+    streamed to the customer's open pages by store/events.py.
+    """
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='events')
+    # order owner, denormalised so a watcher's poll is one indexed range scan
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='order_events')
+    from_status = models.CharField(max_length=20, blank=True)
+    to_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id']),
+        ]
+
+    def __str__(self):
+        return f"Order #{self.order_id}: {self.from_status} -> {self.to_status}"
+
+
+class ChunkedUpload(models.Model):
+    """
+    Resumable upload of a Project deliverable (see store/uploads.py).
+    The bytes live in CHUNKED_UPLOAD_DIR until the last chunk arrives.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='uploads')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+    filename = models.CharField(max_length=255)
+    length = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # last chunk received: abandoned uploads are expired from this
+    updated_at = models.DateTimeField(auto_now=True)
+    # a PATCH holds the upload until then (cleared when it ends)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.length})"
+
+
+class DailySales(models.Model):
+    """
+    Orders, revenue, detail-page views and cart adds per day, category
+    and level. Rebuilt from Order by store/analytics.py (views and cart
+    adds come from store/hits.py); the admin sales dashboard reads only
+    this table.
+    """
+    day = models.DateField()
+    category = models.CharField(max_length=20, choices=Project.CATEGORY_CHOICES)
+    level = models.CharField(max_length=20, choices=Project.LEVEL_CHOICES)
+    orders = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    cancelled = models.PositiveIntegerField(default=0)
+    # project price of the completed orders
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    views = models.PositiveIntegerField(default=0)
+    cart_adds = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'daily sales'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'category', 'level'], name='daily_sales_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.category}/{self.level}"
+
+
+class AnalyticsState(models.Model):
+    """Single row holding how far store/analytics.py has rolled up orders."""
+    SINGLETON_ID = 1
+
+    orders_through = models.DateTimeField(null=True, blank=True)
 
+    @classmethod
+    def load(cls):
+        obj, _ = cls.objects.get_or_create(pk=cls.SINGLETON_ID)
+        return obj
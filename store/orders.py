@@ -0,0 +1,129 @@
+# store/orders.py
+"""
+Bulk Order status changes for the admin actions (OrderAdmin).
+
+Saving orders one by one costs a transaction, an OrderEvent INSERT, a
+counter UPDATE and a cache bump per order (store/signals.py). Here a
+whole selection is moved with a fixed number of queries:
+
+- one bulk_update of status / updated_at,
+- one bulk_create of the OrderEvent rows,
+- one UPDATE ... CASE of Project.orders_completed,
+- one bulk INSERT of the customer emails (send_email jobs),
+
+and, after commit, the live order pages are told (events.publish) and
+each customer's orders version is bumped once.
+
+bulk_update() doesn't send post_save, so everything the signals do for
+a single save is done by hand below; keep the two in step.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from . import events
+from .catalog import bump_catalog_version, bump_orders_version
+from .jobs import enqueue_many
+from .models import Order, OrderEvent, Project
+
+# status -> statuses an order may be moved to it from
+TRANSITIONS = {
+    "contacted": ("pending",),
+    "completed": ("pending", "contacted"),
+    "cancelled": ("pending", "contacted"),
+}
+
+EMAIL_SUBJECT = "Your Techsense order #{order_id} is now {status}"
+EMAIL_BODY = (
+    "Hi {username},\n\n"
+    "Your order #{order_id} for '{title}' is now {status}.\n\n"
+    "You can follow it on your orders page.\n\n"
+    "- Techsense"
+)
+
+
+def status_email(order, event):
+    """(send_email kwargs, idempotency key) for one status change."""
+    status = event.get_to_status_display().lower()
+    return (
+        {
+            "to": order.user.email,
+            "subject": EMAIL_SUBJECT.format(order_id=order.pk, status=status),
+            "body": EMAIL_BODY.format(
+                username=order.user.username, order_id=order.pk, title=order.project.title, status=status
+            ),
+        },
+        # stable across retries of the same change (unlike a timestamp)
+        f"order-status:{order.pk}:{event.to_status}:{event.pk}",
+    )
+
+
+def bulk_set_status(queryset, status, actor=None):
+    """
+    Move the orders in `queryset` that may go to `status` (TRANSITIONS);
+    returns (moved, skipped).
+    """
+    allowed = TRANSITIONS[status]
+    with transaction.atomic():
+        orders = list(
+            # lock only the orders: of=() keeps PostgreSQL from also locking
+            # the joined user and project rows
+            queryset.select_for_update(of=("self",))
+            .select_related("user", "project")
+            .only("id", "status", "user", "project", "user__username", "user__email", "project__title")
+        )
+        moved = [order for order in orders if order.status in allowed]
+        if not moved:
+            return 0, len(orders)
+
+        now = timezone.now()
+        old_status = {order.pk: order.status for order in moved}
+        for order in moved:
+            order.status = status
+            order.updated_at = now  # bulk_update skips auto_now
+        Order.objects.bulk_update(moved, ["status", "updated_at"], batch_size=500)
+
+        order_events = OrderEvent.objects.bulk_create(
+            [
+                OrderEvent(
+                    order_id=order.pk,
+                    user_id=order.user_id,
+                    from_status=old_status[order.pk],
+                    to_status=status,
+                    actor=actor,
+                )
+                for order in moved
+            ],
+            batch_size=500,
+        )
+
+        # Project.orders_completed, as update_orders_completed_on_save does
+        delta = Counter()
+        for order in moved:
+            delta[order.project_id] += int(status == "completed") - int(old_status[order.pk] == "completed")
+        delta = {pk: n for pk, n in delta.items() if n}
+        if delta:
+            Project.objects.filter(pk__in=delta).update(
+                orders_completed=F("orders_completed")
+                + Case(*(When(pk=pk, then=Value(n)) for pk, n in delta.items()), default=Value(0))
+            )
+            bump_catalog_version()  # the counter is on catalog pages, as in the signal
+
+        enqueue_many(
+            "send_email",
+            [status_email(order, event) for order, event in zip(moved, order_events) if order.user.email],
+        )
+
+        user_ids = {order.user_id for order in moved}
+
+        def notify():
+            for event in order_events:
+                if event.pk is not None:
+                    events.publish(event)
+            for user_id in user_ids:
+                bump_orders_version(user_id)
+
+        transaction.on_commit(notify)
+    return len(moved), len(orders) - len(moved)
@@ -0,0 +1,172 @@
+# store/ratelimit.py
+"""
+Rate limiting for abuse-prone endpoints (OTP, login, signup, contact).
+
+Each (scope, key) pair gets a sliding window of `limit` requests per
+`period`: the current fixed window's count plus the previous window's,
+weighted by how much of it still overlaps the last `period` seconds.
+Unlike a plain fixed window this doesn't allow 2 x limit across a window
+boundary. Counts are kept with atomic cache.incr/decr on the shared
+cache, so all workers see the same numbers; blocked requests are not
+counted against the client.
+
+    @ratelimit("login", key="ip")
+    @ratelimit("login", key="username")
+    def user_login(request): ...
+
+Rates come from settings.RATELIMIT_RATES["<scope>:<key>"], e.g. "5/10m".
+Blocked requests get a 429 with Retry-After; allowed/blocked counters are
+kept per bucket for instrumentation (see ratelimit_stats()).
+"""
+import hashlib
+import logging
+import math
+import re
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.shortcuts import render
+
+logger = logging.getLogger(__name__)
+
+RATE_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([smhd])\s*$")
+PERIOD_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+STATS_TIMEOUT = 7 * 24 * 60 * 60
+
+
+def parse_rate(rate):
+    """'5/10m' -> (5, 600)"""
+    match = RATE_RE.match(rate)
+    if not match:
+        raise ValueError(f"Invalid rate {rate!r}, expected e.g. '5/m' or '3/10m'")
+    limit, multiplier, unit = match.groups()
+    return int(limit), int(multiplier or 1) * PERIOD_SECONDS[unit]
+
+
+def client_ip(request):
+    """
+    REMOTE_ADDR, or behind RATELIMIT_TRUSTED_PROXIES proxies the
+    X-Forwarded-For entry the outermost of them appended.
+    """
+    proxies = settings.RATELIMIT_TRUSTED_PROXIES
+    if proxies:
+        forwarded = [ip.strip() for ip in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")]
+        forwarded = [ip for ip in forwarded if ip]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+KEY_FUNCTIONS = {
+    "ip": client_ip,
+    "phone": lambda request: request.POST.get("phone", "").strip(),
+    "username": lambda request: request.POST.get("username", "").strip().lower(),
+}
+
+
+def _count(name, outcome):
+    key = f"rl:stats:{name}:{outcome}"
+    if not cache.add(key, 1, timeout=STATS_TIMEOUT):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, timeout=STATS_TIMEOUT)
+
+
+def seconds_until_room(limit, period, elapsed, previous, current):
+    """Seconds until one more request fits in the sliding window."""
+    if current < limit and previous:
+        # later in this window, once enough of `previous` has slid out
+        wait = period * (1 - (limit - current - 1) / previous) - elapsed
+    else:
+        # in the next window, where `current` becomes the previous count
+        wait = period - elapsed + period * (1 - (limit - 1) / max(current, 1))
+    return max(1, math.ceil(wait))
+
+
+def count_request(name, ident, rate):
+    """
+    Count one request for `ident` if the sliding window has room.
+    Returns (allowed, retry_after_seconds).
+    """
+    limit, period = parse_rate(rate)
+    window, elapsed = divmod(time.time(), period)
+    window = int(window)
+    digest = hashlib.sha1(ident.encode()).hexdigest()
+    key = f"rl:{name}:{digest}:{window}"
+
+    previous = cache.get(f"rl:{name}:{digest}:{window - 1}", 0)
+    # kept for two periods: it is the previous window during the next one
+    cache.add(key, 0, timeout=2 * period + 1)
+    try:
+        current = cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=2 * period + 1)
+        current = 1
+
+    if previous * (1 - elapsed / period) + current <= limit:
+        return True, 0
+
+    # refused: give the slot back so retrying doesn't push the wait further
+    try:
+        cache.decr(key)
+    except ValueError:
+        pass
+    return False, seconds_until_room(limit, period, elapsed, previous, current - 1)
+
+
+def rate_limited_response(request, retry_after, as_json):
+    if as_json:
+        response = JsonResponse(
+            {"status": "rate_limited", "retry_after": retry_after}, status=429
+        )
+    else:
+        response = render(
+            request,
+            "store/rate_limited.html",
+            {"retry_after": retry_after},
+            status=429,
+        )
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+def ratelimit(scope, key="ip", methods=("POST",), as_json=False):
+    name = f"{scope}:{key}"
+    key_func = KEY_FUNCTIONS[key]
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            rate = settings.RATELIMIT_RATES.get(name)
+            if not settings.RATELIMIT_ENABLED or not rate or request.method not in methods:
+                return view(request, *args, **kwargs)
+
+            ident = key_func(request)
+            if not ident:
+                return view(request, *args, **kwargs)
+
+            allowed, retry_after = count_request(name, ident, rate)
+            if not allowed:
+                _count(name, "blocked")
+                logger.warning("Rate limit %s hit (retry in %ss)", name, retry_after)
+                return rate_limited_response(request, retry_after, as_json)
+
+            _count(name, "allowed")
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def ratelimit_stats():
+    """{'login:ip': {'allowed': n, 'blocked': n}, ...} for every configured bucket."""
+    names = list(settings.RATELIMIT_RATES)
+    keys = [f"rl:stats:{n}:{o}" for n in names for o in ("allowed", "blocked")]
+    values = cache.get_many(keys)
+    return {
+        n: {o: values.get(f"rl:stats:{n}:{o}", 0) for o in ("allowed", "blocked")}
+        for n in names
+    }
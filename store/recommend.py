@@ -0,0 +1,311 @@
+# store/recommend.py
+"""
+Related-content recommendations for project_detail and blog_detail.
+
+Similarity = TF-IDF cosine over the item text, plus (for projects) a
+co-purchase cosine from Order. The top-K neighbours of every item are
+precomputed into RelatedItem so the detail views only do an indexed lookup.
+The tokenized corpus and its vectors are cached per process (Corpus) and
+only the items that changed are re-read.
+
+    python manage.py build_recommendations   # full rebuild
+    refresh_item(kind, obj)                   # incremental, on save
+"""
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from .models import BlogPost, Order, Project, RelatedItem
+
+TOP_K = 6
+CO_PURCHASE_WEIGHT = 0.5
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how",
+    "in", "is", "it", "its", "of", "on", "or", "that", "the", "this", "to",
+    "was", "we", "with", "you", "your",
+}
+
+
+def tokenize(text):
+    return [
+        t.rstrip(".") for t in TOKEN_RE.findall(text.lower())
+        if t not in STOP_WORDS and len(t) > 1
+    ]
+
+
+def project_text(project):
+    # title and tech stack count double: they describe the project best
+    return " ".join([
+        project.title, project.title,
+        project.tech_stack, project.tech_stack,
+        project.short_description, project.description,
+    ])
+
+
+def post_text(post):
+    return " ".join([post.title, post.title, post.content])
+
+
+def live_items(kind):
+    if kind == RelatedItem.KIND_PROJECT:
+        return Project.objects.filter(is_active=True)
+    return BlogPost.objects.filter(is_published=True)
+
+
+def load_corpus(kind, ids=None):
+    """{id: text} for every item that can be recommended (or only `ids`)."""
+    rows = live_items(kind)
+    if ids is not None:
+        rows = rows.filter(pk__in=ids)
+    if kind == RelatedItem.KIND_PROJECT:
+        rows = rows.only("id", "title", "tech_stack", "short_description", "description")
+        return {p.id: project_text(p) for p in rows}
+
+    rows = rows.only("id", "title", "content")
+    return {p.id: post_text(p) for p in rows}
+
+
+def idf(n, freq):
+    return math.log((1 + n) / (1 + freq)) + 1
+
+
+class Corpus:
+    """
+    Tokenized items and their L2-normalised TF-IDF vectors ({id: {term:
+    weight}}), kept per process between refresh_item() calls.
+
+    sync() compares the items' updated_at with what it saw last time and
+    only re-reads and re-tokenizes the ones that changed. A vector only
+    depends on its own terms' idf, so after an edit just the vectors that
+    share a term whose document frequency moved are recomputed; adding or
+    removing an item changes n, and with it every vector.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.stamps = {}
+        self.counts = {}
+        self.df = Counter()
+        self.docs_with = defaultdict(set)
+        self.vectors = {}
+
+    def _remove(self, doc_id):
+        counts = self.counts.pop(doc_id, {})
+        self.vectors.pop(doc_id, None)
+        for term in counts:
+            self.df[term] -= 1
+            self.docs_with[term].discard(doc_id)
+            if not self.df[term]:
+                del self.df[term], self.docs_with[term]
+        return set(counts)
+
+    def _add(self, doc_id, text):
+        counts = Counter(tokenize(text))
+        self.counts[doc_id] = counts
+        for term in counts:
+            self.df[term] += 1
+            self.docs_with[term].add(doc_id)
+        return set(counts)
+
+    def _vector(self, doc_id, n):
+        vec = {term: (1 + math.log(tf)) * idf(n, self.df[term]) for term, tf in self.counts[doc_id].items()}
+        norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+        return {term: w / norm for term, w in vec.items()}
+
+    def sync(self):
+        stamps = dict(live_items(self.kind).values_list("id", "updated_at"))
+        changed = [doc_id for doc_id, stamp in stamps.items() if self.stamps.get(doc_id) != stamp]
+        removed = [doc_id for doc_id in self.stamps if doc_id not in stamps]
+        if not changed and not removed:
+            return self
+
+        size = len(self.counts)
+        terms = set()
+        for doc_id in removed + changed:
+            terms |= self._remove(doc_id)
+        texts = load_corpus(self.kind, ids=changed)
+        for doc_id in changed:
+            if doc_id in texts:
+                terms |= self._add(doc_id, texts[doc_id])
+            else:  # hidden between the two queries
+                del stamps[doc_id]
+        self.stamps = stamps
+
+        if len(self.counts) != size:
+            stale = set(self.counts)
+        else:
+            stale = {doc_id for term in terms for doc_id in self.docs_with.get(term, ())}
+            stale.update(doc_id for doc_id in changed if doc_id in self.counts)
+        n = len(self.counts)
+        for doc_id in stale:
+            self.vectors[doc_id] = self._vector(doc_id, n)
+        return self
+
+    def scores(self, sources=None):
+        """
+        Sparse cosine similarity: each source vector is multiplied against
+        the items sharing its terms only. Returns {source_id: {target_id: score}}.
+        """
+        scores = {}
+        for source_id in (self.vectors if sources is None else sources):
+            acc = defaultdict(float)
+            for term, weight in self.vectors.get(source_id, {}).items():
+                for target_id in self.docs_with[term]:
+                    if target_id != source_id:
+                        acc[target_id] += weight * self.vectors[target_id][term]
+            scores[source_id] = acc
+        return scores
+
+
+_corpora = {}
+
+
+def get_corpus(kind):
+    """This process's Corpus for `kind`, brought up to date with the DB."""
+    if kind not in _corpora:
+        _corpora[kind] = Corpus(kind)
+    return _corpora[kind].sync()
+
+
+def co_purchase_vectors():
+    """L2-normalised {project_id: {user_id: 1/norm}} from non-cancelled orders."""
+    buyers = defaultdict(set)
+    rows = (
+        Order.objects.exclude(status="cancelled")
+        .values_list("project_id", "user_id")
+        .distinct()
+    )
+    for project_id, user_id in rows:
+        buyers[project_id].add(user_id)
+
+    return {
+        project_id: {user_id: 1 / math.sqrt(len(users)) for user_id in users}
+        for project_id, users in buyers.items()
+    }
+
+
+def cosine_scores(vectors, sources=None):
+    """
+    Sparse cosine similarity via an inverted index (used for the
+    co-purchase vectors). Returns {source_id: {target_id: score}}.
+    """
+    postings = defaultdict(list)
+    for doc_id, vec in vectors.items():
+        for term, weight in vec.items():
+            postings[term].append((doc_id, weight))
+
+    scores = {}
+    for source_id in (vectors if sources is None else sources):
+        acc = defaultdict(float)
+        for term, weight in vectors.get(source_id, {}).items():
+            for target_id, target_weight in postings[term]:
+                if target_id != source_id:
+                    acc[target_id] += weight * target_weight
+        scores[source_id] = acc
+    return scores
+
+
+def similarity_scores(kind, sources=None, purchases=None):
+    corpus = get_corpus(kind)
+    scores = corpus.scores(sources)
+
+    if kind == RelatedItem.KIND_PROJECT:
+        if purchases is None:
+            purchases = co_purchase_vectors()
+        purchase_scores = cosine_scores(
+            purchases,
+            [s for s in (corpus.vectors if sources is None else sources) if s in purchases],
+        )
+        for source_id, targets in purchase_scores.items():
+            acc = scores.setdefault(source_id, defaultdict(float))
+            for target_id, score in targets.items():
+                if target_id in corpus.vectors:
+                    acc[target_id] += CO_PURCHASE_WEIGHT * score
+
+    return scores, set(corpus.vectors)
+
+
+def top_k(targets, k=TOP_K):
+    ranked = sorted(
+        ((score, target_id) for target_id, score in targets.items() if score > 0),
+        reverse=True,
+    )
+    return [(target_id, score) for score, target_id in ranked[:k]]
+
+
+def rows_for(kind, source_id, neighbours):
+    return [
+        RelatedItem(kind=kind, source_id=source_id, target_id=target_id, score=score, rank=rank)
+        for rank, (target_id, score) in enumerate(neighbours)
+    ]
+
+
+def rebuild(kind):
+    """Full offline rebuild of the top-K table for one kind."""
+    scores, _ = similarity_scores(kind)
+    rows = []
+    for source_id, targets in scores.items():
+        rows.extend(rows_for(kind, source_id, top_k(targets)))
+
+    with transaction.atomic():
+        RelatedItem.objects.filter(kind=kind).delete()
+        RelatedItem.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def refresh_item(kind, obj):
+    """
+    Incremental refresh after one item is saved. Recomputes the full top-K
+    of the item itself, of every list it was in (it may have dropped out,
+    and the next candidate has to move up) and of every list it now enters.
+    """
+    purchases = co_purchase_vectors() if kind == RelatedItem.KIND_PROJECT else None
+    scores, live_ids = similarity_scores(kind, sources=[obj.pk], purchases=purchases)
+    own = scores.get(obj.pk, {}) if obj.pk in live_ids else {}
+
+    affected = set(
+        RelatedItem.objects.filter(kind=kind, target_id=obj.pk).values_list("source_id", flat=True)
+    )
+    # cosine is symmetric: score(other -> obj) == score(obj -> other)
+    incoming = {source_id: score for source_id, score in own.items() if score > 0}
+    current = defaultdict(list)
+    for source_id, score in RelatedItem.objects.filter(kind=kind, source_id__in=list(incoming)).values_list(
+        "source_id", "score"
+    ):
+        current[source_id].append(score)
+    affected.update(
+        source_id for source_id, score in incoming.items()
+        if len(current[source_id]) < TOP_K or score > min(current[source_id])
+    )
+    affected.discard(obj.pk)
+
+    rows = rows_for(kind, obj.pk, top_k(own))
+    if affected:
+        fresh, _ = similarity_scores(kind, sources=sorted(affected), purchases=purchases)
+        for source_id in affected:
+            rows.extend(rows_for(kind, source_id, top_k(fresh.get(source_id, {}))))
+
+    with transaction.atomic():
+        RelatedItem.objects.filter(kind=kind, source_id__in=[obj.pk, *affected]).delete()
+        RelatedItem.objects.bulk_create(rows)
+
+
+def related_ids(kind, source_id):
+    return list(
+        RelatedItem.objects.filter(kind=kind, source_id=source_id)
+        .order_by("rank")
+        .values_list("target_id", flat=True)
+    )
+
+
+def related_objects(queryset, kind, source_id, limit=3):
+    """Neighbours of `source_id` from `queryset`, best first."""
+    ids = related_ids(kind, source_id)[:limit]
+    if not ids:
+        return []
+    by_id = queryset.in_bulk(ids)
+    return [by_id[i] for i in ids if i in by_id]
@@ -0,0 +1,97 @@
+# store/routers.py
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Catalog / blog models that are safe to read from a (slightly stale) replica.
+# Orders, profiles, sessions and auth always stay on the primary.
+REPLICA_READ_MODELS = {
+    ("store", "project"),
+    ("store", "projectimage"),
+    ("store", "blogpost"),
+}
+
+PIN_COOKIE_NAME = "primary_pin"
+
+# True while the current request (or management command) must read from
+# the primary, i.e. it wrote something or wrote something a moment ago.
+_pinned = ContextVar("primary_pinned", default=False)
+# Set once the current request performs a write; read by the middleware.
+_wrote = ContextVar("primary_wrote", default=False)
+
+
+def pin_to_primary():
+    _pinned.set(True)
+    _wrote.set(True)
+
+
+def is_pinned():
+    return _pinned.get()
+
+
+class ReplicaRouter:
+    """
+    Sends catalog reads to a random alias from settings.DATABASE_REPLICAS,
+    everything else (and every write) to `default`.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, "DATABASE_REPLICAS", [])
+        if not replicas or is_pinned():
+            return "default"
+        if (model._meta.app_label, model._meta.model_name) in REPLICA_READ_MODELS:
+            return random.choice(replicas)
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
+
+
+class PrimaryPinningMiddleware:
+    """
+    Keeps a browser on the primary for REPLICA_PIN_SECONDS after it wrote,
+    so e.g. order_detail right after buy_project never hits a lagging replica.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        replicas = getattr(settings, "DATABASE_REPLICAS", [])
+        if not replicas:
+            return self.get_response(request)
+
+        try:
+            pinned_until = float(request.COOKIES.get(PIN_COOKIE_NAME, 0))
+        except ValueError:
+            pinned_until = 0
+
+        pinned_token = _pinned.set(pinned_until > time.time())
+        wrote_token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            wrote = _wrote.get()
+        finally:
+            _pinned.reset(pinned_token)
+            _wrote.reset(wrote_token)
+
+        if wrote:
+            seconds = settings.REPLICA_PIN_SECONDS
+            response.set_cookie(
+                PIN_COOKIE_NAME,
+                str(time.time() + seconds),
+                max_age=seconds,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,139 @@
+# store/search_index.py
+"""
+Per-process prefix index for search-as-you-type on project_list.
+
+A sorted array of (term, project_id) tuples searched with bisect: each
+keystroke is a binary search plus a short scan, with no database access.
+The index is rebuilt lazily when the shared catalog version moves on.
+"""
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from django.urls import reverse
+
+from .catalog import get_catalog_version
+from .models import Project
+
+logger = logging.getLogger(__name__)
+
+# how often a worker asks the cache whether the catalog changed
+VERSION_CHECK_SECONDS = 2.0
+
+WORD_SPLIT_RE = re.compile(r"[\s,/|+()\-_.]+")
+
+
+def normalize(text):
+    return " ".join(text.lower().split())
+
+
+def split_technologies(tech_stack):
+    return [t.strip() for t in re.split(r"[,/|]", tech_stack) if t.strip()]
+
+
+class PrefixIndex:
+    def __init__(self, projects):
+        self.projects = {}
+        self.technologies = {}
+        terms = set()
+
+        for project in projects:
+            self.projects[project.id] = {
+                "title": project.title,
+                "slug": project.slug,
+                "tech_stack": project.tech_stack,
+                "url": reverse("store:project_detail", args=[project.slug]),
+            }
+
+            title = normalize(project.title)
+            terms.add((title, project.id))
+            terms.add((project.slug.lower(), project.id))
+            for word in WORD_SPLIT_RE.split(title) + project.slug.lower().split("-"):
+                if word:
+                    terms.add((word, project.id))
+
+            for tech in split_technologies(project.tech_stack):
+                key = normalize(tech)
+                self.technologies.setdefault(key, tech)
+                terms.add((key, project.id))
+
+        self.terms = sorted(terms)
+        self.tech_terms = sorted(self.technologies)
+
+    def search(self, prefix, limit=8):
+        prefix = normalize(prefix)
+        if not prefix:
+            return [], []
+
+        ids = []
+        seen = set()
+        i = bisect_left(self.terms, (prefix,))
+        while i < len(self.terms) and len(ids) < limit:
+            term, project_id = self.terms[i]
+            if not term.startswith(prefix):
+                break
+            if project_id not in seen:
+                seen.add(project_id)
+                ids.append(project_id)
+            i += 1
+
+        techs = []
+        j = bisect_left(self.tech_terms, prefix)
+        while j < len(self.tech_terms) and len(techs) < limit:
+            if not self.tech_terms[j].startswith(prefix):
+                break
+            techs.append(self.technologies[self.tech_terms[j]])
+            j += 1
+
+        return [self.projects[i] for i in ids], techs
+
+
+_lock = threading.Lock()
+_index = None
+_index_version = None
+_checked_at = 0.0
+
+
+def build_index():
+    projects = Project.objects.filter(is_active=True).only(
+        "id", "title", "slug", "tech_stack"
+    )
+    return PrefixIndex(projects)
+
+
+def get_index():
+    """
+    Current index for this process. Only looks at the cache every
+    VERSION_CHECK_SECONDS and only touches the DB when the version changed.
+    """
+    global _index, _index_version, _checked_at
+
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < VERSION_CHECK_SECONDS:
+        return _index
+
+    version = get_catalog_version()
+    if _index is None or version != _index_version:
+        with _lock:
+            if _index is None or version != _index_version:
+                _index = build_index()
+                _index_version = version
+    _checked_at = now
+    return _index
+
+
+def invalidate_index():
+    """Force the next get_index() in this process to re-check the version."""
+    global _checked_at
+    _checked_at = 0.0
+
+
+def warm_index():
+    """Build the index at worker startup so the first keystroke is fast."""
+    try:
+        get_index()
+    except Exception:
+        # e.g. migrations not applied yet: build lazily on first request
+        logger.warning("Autocomplete index warm-up failed", exc_info=True)
@@ -1,15 +1,151 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import Profile
+from . import events, search_index
+from .catalog import bump_catalog_version, bump_orders_version
+from .db import configure_sqlite_connection
+from .jobs import enqueue
+from .models import BlogPost, Order, OrderEvent, OrderReview, Profile, Project, RelatedItem
 
+# SQLite PRAGMAs (WAL, mmap, busy timeout...) on every new connection
+connection_created.connect(configure_sqlite_connection, dispatch_uid="store_sqlite_pragmas")
+
+# Profile rows are only written when they are created here or when the
+# profile form actually changes something (views.account_settings /
+# profile_edit); saving a User (e.g. last_login on every login) no longer
+# touches the profile.
 @receiver(post_save, sender=User)
-def create_profile(sender, instance, created, **kwargs):
-    if created:
+def create_profile(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
         Profile.objects.create(user=instance)
 
-@receiver(post_save, sender=User)
-def save_profile(sender, instance, **kwargs):
-    # if profile exists, save it when user is saved
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
+
+# -------------------------------------------------------------------
+# Order status log (store/events.py streams it to open order pages).
+# Connected before update_orders_completed_on_save, which resets
+# _loaded_status.
+# -------------------------------------------------------------------
+@receiver(post_save, sender=Order)
+def record_status_change(sender, instance, created, raw=False, **kwargs):
+    old_status = None if created else getattr(instance, "_loaded_status", None)
+    if raw or old_status is None or old_status == instance.status:
+        return
+    event = OrderEvent.objects.create(
+        order=instance,
+        user_id=instance.user_id,
+        from_status=old_status,
+        to_status=instance.status,
+        # set by the view / admin that made the change
+        actor=getattr(instance, "_status_actor", None),
+    )
+    transaction.on_commit(lambda: events.publish(event))
+
+
+# -------------------------------------------------------------------
+# Denormalized Project counters (rating_sum / rating_count / orders_completed)
+# Updated with F() in the same transaction as the review / order write.
+# queryset.update() sends no signals, so the catalog version is bumped
+# here: the counters are on catalog pages and in the API (ETags).
+# -------------------------------------------------------------------
+@receiver(post_save, sender=OrderReview)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    old_rating = None if created else getattr(instance, "_loaded_rating", None)
+    project_id = Order.objects.filter(pk=instance.order_id).values_list("project_id", flat=True)
+
+    if old_rating is None:
+        Project.objects.filter(pk__in=project_id).update(
+            rating_sum=F("rating_sum") + instance.rating,
+            rating_count=F("rating_count") + 1,
+        )
+        bump_catalog_version()
+    elif old_rating != instance.rating:
+        Project.objects.filter(pk__in=project_id).update(
+            rating_sum=F("rating_sum") + (instance.rating - old_rating),
+        )
+        bump_catalog_version()
+    instance._loaded_rating = instance.rating
+
+@receiver(post_delete, sender=OrderReview)
+def update_rating_on_delete(sender, instance, **kwargs):
+    rating = getattr(instance, "_loaded_rating", instance.rating)
+    project_id = Order.objects.filter(pk=instance.order_id).values_list("project_id", flat=True)
+    if Project.objects.filter(pk__in=project_id, rating_count__gt=0).update(
+        rating_sum=F("rating_sum") - rating,
+        rating_count=F("rating_count") - 1,
+    ):
+        bump_catalog_version()
+
+@receiver(post_save, sender=Order)
+def update_orders_completed_on_save(sender, instance, created, **kwargs):
+    old_status = None if created else getattr(instance, "_loaded_status", None)
+    delta = int(instance.status == "completed") - int(old_status == "completed")
+    if delta:
+        Project.objects.filter(pk=instance.project_id).update(
+            orders_completed=F("orders_completed") + delta,
+        )
+        bump_catalog_version()
+    instance._loaded_status = instance.status
+
+@receiver(post_delete, sender=Order)
+def update_orders_completed_on_delete(sender, instance, **kwargs):
+    if getattr(instance, "_loaded_status", instance.status) == "completed":
+        if Project.objects.filter(pk=instance.project_id, orders_completed__gt=0).update(
+            orders_completed=F("orders_completed") - 1,
+        ):
+            bump_catalog_version()
+
+
+# -------------------------------------------------------------------
+# Related-content table (store/recommend.py), refreshed by the job worker
+# -------------------------------------------------------------------
+@receiver(post_save, sender=Project)
+def refresh_related_projects(sender, instance, raw=False, **kwargs):
+    if not raw:
+        enqueue(
+            "refresh_related",
+            {"kind": RelatedItem.KIND_PROJECT, "pk": instance.pk},
+            dedup_key=f"refresh_related:{RelatedItem.KIND_PROJECT}:{instance.pk}",
+        )
+
+@receiver(post_save, sender=BlogPost)
+def refresh_related_posts(sender, instance, raw=False, **kwargs):
+    if not raw:
+        enqueue(
+            "refresh_related",
+            {"kind": RelatedItem.KIND_POST, "pk": instance.pk},
+            dedup_key=f"refresh_related:{RelatedItem.KIND_POST}:{instance.pk}",
+        )
+
+@receiver(post_delete, sender=Project)
+def drop_related_projects(sender, instance, **kwargs):
+    RelatedItem.objects.filter(kind=RelatedItem.KIND_PROJECT, source_id=instance.pk).delete()
+    RelatedItem.objects.filter(kind=RelatedItem.KIND_PROJECT, target_id=instance.pk).delete()
+
+@receiver(post_delete, sender=BlogPost)
+def drop_related_posts(sender, instance, **kwargs):
+    RelatedItem.objects.filter(kind=RelatedItem.KIND_POST, source_id=instance.pk).delete()
+    RelatedItem.objects.filter(kind=RelatedItem.KIND_POST, target_id=instance.pk).delete()
+
+
+# -------------------------------------------------------------------
+# Catalog version (store/catalog.py): any Project / BlogPost change bumps
+# it and invalidates per-process caches such as the autocomplete index,
+# both once committed.
+# -------------------------------------------------------------------
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def bump_catalog_on_change(sender, raw=False, **kwargs):
+    if not raw:
+        bump_catalog_version()
+        transaction.on_commit(search_index.invalidate_index)
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def bump_orders_on_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: bump_orders_version(instance.user_id))
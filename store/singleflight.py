@@ -0,0 +1,62 @@
+# store/singleflight.py
+"""
+Single-flight reads through the shared cache, with stale-while-revalidate.
+
+    value = cached("home:sections", compute, version=get_catalog_version())
+
+An entry is fresh while its version matches and it is younger than
+`ttl`. When it goes stale (expiry, or a Project / BlogPost save bumped
+the catalog version) exactly one worker - the one that wins the lock
+key - runs `compute`; every other request keeps getting the stale value
+meanwhile instead of hitting the database at the same moment. Only a
+cold key (nothing stored at all) makes callers wait, briefly, for the
+lock holder.
+
+The lock only coordinates workers when the cache is shared (Redis); with
+the per-process LocMemCache it still collapses a herd within a process.
+"""
+import time
+
+from django.core.cache import cache
+
+TTL = 5 * 60
+# stale values are kept (and served during a refresh) this much longer
+STALE_TTL = 60 * 60
+# a lock outlives a crashed holder by at most this long
+LOCK_TIMEOUT = 30
+WAIT_STEP = 0.05
+
+
+def _store(key, compute, version, ttl, stale_ttl):
+    value = compute()
+    cache.set(key, (version, time.time() + ttl, value), ttl + stale_ttl)
+    return value
+
+
+def _is_fresh(entry, version):
+    return entry is not None and entry[0] == version and time.time() < entry[1]
+
+
+def cached(key, compute, version=None, ttl=TTL, stale_ttl=STALE_TTL, lock_timeout=LOCK_TIMEOUT):
+    entry = cache.get(key)
+    if _is_fresh(entry, version):
+        return entry[2]
+
+    lock = f"{key}:lock"
+    deadline = time.monotonic() + lock_timeout
+    while not cache.add(lock, 1, lock_timeout):
+        if entry is not None:
+            return entry[2]  # someone else is refreshing: serve stale
+        if time.monotonic() > deadline:
+            return compute()  # the holder died; don't wait any longer
+        time.sleep(WAIT_STEP)
+        entry = cache.get(key)
+
+    try:
+        # it may have been refreshed between our read and the lock
+        entry = cache.get(key)
+        if _is_fresh(entry, version):
+            return entry[2]
+        return _store(key, compute, version, ttl, stale_ttl)
+    finally:
+        cache.delete(lock)
@@ -0,0 +1,64 @@
+# store/sitemaps.py
+from django.contrib.sitemaps import Sitemap
+from django.urls import reverse
+
+from .models import BlogPost, Project
+
+# entries per sitemap page; sitemap.xml is an index over these chunks
+SITEMAP_CHUNK_SIZE = 5000
+
+
+class StaticViewSitemap(Sitemap):
+    changefreq = "weekly"
+    priority = 0.6
+
+    def items(self):
+        return ["store:home", "store:project_list", "store:blog_list", "store:contact"]
+
+    def location(self, item):
+        return reverse(item)
+
+
+class ProjectSitemap(Sitemap):
+    changefreq = "weekly"
+    priority = 0.8
+    limit = SITEMAP_CHUNK_SIZE
+
+    def items(self):
+        return (
+            Project.objects.filter(is_active=True)
+            .only("id", "slug", "updated_at")
+            .order_by("id")
+        )
+
+    def location(self, obj):
+        return reverse("store:project_detail", args=[obj.slug])
+
+    def lastmod(self, obj):
+        return obj.updated_at
+
+
+class BlogPostSitemap(Sitemap):
+    changefreq = "monthly"
+    priority = 0.5
+    limit = SITEMAP_CHUNK_SIZE
+
+    def items(self):
+        return (
+            BlogPost.objects.filter(is_published=True)
+            .only("id", "updated_at")
+            .order_by("id")
+        )
+
+    def location(self, obj):
+        return reverse("store:blog_detail", args=[obj.pk])
+
+    def lastmod(self, obj):
+        return obj.updated_at
+
+
+sitemaps = {
+    "static": StaticViewSitemap,
+    "projects": ProjectSitemap,
+    "blog": BlogPostSitemap,
+}
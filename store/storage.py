@@ -0,0 +1,82 @@
+# store/storage.py
+"""
+Content-addressed storage for uploaded media.
+
+Files are stored as <upload_to>/<sha256[:2]>/<sha256[2:]><ext>, so the
+same bytes uploaded twice (or by two projects) end up as one file, and a
+file's URL changes whenever its content does. That makes every media URL
+safe to cache forever: serve_media marks them immutable.
+
+Nothing is ever overwritten or deleted on save; replaced and orphaned
+files are removed by `python manage.py reclaim_media`, which also moves
+pre-existing (name-based) uploads into this layout.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from django.views.static import serve
+
+HASHED_NAME = re.compile(r"(^|/)[0-9a-f]{2}/[0-9a-f]{62}(\.[\w]{1,10})?$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def file_digest(content):
+    """sha256 of a File / file-like object, read in chunks."""
+    digest = hashlib.sha256()
+    if hasattr(content, "chunks"):
+        chunks = content.chunks()
+    else:
+        chunks = iter(lambda: content.read(64 * 1024), b"")
+    for chunk in chunks:
+        digest.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def hashed_name(name, digest):
+    """'project_images/HMdc.JPG' -> 'project_images/ab/cdef...0.jpg'"""
+    directory, filename = posixpath.split(name.replace("\\", "/"))
+    ext = os.path.splitext(filename)[1].lower()
+    if not re.fullmatch(r"\.\w{1,10}", ext):
+        ext = ""
+    return posixpath.join(directory, digest[:2], digest[2:] + ext)
+
+
+def is_hashed(name):
+    return bool(name and HASHED_NAME.search(name))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # the final name comes from the content in _save()
+        return name
+
+    def _save(self, name, content):
+        name = hashed_name(name, file_digest(content))
+        if self.exists(name):
+            return name  # same bytes already stored
+        # write under a unique name, then rename into place: two
+        # concurrent uploads of the same file both end up with `name`
+        tmp = posixpath.join(posixpath.dirname(name), f".tmp-{uuid.uuid4().hex}")
+        tmp = super()._save(tmp, content)
+        os.replace(self.path(tmp), self.path(name))
+        return name
+
+
+content_storage = ContentAddressedStorage()
+
+
+def serve_media(request, path):
+    """MEDIA_URL view; content-addressed files are cached for a year."""
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if response.status_code == 200 and is_hashed(path):
+        response["Cache-Control"] = IMMUTABLE
+    return response
@@ -0,0 +1,54 @@
+# store/tasks.py
+"""
+Job tasks run by the background worker (store/jobs.py).
+Keyword arguments must be JSON-serialisable.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.utils import timezone
+
+from . import analytics, hits, recommend, uploads
+from .email_utils import send_brevo_email
+from .jobs import task
+from .models import BlogPost, ChunkedUpload, Project, RelatedItem
+
+
+@task(priority=10, max_attempts=6)
+def send_email(to, subject, body):
+    if settings.DEBUG:
+        # Local: console / SMTP backend
+        send_mail(subject, body, settings.DEFAULT_FROM_EMAIL, [to])
+    elif not send_brevo_email(to, subject, body):
+        # raise so the job is retried with backoff
+        raise RuntimeError(f"Brevo could not send {subject!r} to {to}")
+
+
+@task(priority=-10)
+def refresh_related(kind, pk):
+    model = Project if kind == RelatedItem.KIND_PROJECT else BlogPost
+    obj = model.objects.filter(pk=pk).first()
+    if obj is not None:
+        recommend.refresh_item(kind, obj)
+
+
+@task(priority=-10)
+def expire_uploads(hours=24):
+    """Drop resumable uploads (store/uploads.py) that received nothing for `hours`."""
+    cutoff = timezone.now() - timedelta(hours=hours)
+    stale = ChunkedUpload.objects.filter(completed_at__isnull=True, updated_at__lt=cutoff)
+    for upload in stale:
+        uploads.discard(upload)
+
+
+@task(priority=-5)
+def flush_view_counts():
+    """Write the buffered page views (store/hits.py) to the database."""
+    hits.flush()
+
+
+@task(priority=-10)
+def refresh_sales_rollups():
+    """Same as `manage.py refresh_sales_rollups`, for a ScheduledJob."""
+    analytics.refresh()
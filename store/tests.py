@@ -1,3 +1,1769 @@
-from django.test import TestCase
+import asyncio
+import base64
+import gzip
+import hashlib
+import importlib
+import importlib.util
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+from html import unescape
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django import forms
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher, PBKDF2PasswordHasher, get_hasher, identify_hasher, make_password,
+)
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from django.http import HttpResponse, StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.template import RequestContext, Template
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import (
+    analytics, compression, content, css, events, hits, jobs, orders, ratelimit, recommend, search_index, singleflight,
+    storage, tasks, uploads, views,
+)
+from .catalog import bump_catalog_version, get_catalog_version, get_orders_version
+from .http_cache import ConditionalCatalogMiddleware, catalog_cache
+from .models import (
+    BlogPost, CatalogState, ChunkedUpload, DailySales, Job, Order, OrderEvent, OrderReview, Profile, Project,
+    RelatedItem, ScheduledJob, ViewCounterState,
+)
+from .routers import PIN_COOKIE_NAME, ReplicaRouter, _pinned
+
+
+# -------------------------------------------------------------------
+# SQLITE TUNING
+# -------------------------------------------------------------------
+class SQLitePragmaTests(SimpleTestCase):
+    def pragmas(self):
+        """journal_mode / synchronous of a fresh file-backed connection."""
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        wrapper = SQLiteDatabaseWrapper(
+            {**connections["default"].settings_dict, "NAME": str(Path(tmp) / "fresh.sqlite3")}, alias="pragma_test"
+        )
+        self.addCleanup(wrapper.close)
+        with wrapper.cursor() as cursor:  # fires connection_created
+            return tuple(cursor.execute(f"PRAGMA {name}").fetchone()[0] for name in ("journal_mode", "synchronous"))
+
+    def test_new_connections_are_tuned(self):
+        # synchronous NORMAL = 1
+        self.assertEqual(self.pragmas(), ("wal", 1))
+
+    @override_settings(SQLITE_TUNING=False)
+    def test_tuning_can_be_switched_off(self):
+        self.assertEqual(self.pragmas(), ("delete", 2))  # SQLite's defaults (FULL = 2)
+
+
+# -------------------------------------------------------------------
+# READ REPLICAS
+# -------------------------------------------------------------------
+@override_settings(DATABASE_REPLICAS=["replica_0", "replica_1"])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        token = _pinned.set(False)
+        self.addCleanup(_pinned.reset, token)
+
+    def test_catalog_reads_go_to_a_replica(self):
+        self.assertIn(self.router.db_for_read(Project), ["replica_0", "replica_1"])
+        self.assertIn(self.router.db_for_read(BlogPost), ["replica_0", "replica_1"])
+
+    def test_orders_and_users_read_from_primary(self):
+        self.assertEqual(self.router.db_for_read(Order), "default")
+        self.assertEqual(self.router.db_for_read(User), "default")
+
+    def test_write_pins_following_reads_to_primary(self):
+        self.assertEqual(self.router.db_for_write(Order), "default")
+        self.assertEqual(self.router.db_for_read(Project), "default")
+
+    def test_migrations_only_run_on_primary(self):
+        self.assertTrue(self.router.allow_migrate("default", "store"))
+        self.assertFalse(self.router.allow_migrate("replica_0", "store"))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_configured(self):
+        self.assertEqual(self.router.db_for_read(Project), "default")
+
+
+@override_settings(DATABASE_REPLICAS=["replica_test"])
+class ReplicaPinningTests(TransactionTestCase):
+    """
+    "replica_test" is a second connection to the test database, added for
+    this class, so routing is checked without a real replica configured.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # added after Django's per-class database guards, removed before
+        connections.settings["replica_test"] = {
+            **connections["default"].settings_dict,
+            "TEST": {"MIRROR": "default"},
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        connections["replica_test"].close()
+        del connections["replica_test"]
+        del connections.settings["replica_test"]
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user("buyer", password="pass12345")
+        self.project = Project.objects.create(
+            title="Pin Test",
+            short_description="short",
+            description="long",
+            tech_stack="Django",
+            price="10.00",
+        )
+        self.client.force_login(self.user)
+        self.detail_url = reverse("store:project_detail", args=[self.project.slug])
+
+    def replica_queries(self, url):
+        with CaptureQueriesContext(connections["replica_test"]) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_catalog_reads_use_the_replica(self):
+        self.client.cookies.pop(PIN_COOKIE_NAME, None)
+        self.assertGreater(self.replica_queries(self.detail_url), 0)
+
+    def test_reads_after_buy_stay_on_primary(self):
+        self.client.cookies.pop(PIN_COOKIE_NAME, None)
+        response = self.client.post(reverse("store:buy_project", args=[self.project.slug]))
+        self.assertIn(PIN_COOKIE_NAME, response.cookies)
+
+        order = Order.objects.get(user=self.user, project=self.project)
+        self.assertEqual(self.replica_queries(reverse("store:order_detail", args=[order.id])), 0)
+        self.assertEqual(self.replica_queries(self.detail_url), 0)
+
+
+# -------------------------------------------------------------------
+# BUY FLOW
+# -------------------------------------------------------------------
+# The data lives in the test's open transaction, which a replica
+# connection (DATABASE_REPLICA_URLS) can't see: keep every read on the primary.
+@override_settings(DATABASE_REPLICAS=[])
+class BuyProjectTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("buyer", password="pass12345")
+        self.project = Project.objects.create(
+            title="Buy Test", short_description="short", description="long", tech_stack="Django", price="10.00",
+        )
+        self.url = reverse("store:buy_project", args=[self.project.slug])
+        self.client.force_login(self.user)
+
+    def test_get_creates_nothing(self):
+        response = self.client.get(self.url)
+        self.assertRedirects(
+            response, reverse("store:project_detail", args=[self.project.slug]), fetch_redirect_response=False
+        )
+        self.assertFalse(Order.objects.exists())
+
+    def test_resubmitted_form_returns_the_same_order(self):
+        first = self.client.post(self.url, {"idempotency_key": "k1"})
+        with CaptureQueriesContext(connection) as ctx:
+            again = self.client.post(self.url, {"idempotency_key": "k1"})
+        self.assertEqual(first["Location"], again["Location"])
+        self.assertEqual(Order.objects.count(), 1)
+        writes = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith(("INSERT", "UPDATE"))]
+        self.assertFalse([sql for sql in writes if "django_session" not in sql])
+
+    def test_one_pending_order_per_project(self):
+        self.client.post(self.url, {"idempotency_key": "k1"})
+        self.client.post(self.url, {"idempotency_key": "k2"})
+        self.assertEqual(Order.objects.count(), 1)
+
+        # once it's no longer pending a new order can be placed
+        Order.objects.update(status="cancelled")
+        self.client.post(self.url, {"idempotency_key": "k3"})
+        self.assertEqual(Order.objects.filter(status="pending").count(), 1)
+
+
+@override_settings(JOBS_EAGER=False)
+class BulkOrderStatusTests(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(
+            title="Bulk", short_description="short", description="long", tech_stack="Django", price="10.00",
+        )
+        self.admin = User.objects.create_superuser("admin", "admin@example.com", "pass12345")
+
+    def make_orders(self, n, prefix="user"):
+        users = User.objects.bulk_create(
+            [User(username=f"{prefix}{i}", email=f"{prefix}{i}@example.com") for i in range(n)]
+        )
+        # bulk_create skips Order.save(), which fills in the price
+        return Order.objects.bulk_create(
+            [Order(user=user, project=self.project, price=self.project.price) for user in users]
+        )
+
+    def test_query_count_does_not_grow_with_the_selection(self):
+        self.make_orders(5)
+        self.assertEqual(orders.bulk_set_status(Order.objects.all(), "completed"), (5, 0))
+
+        self.make_orders(500, prefix="more")
+        with CaptureQueriesContext(connection) as ctx:
+            moved = orders.bulk_set_status(Order.objects.all(), "completed", actor=self.admin)
+        self.assertEqual(moved, (500, 5))  # the first five are completed already
+        # a handful of bulk statements (SQLite splits them at its variable limit)
+        self.assertLess(len(ctx.captured_queries), 20)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.orders_completed, 505)
+
+    def test_admin_action_writes_history_counters_and_email_jobs(self):
+        self.make_orders(3)
+        Order.objects.filter(pk=Order.objects.first().pk).update(status="completed")
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            reverse("admin:store_order_changelist"),
+            {"action": "mark_completed", "_selected_action": list(Order.objects.values_list("pk", flat=True))},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Order.objects.filter(status="completed").count(), 3)
+        self.assertEqual(OrderEvent.objects.filter(to_status="completed", actor=self.admin).count(), 2)
+        self.assertEqual(
+            set(Job.objects.filter(task="send_email").values_list("idempotency_key", flat=True)),
+            {f"order-status:{e.order_id}:completed:{e.pk}" for e in OrderEvent.objects.filter(actor=self.admin)},
+        )
+        self.project.refresh_from_db()
+        # only the two orders that moved count (the first was set by .update())
+        self.assertEqual(self.project.orders_completed, 2)
+
+
+# -------------------------------------------------------------------
+# CATALOG VERSION
+# -------------------------------------------------------------------
+class CatalogVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_bumped_after_commit_not_inside_the_transaction(self):
+        before = get_catalog_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            bump_catalog_version()
+            # the writer's transaction never touches the CatalogState row
+            self.assertEqual(CatalogState.load().version, before)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_catalog_version(), before + 1)
+
+    def test_rolled_back_write_bumps_nothing(self):
+        before = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Project.objects.create(title="Gone", short_description="s", description="d", tech_stack="x", price=1)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(get_catalog_version(), before)
+
+
+# -------------------------------------------------------------------
+# DENORMALIZED PROJECT COUNTERS
+# -------------------------------------------------------------------
+class ProjectCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user("buyer", password="pass12345")
+        self.project = Project.objects.create(
+            title="Counters", short_description="short", description="long", tech_stack="Django", price="10.00",
+        )
+        self.order = Order.objects.create(user=self.user, project=self.project)
+
+    def counters(self):
+        self.project.refresh_from_db()
+        return self.project.rating_sum, self.project.rating_count, self.project.orders_completed
+
+    def test_order_completion_is_counted(self):
+        version = get_catalog_version()
+        self.order.status = "completed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.save()
+        self.assertEqual(self.counters(), (0, 0, 1))
+        self.assertGreater(get_catalog_version(), version)
+
+        self.order.status = "cancelled"
+        self.order.save()
+        self.assertEqual(self.counters(), (0, 0, 0))
+
+    def test_admin_save_keeps_counters_updated_meanwhile(self):
+        self.client.force_login(User.objects.create_superuser("admin", password="pass12345"))
+        url = reverse("admin:store_project_change", args=[self.project.pk])
+        page = self.client.get(url)
+
+        # a review lands while the admin has the form open
+        OrderReview.objects.create(order=self.order, rating=5)
+
+        # post back what the form showed, as the browser would
+        data = {}
+        for form in [page.context["adminform"].form, page.context["inline_admin_formsets"][0].formset.management_form]:
+            for name, field in form.fields.items():
+                value = form[name].value()
+                # unchecked boxes and empty files aren't posted
+                if value is not None and value is not False and not isinstance(field, forms.FileField):
+                    data[form.add_prefix(name)] = value
+        data["title"] = "Renamed"
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 302)
+
+        self.assertEqual(self.counters(), (5, 1, 0))
+        self.assertEqual(self.project.title, "Renamed")
+
+    def test_review_create_update_delete(self):
+        review = OrderReview.objects.create(order=self.order, rating=4)
+        self.assertEqual(self.counters(), (4, 1, 0))
+
+        review = OrderReview.objects.get(pk=review.pk)
+        review.rating = 2
+        review.save()
+        self.assertEqual(self.counters(), (2, 1, 0))
+
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            review.delete()
+        self.assertEqual(self.counters(), (0, 0, 0))
+        self.assertGreater(get_catalog_version(), version)
+
+    def test_new_review_changes_etags(self):
+        api_url = reverse("store:api_project_detail", args=[self.project.slug])
+        page_url = reverse("store:project_detail", args=[self.project.slug])
+        api_etag = self.client.get(api_url)["ETag"]
+        page_etag = self.client.get(page_url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            OrderReview.objects.create(order=self.order, rating=5)
+
+        response = self.client.get(api_url, HTTP_IF_NONE_MATCH=api_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["rating_count"], 1)
+        self.assertEqual(self.client.get(page_url, HTTP_IF_NONE_MATCH=page_etag).status_code, 200)
+
+    def test_reconcile_project_stats(self):
+        OrderReview.objects.create(order=self.order, rating=3)
+        Project.objects.filter(pk=self.project.pk).update(rating_sum=40, rating_count=9, orders_completed=7)
+
+        out = StringIO()
+        call_command("reconcile_project_stats", "--dry-run", stdout=out)
+        self.assertIn("1 project(s) out of sync", out.getvalue())
+        self.assertEqual(self.counters(), (40, 9, 7))
+
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("reconcile_project_stats", stdout=StringIO())
+        self.assertEqual(self.counters(), (3, 1, 0))
+        self.assertGreater(get_catalog_version(), version)
+
+
+# -------------------------------------------------------------------
+# RECOMMENDATIONS
+# -------------------------------------------------------------------
+class RecommendTests(TestCase):
+    KIND = RelatedItem.KIND_PROJECT
+
+    def setUp(self):
+        self.projects = [
+            Project.objects.create(
+                title=f"Shop {i}", short_description=f"django python store{i}", description=f"web shop extra{i % 3}",
+                tech_stack="Django", price="10.00",
+            )
+            for i in range(recommend.TOP_K + 3)
+        ]
+        recommend.rebuild(self.KIND)
+
+    def lists(self):
+        rows = RelatedItem.objects.filter(kind=self.KIND).order_by("source_id", "rank")
+        out = {}
+        for row in rows:
+            out.setdefault(row.source_id, []).append(row.target_id)
+        return out
+
+    def edit(self, project, **fields):
+        for name, value in fields.items():
+            setattr(project, name, value)
+        project.save()
+        recommend.refresh_item(self.KIND, project)
+
+    def test_lists_are_refilled_when_an_item_drops_out(self):
+        moved = self.projects[0]
+        self.assertTrue(RelatedItem.objects.filter(kind=self.KIND, target_id=moved.pk).exists())
+
+        self.edit(moved, title="Firmware", short_description="rust embedded", description="bare metal",
+                  tech_stack="Rust")
+        lists = self.lists()
+        self.assertNotIn(moved.pk, lists)
+        for project in self.projects[1:]:
+            self.assertEqual(len(lists[project.pk]), recommend.TOP_K)
+            self.assertNotIn(moved.pk, lists[project.pk])
+
+        # ... and it comes back into the lists once it is similar again
+        self.edit(moved, title="Shop 0", short_description="django python store0", description="web shop extra0",
+                  tech_stack="Django")
+        refreshed = self.lists()
+        recommend.rebuild(self.KIND)
+        self.assertEqual(refreshed, self.lists())
+
+    def test_hidden_item_leaves_every_list(self):
+        hidden = self.projects[1]
+        self.edit(hidden, is_active=False)
+        lists = self.lists()
+        self.assertNotIn(hidden.pk, lists)
+        for project in self.projects[2:]:
+            self.assertEqual(len(lists[project.pk]), recommend.TOP_K)
+            self.assertNotIn(hidden.pk, lists[project.pk])
+
+    def test_cached_vectors_follow_edits(self):
+        corpus = recommend.get_corpus(self.KIND)
+        self.edit(self.projects[2], description="web shop kotlin android")
+        Project.objects.create(title="New", short_description="django", description="web", tech_stack="Django",
+                               price="1.00")
+        self.assertIs(recommend.get_corpus(self.KIND), corpus)
+
+        fresh = recommend.Corpus(self.KIND).sync()
+        self.assertEqual(set(corpus.vectors), set(fresh.vectors))
+        for doc_id, vector in fresh.vectors.items():
+            self.assertEqual(set(corpus.vectors[doc_id]), set(vector))
+            for term, weight in vector.items():
+                self.assertAlmostEqual(corpus.vectors[doc_id][term], weight)
+
+
+# -------------------------------------------------------------------
+# SEARCH AUTOCOMPLETE
+# -------------------------------------------------------------------
+class PrefixIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # start every test without this process's index
+        patcher = mock.patch.multiple(search_index, _index=None, _index_version=None, _checked_at=0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.shop = Project.objects.create(
+            title="Django Shop", short_description="s", description="d", tech_stack="Django, PostgreSQL", price="1.00",
+        )
+        self.bot = Project.objects.create(
+            title="Discord Bot", short_description="s", description="d", tech_stack="Python / discord.py", price="1.00",
+        )
+        Project.objects.create(
+            title="Hidden Dashboard", short_description="s", description="d", tech_stack="Django", price="1.00",
+            is_active=False,
+        )
+
+    def test_prefix_matches_words_slugs_and_technologies(self):
+        index = search_index.build_index()
+        projects, techs = index.search("  DJ ")
+        self.assertEqual([p["slug"] for p in projects], [self.shop.slug])
+        self.assertEqual(projects[0]["url"], reverse("store:project_detail", args=[self.shop.slug]))
+        self.assertEqual(techs, ["Django"])
+
+        projects, techs = index.search("d")
+        self.assertEqual({p["title"] for p in projects}, {"Django Shop", "Discord Bot"})
+        self.assertEqual(techs, ["discord.py", "Django"])
+        self.assertEqual(index.search("bot"), ([index.projects[self.bot.id]], []))
+        self.assertEqual(index.search("hidden"), ([], []))
+        self.assertEqual(index.search("   "), ([], []))
+
+    def test_search_limit(self):
+        for i in range(10):
+            Project.objects.create(
+                title=f"Widget {i}", short_description="s", description="d", tech_stack=f"Widget{i}", price="1.00",
+            )
+        projects, techs = search_index.build_index().search("widget", limit=4)
+        self.assertEqual(len(projects), 4)
+        self.assertEqual(len(techs), 4)
+        self.assertEqual(len(search_index.build_index().search("widget")[0]), 8)
+
+    def test_index_rebuilt_after_project_edit(self):
+        index = search_index.get_index()
+        with self.assertNumQueries(0):
+            self.assertIs(search_index.get_index(), index)
+        self.assertEqual(index.search("flask"), ([], []))
+
+        self.bot.tech_stack = "Flask"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bot.save()
+
+        rebuilt = search_index.get_index()
+        self.assertIsNot(rebuilt, index)
+        self.assertEqual(rebuilt.search("flask"), ([rebuilt.projects[self.bot.id]], ["Flask"]))
+
+    def test_autocomplete_endpoint(self):
+        url = reverse("store:project_autocomplete")
+        response = self.client.get(url, {"q": " djan "})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response["Cache-Control"], "public, max-age=30")
+        data = response.json()
+        self.assertEqual(data["q"], "djan")
+        self.assertEqual([p["slug"] for p in data["projects"]], [self.shop.slug])
+        self.assertEqual(data["technologies"], ["Django"])
+
+        self.assertEqual(self.client.get(url).json(), {"q": "", "projects": [], "technologies": []})
+        data = self.client.get(url, {"q": "d" * 500}).json()
+        self.assertEqual(data["q"], "d" * 100)
+        self.assertEqual(data["projects"], [])
+
+
+# -------------------------------------------------------------------
+# JSON API
+# -------------------------------------------------------------------
+class ApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.projects = [
+            Project.objects.create(
+                title=f"Api {i}", short_description="short", description="long", tech_stack="Django", price="10.00",
+            )
+            for i in range(5)
+        ]
+        # same created_at for two rows: the cursor must break ties on id
+        Project.objects.filter(pk=self.projects[1].pk).update(created_at=self.projects[2].created_at)
+        self.url = reverse("store:api_project_list")
+
+    def test_sparse_fields_load_only_those_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, {"fields": "title,nope"})
+        self.assertEqual(list(response.json()["results"][0]), ["title"])
+        sql = [q["sql"] for q in ctx.captured_queries if '"store_project"' in q["sql"]][0]
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('"price"', sql)
+
+    def test_cursor_pagination_walks_every_row_once(self):
+        seen, url = [], self.url + "?limit=2&fields=id"
+        while url:
+            page = self.client.get(url).json()
+            seen += [row["id"] for row in page["results"]]
+            url = page["next"]
+        self.assertEqual(sorted(seen), sorted(p.pk for p in self.projects))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_bad_cursor_and_limit(self):
+        self.assertEqual(self.client.get(self.url, {"cursor": "!!"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"limit": "x"}).status_code, 400)
+
+    def test_matching_etag_gets_304_without_catalog_queries(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertEqual(response["Cache-Control"], "public, no-cache")
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([q for q in ctx.captured_queries if '"store_project"' in q["sql"]])
+
+        # a different query string is a different resource
+        other = self.client.get(self.url, {"limit": 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(other.status_code, 200)
+
+    def test_counter_change_invalidates_etag(self):
+        url = reverse("store:api_project_detail", args=[self.projects[0].slug])
+        etag = self.client.get(url)["ETag"]
+        order = Order.objects.create(user=User.objects.create_user("api"), project=self.projects[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            OrderReview.objects.create(order=order, rating=4)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["rating_average"], 4)
+
+    def test_orders_are_private(self):
+        url = reverse("store:api_order_list")
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.client.force_login(User.objects.create_user("api"))
+        response = self.client.get(url)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        self.assertEqual(response.json()["results"], [])
+
+
+    def test_order_change_in_another_process_invalidates_etag(self):
+        user = User.objects.create_user("api")
+        order = Order.objects.create(user=user, project=self.projects[0], price="10.00")
+        self.client.force_login(user)
+        url = reverse("store:api_order_list")
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # no signal, so no bump in this process's LocMemCache
+        Order.objects.filter(pk=order.pk).update(status="completed", updated_at=timezone.now())
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["status"], "completed")
+
+        etag = response["ETag"]
+        Order.objects.filter(pk=order.pk).delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        # with a shared cache the counter is used and the DB is not asked
+        with mock.patch("store.catalog.shared_cache", return_value=True), self.assertNumQueries(0):
+            self.assertEqual(get_orders_version(user.pk), 1)
+
+
+# -------------------------------------------------------------------
+# HTTP CACHE
+# -------------------------------------------------------------------
+class CatalogHttpCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def get(self, template):
+        @catalog_cache()
+        def view(request):
+            return HttpResponse(Template(template).render(RequestContext(request)))
+
+        middleware = ConditionalCatalogMiddleware(view)
+        request = RequestFactory().get("/page/")
+        request.user = AnonymousUser()
+        self.assertIsNone(middleware.process_view(request, view, (), {}))
+        return middleware(request)
+
+    def test_page_without_token_is_public(self):
+        response = self.get("<p>catalog</p>")
+        self.assertIn("public", response["Cache-Control"])
+        self.assertTrue(response.has_header("ETag"))
+
+    def test_page_with_csrf_token_is_private(self):
+        response = self.get("<form>{% csrf_token %}</form>")
+        self.assertIn("csrfmiddlewaretoken", response.content.decode())
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        self.assertFalse(response.has_header("ETag"))
+
+
+# -------------------------------------------------------------------
+# RESPONSE COMPRESSION
+# -------------------------------------------------------------------
+@override_settings(COMPRESSION_MIN_SIZE=1024)
+class CompressionTests(SimpleTestCase):
+    body = b"<p>" + b"catalog page " * 200 + b"</p>"
+
+    def get(self, response, accept="gzip, deflate, br", csrf=False):
+        def view(request):
+            if csrf:
+                get_token(request)
+            return response
+
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept)
+        return compression.CompressionMiddleware(view)(request)
+
+    def test_prefers_brotli(self):
+        response = self.get(HttpResponse(self.body))
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(compression.brotli.decompress(response.content), self.body)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_gzip_when_brotli_refused_or_missing(self):
+        response = self.get(HttpResponse(self.body), accept="br;q=0, gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+        with mock.patch.object(compression, "brotli", None):
+            response = self.get(HttpResponse(self.body))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_left_alone(self):
+        for response, accept in [
+            (HttpResponse(self.body), ""),  # client accepts nothing
+            (HttpResponse(b"x" * 1023), "gzip, br"),  # below COMPRESSION_MIN_SIZE
+            (HttpResponse(self.body, content_type="image/png"), "gzip, br"),
+        ]:
+            response = self.get(response, accept=accept)
+            self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_streaming_is_compressed_chunk_by_chunk(self):
+        chunks = [b"<li>row %d</li>" % i for i in range(50)]
+        response = self.get(StreamingHttpResponse(iter(chunks)))
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(compression.brotli.decompress(b"".join(response.streaming_content)), b"".join(chunks))
+
+        response = self.get(StreamingHttpResponse(iter(chunks)), accept="gzip")
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), b"".join(chunks))
+        self.assertFalse(response.has_header("Content-Length"))
+
+    def test_csrf_page_gets_padded_gzip_not_brotli(self):
+        plain = self.get(HttpResponse(self.body), accept="gzip")
+        self.assertFalse(plain.content[3] & gzip.FNAME)
+
+        response = self.get(HttpResponse(self.body), csrf=True)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        # the random padding travels as a gzip file name
+        self.assertTrue(response.content[3] & gzip.FNAME)
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+    def test_strong_etag_is_weakened(self):
+        response = HttpResponse(self.body)
+        response["ETag"] = '"abc"'
+        self.assertEqual(self.get(response)["ETag"], 'W/"abc"')
+
+
+# -------------------------------------------------------------------
+# SITEMAPS & FEEDS
+# -------------------------------------------------------------------
+class SitemapFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.live = Project.objects.create(
+            title="Live Project", short_description="s", description="d", tech_stack="Django", price="1.00",
+        )
+        self.inactive = Project.objects.create(
+            title="Retired Project", short_description="s", description="d", tech_stack="Django", price="1.00",
+            is_active=False,
+        )
+        self.post = BlogPost.objects.create(
+            title="Published Post", slug="published", content="Hello world.", is_published=True,
+        )
+        self.draft = BlogPost.objects.create(title="Draft Post", slug="draft", content="Not yet.")
+
+    def test_sitemap_index_and_sections(self):
+        response = self.client.get(reverse("store:sitemap"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/xml")
+        for section in ("static", "projects", "blog"):
+            self.assertContains(response, reverse("store:sitemap_section", args=[section]))
+
+        projects = self.client.get(reverse("store:sitemap_section", args=["projects"]))
+        self.assertEqual(projects["Content-Type"], "application/xml")
+        self.assertContains(projects, reverse("store:project_detail", args=[self.live.slug]))
+        self.assertNotContains(projects, reverse("store:project_detail", args=[self.inactive.slug]))
+        self.assertContains(projects, "<lastmod>")
+
+        blog = self.client.get(reverse("store:sitemap_section", args=["blog"]))
+        self.assertContains(blog, reverse("store:blog_detail", args=[self.post.pk]))
+        self.assertNotContains(blog, reverse("store:blog_detail", args=[self.draft.pk]))
+
+        self.assertEqual(self.client.get(reverse("store:sitemap_section", args=["nope"])).status_code, 404)
+
+    def test_feeds_leave_out_unpublished_items(self):
+        feeds = [
+            ("store:feed_blog_rss", "application/rss+xml", "Published Post", "Draft Post"),
+            ("store:feed_blog_atom", "application/atom+xml", "Published Post", "Draft Post"),
+            ("store:feed_projects_rss", "application/rss+xml", "Live Project", "Retired Project"),
+            ("store:feed_projects_atom", "application/atom+xml", "Live Project", "Retired Project"),
+        ]
+        for name, content_type, shown, hidden in feeds:
+            with self.subTest(name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response["Content-Type"], f"{content_type}; charset=utf-8")
+                self.assertContains(response, shown)
+                self.assertNotContains(response, hidden)
+
+    def test_publishing_shows_up_in_the_cached_feed(self):
+        url = reverse("store:feed_blog_rss")
+        self.assertNotContains(self.client.get(url), "Draft Post")
+        self.draft.is_published = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.save()
+        self.assertContains(self.client.get(url), "Draft Post")
+
+
+# -------------------------------------------------------------------
+# RATE LIMITING
+# -------------------------------------------------------------------
+class ClientIpTests(SimpleTestCase):
+    def ip(self, forwarded):
+        return ratelimit.client_ip(RequestFactory().get("/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=forwarded))
+
+    def test_default_trusts_one_proxy(self):
+        self.assertEqual(self.ip("6.6.6.6, 1.2.3.4"), "1.2.3.4")
+        self.assertEqual(self.ip(""), "10.0.0.1")
+
+    @override_settings(RATELIMIT_TRUSTED_PROXIES=0)
+    def test_no_trusted_proxies_uses_remote_addr(self):
+        self.assertEqual(self.ip("6.6.6.6"), "10.0.0.1")
+
+    def test_client_supplied_entries_are_ignored(self):
+        # the client sent "6.6.6.6"; the proxies appended the real addresses
+        with override_settings(RATELIMIT_TRUSTED_PROXIES=1):
+            self.assertEqual(self.ip("6.6.6.6, 1.2.3.4"), "1.2.3.4")
+        with override_settings(RATELIMIT_TRUSTED_PROXIES=2):
+            self.assertEqual(self.ip("6.6.6.6, 1.2.3.4, 172.16.0.2"), "1.2.3.4")
+            self.assertEqual(self.ip("1.2.3.4"), "10.0.0.1")
+
+
+@override_settings(RATELIMIT_ENABLED=True, RATELIMIT_RATES={"login:ip": "2/m"}, RATELIMIT_TRUSTED_PROXIES=0)
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.now = 1_000_000 * 60  # start of a window
+
+    def count(self, at):
+        with mock.patch.object(ratelimit.time, "time", return_value=self.now + at):
+            return ratelimit.count_request("login:ip", "1.2.3.4", "2/m")
+
+    def test_no_burst_across_the_window_boundary(self):
+        self.assertEqual(self.count(50), (True, 0))
+        self.assertEqual(self.count(55), (True, 0))
+        # 40s: 10s to the boundary, then half of the 2 old requests slid out
+        self.assertEqual(self.count(58), (False, 2 + 30))
+        # a fixed window would allow 2 more right after the boundary
+        self.assertFalse(self.count(61)[0])
+        self.assertEqual(self.count(90), (True, 0))
+        self.assertFalse(self.count(91)[0])
+
+    def test_refused_requests_do_not_use_up_the_window(self):
+        self.count(0)
+        self.count(1)
+        for at in range(2, 30):
+            self.assertFalse(self.count(at)[0])
+        self.assertEqual(self.count(90), (True, 0))
+
+    def test_view_gets_429_with_retry_after_and_counters(self):
+        url = reverse("store:login")
+        for _ in range(2):
+            self.assertEqual(self.client.post(url, {"username": "x", "password": "y"}).status_code, 200)
+        response = self.client.post(url, {"username": "x", "password": "y"})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+        self.assertEqual(ratelimit.ratelimit_stats(), {"login:ip": {"allowed": 2, "blocked": 1}})
+
+    @override_settings(RATELIMIT_TRUSTED_PROXIES=1)
+    def test_clients_behind_the_proxy_get_their_own_bucket(self):
+        url = reverse("store:login")
+        data = {"username": "x", "password": "y"}
+        # same REMOTE_ADDR (the proxy) for everyone
+        first = {"REMOTE_ADDR": "10.0.0.1", "HTTP_X_FORWARDED_FOR": "1.1.1.1"}
+        second = {"REMOTE_ADDR": "10.0.0.1", "HTTP_X_FORWARDED_FOR": "2.2.2.2"}
+        for _ in range(2):
+            self.assertEqual(self.client.post(url, data, **first).status_code, 200)
+        self.assertEqual(self.client.post(url, data, **first).status_code, 429)
+        self.assertEqual(self.client.post(url, data, **second).status_code, 200)
+
+
+# -------------------------------------------------------------------
+# LOGIN
+# -------------------------------------------------------------------
+@override_settings(RATELIMIT_ENABLED=False)
+class LoginBackendTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("reader", "reader@example.com", "pass12345")
+        self.url = reverse("store:login")
+
+    def user_selects(self, ctx):
+        return [q for q in ctx.captured_queries if q["sql"].startswith("SELECT") and 'FROM "auth_user"' in q["sql"]]
+
+    def test_single_user_lookup_per_login(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, {"username": "reader", "password": "pass12345"})
+        self.assertRedirects(response, reverse("store:home"), fetch_redirect_response=False)
+        self.assertEqual(len(self.user_selects(ctx)), 1)
+
+        # a rejected password is not checked again by ModelBackend
+        self.client.logout()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, {"username": "reader", "password": "wrong"})
+        self.assertContains(response, "Invalid username or password.")
+        self.assertEqual(len(self.user_selects(ctx)), 1)
+
+    def test_inactive_user_gets_the_verification_message(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.post(self.url, {"username": "reader", "password": "pass12345"})
+        self.assertContains(response, "Your email is not verified yet.")
+        self.assertTrue(response.wsgi_request.login_inactive_user)
+
+        # the wrong password on the same account gives nothing away
+        response = self.client.post(self.url, {"username": "reader", "password": "wrong"})
+        self.assertContains(response, "Invalid username or password.")
+        self.assertFalse(hasattr(response.wsgi_request, "login_inactive_user"))
+
+    def test_sessions_from_model_backend_stay_logged_in(self):
+        self.client.force_login(self.user, backend="django.contrib.auth.backends.ModelBackend")
+        self.assertEqual(self.client.get(reverse("store:account_dashboard")).status_code, 200)
+
+    @skipUnless(importlib.util.find_spec("argon2"), "argon2-cffi is not installed")
+    @override_settings(
+        PASSWORD_HASHERS=settings.PASSWORD_HASHER_PROFILES["argon2"],
+        ARGON2_TIME_COST=1, ARGON2_MEMORY_COST=1024, ARGON2_PARALLELISM=1,
+    )
+    def test_login_upgrades_hash_to_the_tuned_argon2_profile(self):
+        # PBKDF2, or Argon2 with Django's default costs
+        for old_hasher in (PBKDF2PasswordHasher(), Argon2PasswordHasher()):
+            with self.subTest(old_hasher.algorithm):
+                User.objects.filter(pk=self.user.pk).update(password=make_password("pass12345", hasher=old_hasher))
+                self.assertNotIn("$m=1024,t=1,p=1$", User.objects.get(pk=self.user.pk).password)
+                self.assertEqual(authenticate(username="reader", password="pass12345"), self.user)
+
+                self.user.refresh_from_db()
+                hasher = identify_hasher(self.user.password)
+                self.assertEqual(type(hasher), type(get_hasher()))
+                self.assertFalse(hasher.must_update(self.user.password))
+                self.assertIn("$m=1024,t=1,p=1$", self.user.password)
+
+    def test_bench_login(self):
+        out = StringIO()
+        call_command("bench_login", seconds=0.01, stdout=out)
+        self.assertIn(f"new passwords are hashed with: {get_hasher().algorithm}", out.getvalue())
+
+
+# -------------------------------------------------------------------
+# JOB QUEUE
+# -------------------------------------------------------------------
+@override_settings(JOBS_EAGER=False)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.calls = []
+        self.fail = False
+
+        def probe(n=0):
+            self.calls.append(n)
+            if self.fail:
+                raise RuntimeError("boom")
+
+        probe.task_name, probe.task_priority, probe.task_max_attempts = "probe", 0, 2
+        patcher = mock.patch.dict(jobs.TASKS, {"probe": probe})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_claim_takes_highest_priority_once(self):
+        low = jobs.enqueue("probe", {"n": 1})
+        high = jobs.enqueue("probe", {"n": 2}, priority=5)
+        jobs.enqueue("probe", {"n": 3}, delay=timedelta(hours=1))  # not due
+
+        self.assertEqual(jobs.claim("a").pk, high.pk)
+        self.assertEqual(jobs.claim("b").pk, low.pk)
+        self.assertIsNone(jobs.claim("c"))
+
+    def test_failure_backs_off_then_fails(self):
+        self.fail = True
+        job = jobs.enqueue("probe")
+        with self.assertLogs("store.jobs", "ERROR"):
+            self.assertFalse(jobs.run_job(jobs.claim("w"), "w"))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_QUEUED, 1))
+        self.assertIn("boom", job.last_error)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=5))
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs("store.jobs", "ERROR"):
+            jobs.run_job(jobs.claim("w"), "w")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_FAILED, 2))
+
+    def test_backoff_grows_and_is_capped(self):
+        self.assertTrue(8 <= jobs.backoff(1).total_seconds() <= 12)
+        self.assertTrue(32 <= jobs.backoff(3).total_seconds() <= 48)
+        self.assertLessEqual(jobs.backoff(30).total_seconds(), jobs.BACKOFF_MAX * 1.2)
+
+    def test_expired_lock_is_retried_until_max_attempts(self):
+        job = jobs.enqueue("probe")
+        jobs.claim("dead")
+        expired = timezone.now() - jobs.LOCK_TIMEOUT - timedelta(seconds=1)
+        Job.objects.filter(pk=job.pk).update(locked_at=expired)
+        self.assertEqual(jobs.claim("w").attempts, 2)
+
+        # the second worker dies too: that was the last attempt
+        Job.objects.filter(pk=job.pk).update(locked_at=expired)
+        self.assertIsNone(jobs.claim("w"))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_FAILED, 2))
+
+    def test_idempotency_key_is_enqueued_once(self):
+        first = jobs.enqueue("probe", idempotency_key="once")
+        jobs.run_job(jobs.claim("w"), "w")
+        self.assertEqual(jobs.enqueue("probe", idempotency_key="once").pk, first.pk)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_dedup_key_collapses_pending_jobs_only(self):
+        project = Project.objects.create(title="Dedup", short_description="s", description="d", tech_stack="x", price=1)
+        for _ in range(3):
+            project.save()
+        refreshes = Job.objects.filter(task="refresh_related")
+        self.assertEqual(refreshes.count(), 1)
+
+        # a change made while the refresh runs needs another run
+        jobs.claim("w")
+        project.save()
+        self.assertEqual(refreshes.count(), 2)
+
+    def test_scheduler_enqueues_each_slot_once(self):
+        now = timezone.now()
+        # the jobs seeded by the migrations are not due
+        ScheduledJob.objects.update(next_run_at=now + timedelta(hours=1))
+        scheduled = ScheduledJob.objects.create(
+            name="probe", task="probe", interval_seconds=60, next_run_at=now - timedelta(seconds=150)
+        )
+        self.assertEqual(jobs.enqueue_scheduled(), 1)
+        self.assertEqual(jobs.enqueue_scheduled(), 0)
+        scheduled.refresh_from_db()
+        # missed slots are skipped, not replayed
+        self.assertTrue(now < scheduled.next_run_at <= now + timedelta(seconds=60))
+        self.assertEqual(Job.objects.filter(task="probe").count(), 1)
+
+    def test_migrations_schedule_the_periodic_tasks(self):
+        scheduled = {job.task: job for job in ScheduledJob.objects.filter(is_active=True)}
+        for task in ("expire_uploads", "flush_view_counts", "refresh_sales_rollups"):
+            self.assertIn(task, scheduled)
+            self.assertIn(task, jobs.TASKS)
+            self.assertEqual(scheduled[task].priority, jobs.TASKS[task].task_priority)
+
+    @override_settings(JOBS_KEEP_DONE_DAYS=7)
+    def test_prune_done_keeps_recent_and_failed_jobs(self):
+        old = timezone.now() - timedelta(days=8)
+        for status, finished_at in [
+            (Job.STATUS_DONE, old), (Job.STATUS_DONE, timezone.now()), (Job.STATUS_FAILED, old),
+        ]:
+            Job.objects.create(task="probe", status=status, finished_at=finished_at)
+        self.assertEqual(jobs.prune_done(), 1)
+        self.assertEqual(Job.objects.count(), 2)
+
+
+# -------------------------------------------------------------------
+# LIVE ORDER EVENTS
+# -------------------------------------------------------------------
+@override_settings(ORDER_EVENTS_POLL_SECONDS=0.01)
+class OrderEventStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("watcher", password="pass12345")
+        project = Project.objects.create(
+            title="Streamed", short_description="s", description="d", tech_stack="Django", price="1.00",
+        )
+        self.order = Order.objects.create(user=self.user, project=project, price="1.00")
+
+    def add_event(self, status="completed"):
+        return OrderEvent.objects.create(order=self.order, user=self.user, from_status="pending", to_status=status)
+
+    async def chunks_until_event(self, stream, limit=20):
+        seen = []
+        for _ in range(limit):
+            chunk = await stream.__anext__()
+            seen.append(chunk)
+            if chunk.startswith("id: "):
+                return seen
+        self.fail(f"no event in {seen}")
+
+    async def test_published_event_reaches_the_stream(self):
+        old = await sync_to_async(self.add_event)("processing")
+        stream = events.stream(self.user.pk, after_id=0)
+        self.assertEqual(await stream.__anext__(), f"retry: {events.RETRY_MS}\n\n")
+        # missed while disconnected: replayed from the DB
+        self.assertTrue((await stream.__anext__()).startswith(f"id: {old.pk}\n"))
+
+        payload = {"id": old.pk + 100, "order_id": self.order.pk, "status": "completed"}
+        events.broker.publish(self.user.pk, payload)
+        chunk = (await self.chunks_until_event(stream))[-1]
+        self.assertIn('"status": "completed"', chunk)
+        self.assertTrue(chunk.startswith(f"id: {old.pk + 100}\nevent: status\n"))
+
+        await stream.aclose()
+        self.assertNotIn(self.user.pk, events.broker._subscribers)
+
+    async def test_polls_for_events_from_other_processes(self):
+        stream = events.stream(self.user.pk, after_id=0)
+        await stream.__anext__()
+        self.assertEqual(await stream.__anext__(), ": keepalive\n\n")
+
+        # committed elsewhere: never published on this process's broker
+        event = await sync_to_async(self.add_event)()
+        with mock.patch.object(events, "events_after", wraps=events.events_after) as events_after:
+            seen = await self.chunks_until_event(stream)
+        self.assertTrue(seen[-1].startswith(f"id: {event.pk}\n"))
+        # idle polls back off: keepalives in between, not a query each
+        self.assertLess(events_after.call_count, len(seen))
+        await stream.aclose()
+
+    async def test_shared_cache_polls_the_db_only_when_the_version_moved(self):
+        event = await sync_to_async(self.add_event)()
+        versions = iter([1, 1, 1, 2])
+        with ExitStack() as stack:
+            stack.enter_context(mock.patch.object(events, "shared_cache", return_value=True))
+            stack.enter_context(mock.patch.object(events, "get_orders_version", lambda user_id: next(versions)))
+            events_after = stack.enter_context(mock.patch.object(events, "events_after", return_value=[]))
+            stream = events.stream(self.user.pk, after_id=event.pk)
+            for _ in range(3):
+                await stream.__anext__()
+            self.assertEqual(events_after.call_count, 1)  # the initial replay
+
+            events_after.return_value = [events.event_payload(event)]
+            self.assertTrue((await stream.__anext__()).startswith(f"id: {event.pk}\n"))
+            self.assertEqual(events_after.call_count, 2)
+            await stream.aclose()
+
+    def test_endpoint_needs_login_and_asgi(self):
+        url = reverse("store:order_events")
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 204)
+
+
+class CancelOnDisconnectTests(SimpleTestCase):
+    def scope(self, accept):
+        return {"type": "http", "path": "/orders/events/", "headers": [(b"accept", accept)]}
+
+    async def run_app(self, accept, messages, timeout=5):
+        state = {}
+
+        async def app(scope, receive, send):
+            state["body"] = await receive()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+
+        queue = asyncio.Queue()
+        for message in messages:
+            queue.put_nowait(message)
+        wrapped = events.cancel_on_disconnect(app)
+        await asyncio.wait_for(wrapped(self.scope(accept), queue.get, None), timeout)
+        return state
+
+    async def test_stream_is_cancelled_when_the_client_leaves(self):
+        state = await self.run_app(
+            b"text/event-stream", [{"type": "http.request", "body": b""}, {"type": "http.disconnect"}],
+        )
+        self.assertEqual(state, {"body": {"type": "http.request", "body": b""}, "cancelled": True})
+
+    async def test_other_requests_pass_through(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.run_app(
+                b"text/html", [{"type": "http.request", "body": b""}, {"type": "http.disconnect"}], timeout=0.2,
+            )
+
+
+# -------------------------------------------------------------------
+# CONTENT RENDERING
+# -------------------------------------------------------------------
+class ContentRenderTests(SimpleTestCase):
+    source = (
+        "# Title\n\n"
+        "<script>alert(1)</script>\n\n"
+        '<img src="x.png" onerror="alert(2)">\n\n'
+        "[link](https://example.com) and **bold**"
+    )
+
+    def test_markdown_is_sanitized(self):
+        html = content.render(self.source, content.FORMAT_MARKDOWN)
+        self.assertNotIn("<script", html)
+        self.assertNotIn("onerror", html)
+        self.assertIn("<h1>Title</h1>", html)
+        self.assertIn("<strong>bold</strong>", html)
+        self.assertIn('rel="noopener noreferrer nofollow"', html)
+
+    def test_without_nh3_raw_html_is_escaped(self):
+        with mock.patch.object(content, "nh3", None):
+            html = content.render(self.source, content.FORMAT_MARKDOWN)
+        self.assertNotIn("<script", html)
+        self.assertNotIn("<img", html)
+
+    def test_only_safe_link_schemes_are_kept(self):
+        source = (
+            "[a](javascript:alert(1)) [b](JavaScript&#58;alert(2)) ![c](data:text/html,x) "
+            "[ok](https://example.com/?a=1&b=2) [rel](/projects/) [mail](mailto:me@example.com) <me@example.com>"
+        )
+        for nh3 in (content.nh3, None):
+            with self.subTest(nh3=nh3), mock.patch.object(content, "nh3", nh3):
+                html = content.render(source, content.FORMAT_MARKDOWN)
+                urls = [unescape(url).lower() for url in re.findall(r'(?:href|src)="([^"]*)"', html)]
+                self.assertFalse([url for url in urls if url.startswith(("javascript:", "data:"))], html)
+                self.assertIn('href="https://example.com/?a=1&amp;b=2"', html)
+                self.assertIn('href="/projects/"', html)
+                self.assertIn('href="mailto:me@example.com"', html)
+
+    def test_safe_url(self):
+        for url in ["java\tscript:x", " javascript:x", "java&#9;script:x", "&#106;avascript:x", "vbscript:x"]:
+            self.assertFalse(content.safe_url(url), url)
+        for url in ["http://x", "HTTPS://x", "mailto:a@b.c", "/p/1/", "#top", "page?next=http://x"]:
+            self.assertTrue(content.safe_url(url), url)
+
+    def test_plain_text_is_escaped(self):
+        html = content.render(self.source)
+        self.assertNotIn("<script", html)
+        self.assertIn("&lt;script&gt;", html)
+
+
+class ContentExcerptTests(TestCase):
+    def test_excerpt_is_cut_at_a_word_boundary(self):
+        text = " ".join(f"word{i}" for i in range(content.EXCERPT_WORDS + 10))
+        excerpt = content.make_excerpt(f"<p>{text}</p>")
+        self.assertEqual(excerpt, " ".join(text.split()[:content.EXCERPT_WORDS]) + "…")
+        self.assertEqual(content.make_excerpt("short text"), "short text")
+        self.assertEqual(content.make_excerpt("one two three", words=2), "one two…")
+
+    def test_markup_is_stripped(self):
+        html = "<h1>Title</h1>\n<p>Fish &amp; <strong>chips</strong>,\n  <a href='/x'>here</a></p>"
+        self.assertEqual(content.make_excerpt(html), "Title Fish & chips, here")
+        self.assertEqual(content.reading_time(html), 1)
+        self.assertEqual(content.reading_time("word " * (content.WORDS_PER_MINUTE * 2 + 1)), 3)
+
+    def test_save_fills_excerpt_from_the_rendered_source(self):
+        post = BlogPost.objects.create(
+            title="Md", slug="md", content="# Heading\n\nSome **bold** text", content_format=content.FORMAT_MARKDOWN,
+        )
+        self.assertEqual(post.excerpt, "Heading Some bold text")
+
+    def test_backfill_fills_empty_excerpts(self):
+        post = BlogPost.objects.create(title="Old", slug="old", content="word " * 450)
+        project = Project.objects.create(
+            title="Old", short_description="s", description="Legacy\n\ndescription", tech_stack="x", price="1.00",
+        )
+        # rows from before the excerpt columns existed
+        BlogPost.objects.filter(pk=post.pk).update(excerpt="", reading_time=1)
+        Project.objects.filter(pk=project.pk).update(excerpt="")
+
+        out = StringIO()
+        call_command("backfill_content", "--dry-run", stdout=out)
+        self.assertIn("1 post(s) and 1 project(s) out of date", out.getvalue())
+        self.assertEqual(BlogPost.objects.get(pk=post.pk).excerpt, "")
+
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("backfill_content", stdout=StringIO())
+        post.refresh_from_db()
+        project.refresh_from_db()
+        self.assertTrue(post.excerpt.endswith("word…"))
+        self.assertEqual(post.reading_time, 3)
+        self.assertEqual(project.excerpt, "Legacy description")
+        self.assertGreater(get_catalog_version(), version)
+
+        out = StringIO()
+        call_command("backfill_content", stdout=out)
+        self.assertIn("0 post(s) and 0 project(s) updated", out.getvalue())
+
+    def test_migration_backfill(self):
+        post = BlogPost.objects.create(title="Mig", slug="mig", content="<p>Hello <i>there</i></p>")
+        BlogPost.objects.filter(pk=post.pk).update(excerpt="", reading_time=5)
+        migration = importlib.import_module("store.migrations.0013_content_excerpts")
+        migration.backfill(django_apps, None)
+        post.refresh_from_db()
+        self.assertEqual((post.excerpt, post.reading_time), ("Hello there", 1))
+
+
+# -------------------------------------------------------------------
+# RESUMABLE UPLOADS
+# -------------------------------------------------------------------
+@override_settings(DATABASE_REPLICAS=[])  # see BuyProjectTests
+class ResumableUploadTests(TestCase):
+    data = b"0123456789" * 1000
+
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        override = override_settings(MEDIA_ROOT=tmp + "/media", CHUNKED_UPLOAD_DIR=Path(tmp) / "parts")
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(uploads._hashers.clear)
+
+        self.project = Project.objects.create(
+            title="Deliverable", short_description="s", description="d", tech_stack="x", price=1
+        )
+        self.client.force_login(User.objects.create_user("staff", is_staff=True))
+
+    def create(self):
+        metadata = ",".join(
+            f"{key} {base64.b64encode(value.encode()).decode()}"
+            for key, value in [("filename", "../source code.zip"), ("project", str(self.project.pk))]
+        )
+        response = self.client.post(
+            reverse("store:upload_create"), HTTP_UPLOAD_LENGTH=str(len(self.data)), HTTP_UPLOAD_METADATA=metadata
+        )
+        self.assertEqual(response.status_code, 201)
+        return response["Location"]
+
+    def patch(self, url, offset, chunk):
+        return self.client.generic(
+            "PATCH", url, chunk, content_type="application/offset+octet-stream", HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def test_upload_in_chunks_with_resume(self):
+        url = self.create()
+        upload = ChunkedUpload.objects.get()
+        self.assertEqual(upload.filename, "source_code.zip")
+
+        self.assertEqual(self.patch(url, 0, self.data[:4000])["Upload-Offset"], "4000")
+        # a retried chunk the server already has: the client must resync
+        response = self.patch(url, 0, self.data[:4000])
+        self.assertEqual((response.status_code, response["Upload-Offset"]), (409, "4000"))
+
+        # resumed on another worker, which never saw the first chunk
+        uploads._hashers.clear()
+        self.assertEqual(self.client.head(url)["Upload-Offset"], "4000")
+        self.assertEqual(self.patch(url, 4000, self.data[4000:]).status_code, 204)
+
+        digest = hashlib.sha256(self.data).hexdigest()
+        upload.refresh_from_db()
+        self.project.refresh_from_db()
+        self.assertEqual(upload.sha256, digest)
+        self.assertIsNotNone(upload.completed_at)
+        self.assertIn(digest[2:], self.project.project_file.name)
+        self.assertEqual(self.project.project_file.read(), self.data)
+        self.assertFalse(uploads.part_path(upload).exists())
+
+    def test_patch_while_another_holds_the_upload(self):
+        url = self.create()
+        ChunkedUpload.objects.update(locked_until=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(self.patch(url, 0, self.data[:10]).status_code, 423)
+
+        # the holder died: its lease runs out
+        ChunkedUpload.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.patch(url, 0, self.data[:10]).status_code, 204)
+        self.assertIsNone(ChunkedUpload.objects.get().locked_until)
+
+    def test_delete_discards_the_part_file(self):
+        url = self.create()
+        self.patch(url, 0, self.data[:10])
+        part = uploads.part_path(ChunkedUpload.objects.get())
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertFalse(part.exists())
+        self.assertFalse(ChunkedUpload.objects.exists())
+
+    def test_expiry_follows_last_activity(self):
+        self.create()
+        self.create()
+        old = timezone.now() - timedelta(hours=30)
+        ChunkedUpload.objects.update(created_at=old)
+        # started long ago but still receiving chunks: kept
+        active, idle = ChunkedUpload.objects.all()
+        ChunkedUpload.objects.filter(pk=idle.pk).update(updated_at=old)
+
+        # run by the ScheduledJob the migrations create
+        ScheduledJob.objects.exclude(task="expire_uploads").update(is_active=False)
+        ScheduledJob.objects.update(next_run_at=timezone.now())
+        self.assertEqual(jobs.enqueue_scheduled(), 1)
+        self.assertTrue(jobs.run_job(Job.objects.get(task="expire_uploads"), "test"))
+        self.assertEqual(list(ChunkedUpload.objects.values_list("pk", flat=True)), [active.pk])
+
+
+# -------------------------------------------------------------------
+# CONTENT-ADDRESSED MEDIA
+# -------------------------------------------------------------------
+class MediaStorageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        override = override_settings(MEDIA_ROOT=str(self.root))
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def project(self, name="p", upload=None):
+        project = Project.objects.create(
+            title=name, short_description="s", description="d", tech_stack="x", price="1.00", project_file=upload,
+        )
+        project.refresh_from_db()
+        return project
+
+    def legacy_file(self, name, data, age_minutes=120):
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        old = time.time() - age_minutes * 60
+        os.utime(path, (old, old))
+        return path
+
+    def files(self):
+        return sorted(str(p.relative_to(self.root)) for p in self.root.rglob("*") if p.is_file())
+
+    def reclaim(self, *args):
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("reclaim_media", *args, stdout=out)
+        return out.getvalue()
+
+    def test_duplicate_upload_reuses_the_hashed_name(self):
+        first = self.project("a", ContentFile(b"same bytes", name="Source.ZIP"))
+        second = self.project("b", ContentFile(b"same bytes", name="other.zip"))
+        digest = hashlib.sha256(b"same bytes").hexdigest()
+        self.assertEqual(first.project_file.name, f"projects/{digest[:2]}/{digest[2:]}.zip")
+        self.assertEqual(second.project_file.name, first.project_file.name)
+        self.assertEqual(self.files(), [first.project_file.name])
+
+        third = self.project("c", ContentFile(b"other bytes", name="Source.ZIP"))
+        self.assertNotEqual(third.project_file.name, first.project_file.name)
+        self.assertTrue(storage.is_hashed(third.project_file.name))
+
+    def test_hashed_media_is_served_immutable(self):
+        name = self.project(upload=ContentFile(b"x", name="a.txt")).project_file.name
+        response = self.client.get(settings.MEDIA_URL + name)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], storage.IMMUTABLE)
+
+    def test_legacy_files_are_rehashed(self):
+        self.legacy_file("projects/legacy.zip", b"legacy")
+        self.legacy_file("projects/copy of legacy.zip", b"legacy")
+        first, second = self.project("a"), self.project("b")
+        Project.objects.filter(pk=first.pk).update(project_file="projects/legacy.zip")
+        Project.objects.filter(pk=second.pk).update(project_file="projects/copy of legacy.zip")
+
+        self.assertIn("2 reference(s) to 2 file(s) would be rehashed", self.reclaim("--dry-run"))
+        self.assertEqual(len(self.files()), 2)
+
+        version = get_catalog_version()
+        out = self.reclaim()
+        self.assertIn("2 reference(s) to 2 file(s) were rehashed; 2 orphan(s)", out)
+        digest = hashlib.sha256(b"legacy").hexdigest()
+        hashed = f"projects/{digest[:2]}/{digest[2:]}.zip"
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.project_file.name, second.project_file.name), (hashed, hashed))
+        self.assertEqual(self.files(), [hashed])
+        self.assertEqual(first.project_file.read(), b"legacy")
+        self.assertGreater(get_catalog_version(), version)
+
+    def test_orphans_are_deleted_after_the_grace_period(self):
+        kept = self.project(upload=ContentFile(b"kept", name="kept.zip")).project_file.name
+        old = time.time() - 3 * 3600
+        os.utime(self.root / kept, (old, old))
+        self.legacy_file("projects/ab/orphan.zip", b"orphan")
+        self.legacy_file("thumbnails/recent.png", b"recent", age_minutes=5)
+
+        out = self.reclaim("--dry-run")
+        self.assertIn("orphan: projects/ab/orphan.zip", out)
+        self.assertEqual(len(self.files()), 3)
+
+        out = self.reclaim()
+        self.assertIn("1 orphan(s)", out)
+        # referenced files are never removed, unreferenced ones only once old
+        self.assertEqual(self.files(), sorted([kept, "thumbnails/recent.png"]))
+        self.assertFalse((self.root / "projects/ab").exists())
+
+        self.reclaim("--grace-minutes", "0")
+        self.assertEqual(self.files(), [kept])
+
+
+# -------------------------------------------------------------------
+# PROFILE WRITES / LOADING
+# -------------------------------------------------------------------
+def profile_writes(queries):
+    return [
+        q["sql"] for q in queries
+        if q["sql"].startswith(("INSERT", "UPDATE")) and '"store_profile"' in q["sql"]
+    ]
+
+
+class ProfileWriteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("student", "s@example.com", "pass12345")
+
+    def test_profile_created_once_with_user(self):
+        self.assertTrue(Profile.objects.filter(user=self.user).exists())
+
+    def test_login_does_not_write_profile(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                reverse("store:login"), {"username": "student", "password": "pass12345"}
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(profile_writes(ctx.captured_queries), [])
+
+    def test_user_save_does_not_write_profile(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(profile_writes(ctx.captured_queries), [])
+
+    def test_unchanged_profile_form_writes_nothing(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse("store:profile_edit"), {})
+        writes = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith(("INSERT", "UPDATE"))]
+        # only the session may be written
+        self.assertFalse([sql for sql in writes if "django_session" not in sql])
+
+    def test_changed_profile_form_updates_one_row(self):
+        before = Profile.objects.get(user=self.user).updated_at
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse("store:profile_edit"), {"college": "NIT"})
+        self.assertEqual(len(profile_writes(ctx.captured_queries)), 1)
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(profile.college, "NIT")
+        self.assertGreater(profile.updated_at, before)
+
+    def test_profile_joined_onto_request_user(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("store:profile_edit"))
+        profile_reads = [
+            q["sql"] for q in ctx.captured_queries
+            if q["sql"].startswith("SELECT") and 'FROM "store_profile"' in q["sql"]
+        ]
+        self.assertEqual(profile_reads, [])
+
+
+# -------------------------------------------------------------------
+# SINGLE-FLIGHT CACHE
+# -------------------------------------------------------------------
+class SingleFlightTests(TransactionTestCase):
+    THREADS = 8
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        Project.objects.create(
+            title="Herd",
+            short_description="short",
+            description="long",
+            tech_stack="Django",
+            price="10.00",
+        )
+
+    def run_concurrently(self, fn):
+        """Run fn in THREADS threads at once; returns (results, catalog queries)."""
+        barrier = threading.Barrier(self.THREADS)
+        lock = threading.Lock()
+        results, queries = [], []
+
+        def count(execute, sql, params, many, context):
+            if '"store_project"' in sql or '"store_blogpost"' in sql:
+                with lock:
+                    queries.append(sql)
+            return execute(sql, params, many, context)
+
+        def worker():
+            try:
+                # reads may be routed to a replica (DATABASE_REPLICA_URLS)
+                with ExitStack() as stack:
+                    for alias in connections:
+                        stack.enter_context(connections[alias].execute_wrapper(count))
+                    barrier.wait()
+                    result = fn()
+                with lock:
+                    results.append(result)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results, queries
+
+    def test_cold_home_is_computed_by_one_worker(self):
+        original = views.home_sections
+        calls = []
+
+        def slow_sections():
+            calls.append(1)
+            time.sleep(0.3)  # hold the lock while the other requests arrive
+            return original()
+
+        with mock.patch.object(views, "home_sections", slow_sections):
+            results, queries = self.run_concurrently(
+                lambda: Client().get(reverse("store:home")).status_code
+            )
+
+        self.assertEqual(results, [200] * self.THREADS)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(queries), 4)  # featured, latest, trending projects, latest posts
+
+    def test_stale_value_is_served_while_one_worker_refreshes(self):
+        singleflight.cached("test:stale", lambda: "old", version=1)
+        calls = []
+
+        def refresh():
+            calls.append(1)
+            time.sleep(0.3)
+            return list(Project.objects.values_list("title", flat=True))
+
+        results, queries = self.run_concurrently(
+            lambda: singleflight.cached("test:stale", refresh, version=2)
+        )
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(results.count("old"), self.THREADS - 1)
+        self.assertIn(["Herd"], results)
+        self.assertEqual(singleflight.cached("test:stale", refresh, version=2), ["Herd"])
+
+
+# -------------------------------------------------------------------
+# VIEW COUNTERS
+# -------------------------------------------------------------------
+@override_settings(VIEW_COUNT_FLUSH_SECONDS=0)
+class ViewCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        hits._pending.clear()  # views buffered by other tests' page loads
+        self.project = Project.objects.create(
+            title="Counted",
+            short_description="short",
+            description="long",
+            tech_stack="Django",
+            price="10.00",
+        )
+
+    def test_detail_views_are_counted_without_a_write_per_view(self):
+        url = reverse("store:project_detail", args=[self.project.slug])
+        with mock.patch.object(hits, "schedule_flush"):
+            with CaptureQueriesContext(connection) as ctx:
+                for _ in range(3):
+                    self.client.get(url)
+        self.assertFalse([q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")])
+
+        self.assertEqual(hits.flush(), 3)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.view_count, 3)
+        self.assertGreater(self.project.trending_score, 2.9)
+        # flushed counts leave the cache: a second flush adds nothing
+        self.assertEqual(hits.flush(), 0)
+
+    def test_admin_save_keeps_counters(self):
+        stale = Project.objects.get(pk=self.project.pk)
+        Project.objects.filter(pk=self.project.pk).update(view_count=7)
+        stale.title = "Renamed"
+        stale.save()
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.title, self.project.view_count), ("Renamed", 7))
+
+    def test_flush_revalidates_pages_ordered_by_views(self):
+        urls = [reverse("store:home"), reverse("store:project_list") + "?sort=popular"]
+        etags = {url: self.client.get(url)["ETag"] for url in urls}
+        newest = reverse("store:project_list")
+        newest_etag = self.client.get(newest)["ETag"]
+        version = get_catalog_version()
+
+        hits.push({(hits.KIND_PROJECT, self.project.pk): 5})
+        hits.flush()
+
+        for url in urls:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(response.status_code, 200, url)
+        self.assertEqual(response.context["projects"][0].view_count, 5)
+        # edits-only pages keep their 304s: the catalog version didn't move
+        self.assertEqual(get_catalog_version(), version)
+        self.assertEqual(self.client.get(newest, HTTP_IF_NONE_MATCH=newest_etag).status_code, 304)
+
+    def test_trending_score_decays(self):
+        Project.objects.filter(pk=self.project.pk).update(trending_score=8)
+        ViewCounterState.objects.create(
+            pk=ViewCounterState.SINGLETON_ID,
+            flushed_at=timezone.now() - timedelta(hours=2 * settings.TRENDING_HALF_LIFE_HOURS),
+        )
+        hits.flush()
+        self.project.refresh_from_db()
+        self.assertAlmostEqual(self.project.trending_score, 2, places=3)
+
+    def test_flushes_from_many_processes_decay_at_wall_clock_speed(self):
+        start = timezone.now()
+        half_life = timedelta(hours=settings.TRENDING_HALF_LIFE_HOURS)
+        Project.objects.filter(pk=self.project.pk).update(trending_score=8)
+        ViewCounterState.objects.create(pk=ViewCounterState.SINGLETON_ID, flushed_at=start)
+
+        # four workers with their own LocMemCache flush during one half-life
+        for i in range(1, 5):
+            cache.clear()
+            hits.push({(hits.KIND_PROJECT, self.project.pk): 1} if i == 4 else {})
+            with mock.patch.object(hits.timezone, "now", return_value=start + half_life * i / 4):
+                hits.flush()
+        self.project.refresh_from_db()
+        self.assertAlmostEqual(self.project.trending_score, 8 / 2 + 1, places=3)
+
+        # every process agrees on when the counts last changed
+        cache.clear()
+        self.assertEqual(hits.views_changed_at(), (start + half_life).timestamp())
+
+        # a flush that lost the race for the watermark does not decay again
+        stale = ViewCounterState.load()
+        ViewCounterState.objects.update(flushed_at=start + 2 * half_life)
+        with mock.patch.object(ViewCounterState, "load", return_value=stale):
+            self.assertEqual(hits._claim_interval(start + 2 * half_life), 0)
+
+
+# -------------------------------------------------------------------
+# SALES ROLLUPS
+# -------------------------------------------------------------------
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("buyer", password="pass12345")
+        self.web = Project.objects.create(
+            title="Web", short_description="s", description="d", tech_stack="Django", price="100.00",
+        )
+        self.ml = Project.objects.create(
+            title="ML", short_description="s", description="d", tech_stack="Python",
+            price="250.00", category="ml", level="advanced",
+        )
+
+    def rollup(self, category):
+        row = DailySales.objects.get(day=timezone.localdate(), category=category)
+        return row.orders, row.completed, row.cancelled, row.revenue
+
+    @mock.patch.object(analytics, "OVERLAP", timedelta(0))
+    def test_refresh_rolls_up_and_then_only_redoes_changed_days(self):
+        Order.objects.create(user=self.user, project=self.web, status="completed")
+        Order.objects.create(user=self.user, project=self.web, status="cancelled")
+        order = Order.objects.create(user=self.user, project=self.ml)
+        self.assertEqual(analytics.refresh(), 1)
+        self.assertEqual(self.rollup("web"), (2, 1, 1, 100))
+        self.assertEqual(self.rollup("ml"), (1, 0, 0, 0))
+
+        self.assertEqual(analytics.refresh(), 0)  # nothing changed since
+
+        order.status = "completed"
+        order.save()
+        self.assertEqual(analytics.refresh(), 1)
+        self.assertEqual(self.rollup("ml"), (1, 1, 0, 250))
+        self.assertEqual(self.rollup("web"), (2, 1, 1, 100))
+
+    def test_repricing_does_not_rewrite_revenue(self):
+        Order.objects.create(user=self.user, project=self.web, status="completed")
+        analytics.refresh()
+        self.web.price = "999.00"
+        self.web.save()
+        analytics.refresh(full=True)
+        self.assertEqual(self.rollup("web"), (1, 1, 0, 100))
+
+    def test_dashboard_reads_only_rollups(self):
+        Order.objects.create(user=self.user, project=self.web, status="completed")
+        analytics.refresh()
+        analytics.add_counts({self.web.pk: 4}, "views")
+        analytics.add_counts({self.web.pk: 2}, "cart_adds")
+        self.client.force_login(User.objects.create_superuser("admin", password="pass12345"))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("admin:store_dailysales_changelist"))
+        self.assertContains(response, "25.0%")  # 1 order / 4 views
+        self.assertContains(response, "50.0%")  # 1 order / 2 cart adds
+        self.assertFalse([q for q in ctx.captured_queries if '"store_order"' in q["sql"]])
+
+
+# -------------------------------------------------------------------
+# BUILT CSS
+# -------------------------------------------------------------------
+class BuildCssTests(SimpleTestCase):
+    def test_committed_stylesheet_is_up_to_date(self):
+        # fails when a template gains a class: run `manage.py build_css`
+        call_command("build_css", "--check", stdout=StringIO())
+
+    def test_variants_and_arbitrary_values(self):
+        stylesheet, _ = css.build([])
+        self.assertNotIn(".flex{", stylesheet)
+
+        _, screen, rule, _ = css.compile_candidate("md:hover:bg-[#0F172A]/40")
+        self.assertEqual(screen, "md")
+        self.assertEqual(
+            rule, r".md\:hover\:bg-\[\#0F172A\]\/40:hover{background-color:rgb(15 23 42 / 0.4)}"
+        )
+        _, _, rule, _ = css.compile_candidate("group-hover:translate-x-1")
+        self.assertTrue(rule.startswith(r".group:hover .group-hover\:translate-x-1{"))
+        self.assertIsNone(css.compile_candidate("prose"))
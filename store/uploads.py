@@ -0,0 +1,271 @@
+# store/uploads.py
+"""
+Resumable uploads of Project deliverables (the core of tus 1.0 plus its
+"creation" and "termination" extensions), used by the Project admin.
+
+    POST   /ops/uploads/          Upload-Length, Upload-Metadata: filename, project
+    HEAD   /ops/uploads/<id>/     -> Upload-Offset
+    PATCH  /ops/uploads/<id>/     Upload-Offset + a chunk of the file
+    DELETE /ops/uploads/<id>/
+
+Each PATCH is a short request, so a large ZIP no longer holds a worker
+for the whole transfer, and after a dropped connection the client asks
+for the offset and carries on from there.
+
+A PATCH takes a lease on the ChunkedUpload row (a conditional UPDATE of
+locked_until, as store/jobs.py claims jobs) so two requests never write
+the same part file, whichever process or machine they land on.
+
+Chunks are appended straight to a single part file in CHUNKED_UPLOAD_DIR
+and hashed as they arrive, so finishing an upload never re-reads or
+re-assembles it: the part file is renamed to its content-addressed name
+(store/storage.py) and Project.project_file is switched in one UPDATE.
+"""
+import base64
+import binascii
+import hashlib
+import os
+import posixpath
+import shutil
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import transaction
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+from django.views.decorators.http import require_http_methods
+
+from .models import ChunkedUpload, Project
+from .storage import hashed_name
+
+TUS_VERSION = "1.0.0"
+CHUNK_SIZE = 64 * 1024
+# an unfinished PATCH keeps the upload locked at most this long
+LOCK_TIMEOUT = timedelta(minutes=10)
+
+# upload id -> (offset, sha256 of the first `offset` bytes). A worker
+# that didn't see the earlier chunks rebuilds it from the part file.
+_hashers = {}
+
+
+def part_path(upload):
+    return Path(settings.CHUNKED_UPLOAD_DIR) / f"{upload.pk}.part"
+
+
+def _hasher(upload):
+    state = _hashers.get(upload.pk)
+    if state is not None and state[0] == upload.offset:
+        return state[1]
+    hasher = hashlib.sha256()
+    remaining = upload.offset
+    if remaining:
+        with open(part_path(upload), "rb") as f:
+            while remaining:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                remaining -= len(chunk)
+    return hasher
+
+
+def append(upload, stream):
+    """Append the request body to the part file; returns the new offset."""
+    hasher = _hasher(upload)
+    offset = upload.offset
+    remaining = upload.length - offset
+    fd = os.open(part_path(upload), os.O_WRONLY | os.O_CREAT, 0o600)
+    try:
+        # drop bytes a previous, interrupted PATCH wrote but never recorded
+        os.ftruncate(fd, offset)
+        os.lseek(fd, offset, os.SEEK_SET)
+        while remaining:
+            chunk = stream.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            view = memoryview(chunk)
+            while view:
+                view = view[os.write(fd, view):]
+            hasher.update(chunk)
+            offset += len(chunk)
+            remaining -= len(chunk)
+    finally:
+        # whatever arrived before a disconnect counts
+        os.close(fd)
+        ChunkedUpload.objects.filter(pk=upload.pk, offset=upload.offset).update(
+            offset=offset, updated_at=timezone.now()
+        )
+        _hashers[upload.pk] = (offset, hasher)
+        upload.offset = offset
+    return offset
+
+
+def finish(upload):
+    """Move the complete file into media storage and attach it to the project."""
+    digest = _hasher(upload).hexdigest()
+    _hashers.pop(upload.pk, None)
+    field = Project._meta.get_field("project_file")
+    storage = field.storage
+    name = hashed_name(posixpath.join(field.upload_to, upload.filename), digest)
+
+    source = part_path(upload)
+    if storage.exists(name):
+        source.unlink()  # same bytes already stored
+    else:
+        target = storage.path(name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # a rename when CHUNKED_UPLOAD_DIR is on the same filesystem
+        shutil.move(source, target)
+
+    with transaction.atomic():
+        project = Project.objects.select_for_update().get(pk=upload.project_id)
+        project.project_file.name = name
+        project.save(update_fields=["project_file", "updated_at"])
+        upload.sha256 = digest
+        upload.completed_at = timezone.now()
+        upload.save(update_fields=["sha256", "completed_at"])
+    return name
+
+
+def lock(upload, offset):
+    """
+    Take the PATCH lease if the upload is at `offset` and nobody holds it;
+    returns the lease expiry, or None.
+    """
+    now = timezone.now()
+    until = now + LOCK_TIMEOUT
+    taken = ChunkedUpload.objects.filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+        pk=upload.pk,
+        offset=offset,
+        completed_at__isnull=True,
+    ).update(locked_until=until, updated_at=now)
+    return until if taken else None
+
+
+def unlock(upload, until):
+    # only our own lease: it may have expired and been taken by now
+    ChunkedUpload.objects.filter(pk=upload.pk, locked_until=until).update(locked_until=None)
+
+
+def discard(upload):
+    _hashers.pop(upload.pk, None)
+    part_path(upload).unlink(missing_ok=True)
+    upload.delete()
+
+
+# ---- VIEWS ----
+
+
+def _tus(response, upload=None):
+    response["Tus-Resumable"] = TUS_VERSION
+    response["Cache-Control"] = "no-store"
+    if upload is not None:
+        response["Upload-Offset"] = str(upload.offset)
+        response["Upload-Length"] = str(upload.length)
+    return response
+
+
+def _error(message, status):
+    return _tus(JsonResponse({"error": message}, status=status))
+
+
+def _metadata(header):
+    """'filename d29ybGQ=,project MQ==' -> {'filename': 'world', 'project': '1'}"""
+    values = {}
+    for pair in filter(None, (p.strip() for p in header.split(","))):
+        key, _, value = pair.partition(" ")
+        try:
+            values[key] = base64.b64decode(value).decode() if value else ""
+        except (binascii.Error, UnicodeDecodeError):
+            return None
+    return values
+
+
+@staff_member_required
+@require_http_methods(["OPTIONS", "POST"])
+def upload_create(request):
+    if request.method == "OPTIONS":
+        response = HttpResponse(status=204)
+        response["Tus-Version"] = TUS_VERSION
+        response["Tus-Extension"] = "creation,termination"
+        response["Tus-Max-Size"] = str(settings.CHUNKED_UPLOAD_MAX_SIZE)
+        return _tus(response)
+
+    try:
+        length = int(request.headers.get("Upload-Length", ""))
+    except ValueError:
+        return _error("Upload-Length is required", 400)
+    if length <= 0:
+        return _error("Upload-Length must be positive", 400)
+    if length > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        return _error("file too large", 413)
+
+    metadata = _metadata(request.headers.get("Upload-Metadata", ""))
+    if not metadata or not metadata.get("filename") or not metadata.get("project", "").isdigit():
+        return _error("Upload-Metadata needs filename and project", 400)
+    project = get_object_or_404(Project, pk=metadata["project"])
+
+    try:
+        filename = get_valid_filename(os.path.basename(metadata["filename"]))[:255]
+    except SuspiciousFileOperation:
+        return _error("invalid filename", 400)
+
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    upload = ChunkedUpload.objects.create(
+        project=project,
+        created_by=request.user,
+        filename=filename,
+        length=length,
+    )
+    part_path(upload).touch()
+    response = _tus(HttpResponse(status=201), upload)
+    response["Location"] = reverse("store:upload_detail", args=[upload.pk])
+    return response
+
+
+@staff_member_required
+@require_http_methods(["HEAD", "PATCH", "DELETE"])
+def upload_detail(request, upload_id):
+    upload = get_object_or_404(ChunkedUpload, pk=upload_id)
+
+    if request.method == "HEAD":
+        return _tus(HttpResponse(status=200), upload)
+
+    if request.method == "DELETE":
+        if upload.completed_at is None:
+            discard(upload)
+        return _tus(HttpResponse(status=204))
+
+    if request.content_type != "application/offset+octet-stream":
+        return _error("Content-Type must be application/offset+octet-stream", 415)
+    if upload.completed_at is not None:
+        return _tus(HttpResponse(status=204), upload)
+    if request.headers.get("Upload-Offset") != str(upload.offset):
+        # the client is out of sync: it should HEAD and resume from there
+        return _tus(HttpResponse(status=409), upload)
+
+    until = lock(upload, upload.offset)
+    if until is None:
+        upload.refresh_from_db(fields=["offset", "completed_at"])
+        if request.headers.get("Upload-Offset") != str(upload.offset):
+            return _tus(HttpResponse(status=409), upload)
+        return _error("another request is writing this upload", 423)
+    try:
+        try:
+            append(upload, request)
+        except OSError:
+            # client went away mid-chunk; it will HEAD for the new offset
+            return _tus(HttpResponse(status=400), upload)
+        if upload.offset == upload.length:
+            finish(upload)
+    finally:
+        unlock(upload, until)
+    return _tus(HttpResponse(status=204), upload)
@@ -1,11 +1,20 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views
+from django.contrib.sitemaps import views as sitemap_views
 from django.urls import reverse_lazy
-from . import views
+from . import api, events, feeds, uploads, views
+from .http_cache import cache_per_catalog_version, catalog_cache
+from .sitemaps import sitemaps
 from store.views import test_email
 
 app_name = 'store'
 
+
+def crawler_view(view, max_age):
+    """Rendered once per catalog version, then served from cache (+ 304s)."""
+    return catalog_cache(max_age=max_age)(cache_per_catalog_version()(view))
+
+
 urlpatterns = [
     # Home
     path('', views.home, name='home'),
@@ -13,6 +22,7 @@ urlpatterns = [
     path("test-email/", test_email, name="test-email"),
     # Projects
     path('projects/', views.project_list, name='project_list'),
+    path('projects/autocomplete/', views.project_autocomplete, name='project_autocomplete'),
     path('projects/<slug:slug>/', views.project_detail, name='project_detail'),
     path('projects/<slug:slug>/buy/', views.buy_project, name='buy_project'),
 
@@ -34,6 +44,7 @@ urlpatterns = [
     # Orders
     path('my-orders/', views.my_orders, name='my_orders'),
     path('orders/<int:order_id>/', views.order_detail, name='order_detail'),
+    path('orders/events/', events.order_events, name='order_events'),
 
     # Cart
     path('cart/', views.view_cart, name='view_cart'),
@@ -45,6 +56,28 @@ urlpatterns = [
     path('account/profile/edit/', views.profile_edit, name='profile_edit'),
     path('account/change-password/', views.account_change_password, name='account_change_password'),
 
+    # Sitemaps & feeds (cached per catalog version)
+    path('sitemap.xml', crawler_view(sitemap_views.index, 3600),
+         {'sitemaps': sitemaps, 'sitemap_url_name': 'store:sitemap_section'}, name='sitemap'),
+    path('sitemap-<section>.xml', crawler_view(sitemap_views.sitemap, 3600),
+         {'sitemaps': sitemaps}, name='sitemap_section'),
+    path('feeds/blog/rss/', crawler_view(feeds.LatestPostsFeed(), 900), name='feed_blog_rss'),
+    path('feeds/blog/atom/', crawler_view(feeds.LatestPostsAtomFeed(), 900), name='feed_blog_atom'),
+    path('feeds/projects/rss/', crawler_view(feeds.LatestProjectsFeed(), 900), name='feed_projects_rss'),
+    path('feeds/projects/atom/', crawler_view(feeds.LatestProjectsAtomFeed(), 900), name='feed_projects_atom'),
+
+    # JSON API (read-only, v1)
+    path('api/v1/projects/', api.project_list, name='api_project_list'),
+    path('api/v1/projects/<slug:slug>/', api.project_detail, name='api_project_detail'),
+    path('api/v1/posts/', api.post_list, name='api_post_list'),
+    path('api/v1/posts/<int:pk>/', api.post_detail, name='api_post_detail'),
+    path('api/v1/orders/', api.order_list, name='api_order_list'),
+
+    # Ops (staff only)
+    path('ops/ratelimit/', views.ratelimit_stats, name='ratelimit_stats'),
+    path('ops/uploads/', uploads.upload_create, name='upload_create'),
+    path('ops/uploads/<uuid:upload_id>/', uploads.upload_detail, name='upload_detail'),
+
     # Password Reset
     path(
         "password-reset/",
@@ -2,8 +2,8 @@
 
 from decimal import Decimal
 import random
+import uuid
 
-from .email_utils import send_brevo_email
 
 from django.conf import settings
 from django.contrib import messages
@@ -13,13 +13,16 @@ from django.contrib.auth import (
     logout,
     update_session_auth_hash,
 )
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib.auth.models import User
 from django.contrib.auth.tokens import default_token_generator
 from django.core.cache import cache
 from django.core.mail import EmailMessage
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast, NullIf
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
@@ -39,7 +42,13 @@ from .models import (
     OrderReview,
     Profile,
     Project,
+    RelatedItem,
 )
+from . import events, hits, recommend, search_index, singleflight
+from .catalog import get_catalog_version
+from .http_cache import catalog_cache
+from .jobs import enqueue
+from .ratelimit import ratelimit, ratelimit_stats as get_ratelimit_stats
 
 from django.http import HttpResponse
 from django.core.mail import send_mail
@@ -84,7 +93,7 @@ def verify_email(request, uidb64, token):
 
     if user and default_token_generator.check_token(user, token):
         user.is_active = True
-        user.save()
+        user.save(update_fields=["is_active"])
         messages.success(request, "Your email has been verified! Please login.")
         return redirect("store:login")
     else:
@@ -95,6 +104,8 @@ def verify_email(request, uidb64, token):
 # -------------------------------------------------------------------
 # OTP-BASED PASSWORD RESET (SKELETON)
 # -------------------------------------------------------------------
+@ratelimit("send_otp", key="ip", as_json=True)
+@ratelimit("send_otp", key="phone", as_json=True)
 def send_otp(request):
     """
     POST: phone -> send OTP via SMS and cache it.
@@ -112,6 +123,8 @@ def send_otp(request):
     return JsonResponse({"status": "sent"})
 
 
+@ratelimit("verify_otp", key="ip", as_json=True)
+@ratelimit("verify_otp", key="phone", as_json=True)
 def verify_otp(request):
     """
     POST: phone + otp -> verifies OTP.
@@ -172,41 +185,95 @@ def reset_password(request):
 # -------------------------------------------------------------------
 # PUBLIC PAGES
 # -------------------------------------------------------------------
-def home(request):
+def home_sections():
     # featured project
     featured_project = (
         Project.objects.filter(is_active=True, is_featured=True)
+        .defer("description", "description_html")
         .order_by("-created_at")
         .first()
     )
 
     # latest active projects
-    latest_projects = (
+    latest_projects = list(
         Project.objects.filter(is_active=True)
+        .defer("description", "description_html")
         .order_by("-created_at")[:6]
     )
 
     # latest published blog posts
-    latest_posts = (
+    latest_posts = list(
         BlogPost.objects.filter(is_published=True)
+        .defer("content", "content_html")
         .order_by("-created_at")[:3]
     )
 
-    context = {
+    # most viewed recently (decayed view counts, see store/hits.py)
+    trending_projects = list(
+        Project.objects.filter(is_active=True, trending_score__gt=0)
+        .defer("description", "description_html")
+        .order_by("-trending_score")[:3]
+    )
+
+    return {
         "featured_project": featured_project,
         "latest_projects": latest_projects,
         "latest_posts": latest_posts,
+        "trending_projects": trending_projects,
     }
+
+
+def view_counts_state(request=None):
+    """catalog_cache extra_state of pages ordered by view counts (store/hits.py)."""
+    changed_at = hits.views_changed_at()
+    return changed_at, changed_at
+
+
+@catalog_cache(extra_state=view_counts_state)
+def home(request):
+    # one worker rebuilds after a catalog change, the rest serve the old copy;
+    # the Trending section also follows the view-count flushes
+    context = singleflight.cached(
+        "home:sections", home_sections, version=(get_catalog_version(), hits.views_changed_at())
+    )
     return render(request, "store/home.html", context)
 
 
-def project_list(request):
-    q = request.GET.get("q", "").strip()
-    tech = request.GET.get("tech", "").strip()
-    category = request.GET.get("category", "").strip()
-    level = request.GET.get("level", "").strip()
+# ?sort= values besides the default (newest first)
+SORTS = ("", "rating", "popular", "trending")
+# orders that change with every view-count flush, not only with edits
+VIEW_SORTS = ("popular", "trending")
+
+
+def sorted_by_views(request):
+    if request.GET.get("sort", "").strip() in VIEW_SORTS:
+        return view_counts_state(request)
+    return None
+
 
-    projects = Project.objects.filter(is_active=True).order_by("-created_at")
+def is_popular_filter(category, level, sort):
+    return (
+        category in ("", *dict(Project.CATEGORY_CHOICES))
+        and level in ("", *dict(Project.LEVEL_CHOICES))
+        and sort in SORTS
+    )
+
+
+def filter_projects(q="", tech="", category="", level="", sort=""):
+    # cards show the stored excerpt, not the full description
+    projects = Project.objects.filter(is_active=True).defer("description", "description_html")
+
+    if sort == "rating":
+        # average from the denormalized counters: no join on orders/reviews
+        projects = projects.annotate(
+            rating_avg=Cast("rating_sum", FloatField()) / NullIf("rating_count", 0)
+        ).order_by(F("rating_avg").desc(nulls_last=True), "-rating_count", "-created_at")
+    elif sort == "popular":
+        projects = projects.order_by("-view_count", "-created_at")
+    elif sort == "trending":
+        projects = projects.order_by("-trending_score", "-created_at")
+    else:
+        projects = projects.order_by("-created_at")
 
     if q:
         projects = projects.filter(
@@ -224,6 +291,30 @@ def project_list(request):
     if level:
         projects = projects.filter(level=level)
 
+    return projects
+
+
+@catalog_cache(extra_state=sorted_by_views)
+def project_list(request):
+    q = request.GET.get("q", "").strip()
+    tech = request.GET.get("tech", "").strip()
+    category = request.GET.get("category", "").strip()
+    level = request.GET.get("level", "").strip()
+    sort = request.GET.get("sort", "").strip()
+
+    if not q and not tech and is_popular_filter(category, level, sort):
+        # a handful of combinations: cache them, one rebuild per catalog change
+        version = get_catalog_version()
+        if sort in VIEW_SORTS:
+            version = (version, hits.views_changed_at())
+        projects = singleflight.cached(
+            f"project_list:{category}:{level}:{sort}",
+            lambda: list(filter_projects(category=category, level=level, sort=sort)),
+            version=version,
+        )
+    else:
+        projects = filter_projects(q, tech, category, level, sort)
+
     tech_list = (
         Project.objects.filter(is_active=True)
         .values_list("tech_stack", flat=True)
@@ -237,31 +328,75 @@ def project_list(request):
         "tech_list": tech_list,
         "category": category,
         "level": level,
+        "sort": sort,
     }
     return render(request, "store/project_list.html", context)
 
 
+def project_autocomplete(request):
+    """
+    GET ?q=<prefix> -> matching projects and technologies as JSON.
+    Served from the in-memory prefix index, never from the database.
+    """
+    q = request.GET.get("q", "").strip()[:100]
+    projects, technologies = search_index.get_index().search(q)
+    response = JsonResponse({
+        "q": q,
+        "projects": projects,
+        "technologies": technologies,
+    })
+    response["Cache-Control"] = "public, max-age=30"
+    return response
+
+
+@catalog_cache()
 def project_detail(request, slug):
-    project = get_object_or_404(Project, slug=slug, is_active=True)
+    # the page shows the pre-rendered description_html, not the source
+    project = get_object_or_404(Project.objects.defer("description"), slug=slug, is_active=True)
     extra_images = project.images.all()  # FK with related_name='images'
+    related_projects = recommend.related_objects(
+        Project.objects.filter(is_active=True).defer("description", "description_html"),
+        RelatedItem.KIND_PROJECT,
+        project.id,
+    )
+    hits.record(hits.KIND_PROJECT, project.pk)
     return render(
         request,
         "store/project_detail.html",
-        {"project": project, "extra_images": extra_images},
+        {
+            "project": project,
+            "extra_images": extra_images,
+            "related_projects": related_projects,
+            # one per rendered buy form: resubmitting it can't order twice
+            "buy_key": uuid.uuid4().hex if request.user.is_authenticated else "",
+        },
     )
 
 
+@catalog_cache()
 def blog_list(request):
-    posts = BlogPost.objects.filter(is_published=True).order_by("-created_at")
+    posts = BlogPost.objects.filter(is_published=True).defer("content", "content_html").order_by("-created_at")
     return render(request, "store/blog_list.html", {"posts": posts})
 
 
+@catalog_cache()
 def blog_detail(request, pk):
-    post = get_object_or_404(BlogPost, pk=pk, is_published=True)
-    related_posts = (
-        BlogPost.objects.filter(is_published=True)
-        .exclude(pk=pk)[:3]
+    # the page shows the pre-rendered content_html, not the source
+    post = get_object_or_404(BlogPost.objects.defer("content"), pk=pk, is_published=True)
+    related_posts = recommend.related_objects(
+        BlogPost.objects.filter(is_published=True).defer("content", "content_html"),
+        RelatedItem.KIND_POST,
+        post.pk,
     )
+    if not related_posts:
+        # table not built yet: fall back to the latest posts
+        related_posts = (
+            BlogPost.objects.filter(is_published=True)
+            .defer("content", "content_html")
+            .exclude(pk=pk)
+            .order_by("-created_at")[:3]
+        )
+    hits.record(hits.KIND_POST, post.pk)
     return render(
         request,
         "store/blog_detail.html",
@@ -269,6 +404,7 @@ def blog_detail(request, pk):
     )
 
 
+@ratelimit("contact", key="ip")
 def contact(request):
     if request.method == "POST":
         form = ContactForm(request.POST)
@@ -293,6 +429,7 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+@ratelimit("signup", key="ip")
 def user_signup(request):
     if request.method == "POST":
         form = UserRegistrationForm(request.POST)
@@ -320,18 +457,12 @@ def user_signup(request):
                 f"If you did not create this account, you can ignore this email."
             )
 
-            if settings.DEBUG:
-                # Local: just print to console
-                from django.core.mail import send_mail
-                send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [user.email])
-            else:
-                sent = send_brevo_email(user.email, subject, message)
-                if not sent:
-                    messages.error(
-                        request,
-                        "We couldn't send the verification email right now. "
-                        "Please try again later."
-                    )
+            # sent by the job worker (retried if Brevo is down)
+            enqueue(
+                "send_email",
+                {"to": user.email, "subject": subject, "body": message},
+                idempotency_key=f"verify-email:{user.pk}",
+            )
 
             messages.success(
                 request,
@@ -345,9 +476,8 @@ def user_signup(request):
     return render(request, "store/signup.html", {"form": form})
 
 
-from django.contrib.auth import get_user_model
-UserModel = get_user_model()
-
+@ratelimit("login", key="ip")
+@ratelimit("login", key="username")
 def user_login(request):
     error = ""
     if request.method == "POST":
@@ -361,14 +491,10 @@ def user_login(request):
             login(request, user)
             return redirect("store:home")
 
-        # If auth failed, check if user exists but is inactive (email not verified)
-        try:
-            existing_user = UserModel.objects.get(username=username)
-            if not existing_user.is_active:
-                error = "Your email is not verified yet. Please check your inbox for the verification link."
-            else:
-                error = "Invalid username or password."
-        except UserModel.DoesNotExist:
+        # LoginBackend flags a right password on a not-yet-verified account
+        if getattr(request, "login_inactive_user", False):
+            error = "Your email is not verified yet. Please check your inbox for the verification link."
+        else:
             error = "Invalid username or password."
 
     return render(request, "store/login.html", {"error": error})
@@ -385,38 +511,69 @@ def user_logout(request):
 # -------------------------------------------------------------------
 @login_required
 def buy_project(request, slug):
-    project = get_object_or_404(Project, slug=slug, is_active=True)
-
-    order = Order.objects.create(
-        user=request.user,
-        project=project,
-        status="pending",
-    )
+    if request.method != "POST":
+        # prefetchers, link previews and refreshes never create orders;
+        # (a login redirect lands here too) -> back to the buy button
+        return redirect("store:project_detail", slug=slug)
+
+    project = get_object_or_404(Project.objects.only("id", "slug", "title", "price"), slug=slug, is_active=True)
+    key = request.POST.get("idempotency_key", "").strip()[:64] or None
+
+    with transaction.atomic():
+        # one buy at a time per user: a double submit waits here, then
+        # finds the order the first one created
+        User.objects.select_for_update().only("id").get(pk=request.user.pk)
+        order = None
+        if key:
+            order = Order.objects.filter(user=request.user, idempotency_key=key).first()
+        created = False
+        if order is None:
+            # at most one pending order per project (one_pending_order_per_project)
+            order, created = Order.objects.get_or_create(
+                user=request.user,
+                project=project,
+                status="pending",
+                defaults={"idempotency_key": key, "price": project.price},
+            )
 
-    messages.success(
-        request,
-        f"Order placed for '{project.title}'. We will contact you soon.",
-    )
+    if created:
+        messages.success(
+            request,
+            f"Order placed for '{project.title}'. We will contact you soon.",
+        )
+    else:
+        messages.info(request, f"You already have an order for '{project.title}'.")
     return redirect("store:order_detail", order_id=order.id)
 
 
 @login_required
 def order_detail(request, order_id):
-    order = get_object_or_404(Order, id=order_id, user=request.user)
+    order = get_object_or_404(
+        Order.objects.select_related("project").defer("project__description", "project__description_html"),
+        id=order_id,
+        user=request.user,
+    )
     review = getattr(order, "review", None)
 
     if request.method == "POST":
         # Cancel order
         if "cancel_order" in request.POST and order.status == "pending":
             order.status = "cancelled"
+            order._status_actor = request.user
             order.save()
             messages.success(request, "Your order has been cancelled.")
             return redirect("store:order_detail", order_id=order.id)
 
         # Submit / update review (only when completed)
         if "submit_review" in request.POST and order.status == "completed":
-            rating = int(request.POST.get("rating", 5))
+            try:
+                rating = int(request.POST.get("rating", 5))
+            except ValueError:
+                rating = 5
+            rating = max(1, min(5, rating))
             comment = request.POST.get("comment", "").strip()
+            # Project rating counters are bumped with F() by the OrderReview
+            # post_save signal, inside update_or_create's transaction
             OrderReview.objects.update_or_create(
                 order=order,
                 defaults={"rating": rating, "comment": comment},
@@ -427,19 +584,48 @@ def order_detail(request, order_id):
     context = {
         "order": order,
         "review": review,
+        # the live status stream starts after this event
+        "last_event_id": events.last_event_id(request.user.pk),
     }
     return render(request, "store/order_detail.html", context)
 
 
 @login_required
 def my_orders(request):
-    orders = Order.objects.filter(user=request.user).order_by("-created_at")
-    return render(request, "store/my_orders.html", {"orders": orders})
+    orders = (
+        Order.objects.filter(user=request.user)
+        .select_related("project")
+        .defer("project__description", "project__description_html")
+        .order_by("-created_at")
+    )
+    return render(
+        request,
+        "store/my_orders.html",
+        {"orders": orders, "last_event_id": events.last_event_id(request.user.pk)},
+    )
 
 
 # -------------------------------------------------------------------
 # ACCOUNT / PROFILE VIEWS
 # -------------------------------------------------------------------
+def get_profile(user):
+    """The profile joined onto request.user by LoginBackend.get_user."""
+    try:
+        return user.profile
+    except Profile.DoesNotExist:
+        # accounts created before profiles existed
+        return Profile.objects.create(user=user)
+
+
+def save_changed(form):
+    """Save a ModelForm only if it changed, and only the changed columns."""
+    # disabled fields (username / email) never show up in changed_data
+    if form.changed_data:
+        # update_fields leaves auto_now columns (Profile.updated_at) out unless named
+        auto_now = [f.name for f in form.instance._meta.concrete_fields if getattr(f, "auto_now", False)]
+        form.instance.save(update_fields=form.changed_data + auto_now)
+
+
 @login_required
 def account_dashboard(request):
     return render(request, "store/account_dashboard.html")
@@ -447,15 +633,15 @@ def account_dashboard(request):
 
 @login_required
 def account_settings(request):
-    profile, _ = Profile.objects.get_or_create(user=request.user)
+    profile = get_profile(request.user)
 
     if request.method == "POST":
         u_form = UserUpdateForm(request.POST, instance=request.user)
         p_form = ProfileForm(request.POST, instance=profile)
 
         if u_form.is_valid() and p_form.is_valid():
-            u_form.save()
-            p_form.save()
+            save_changed(u_form)
+            save_changed(p_form)
             messages.success(request, "Your profile has been updated.")
             return redirect("store:account_settings")
     else:
@@ -486,15 +672,15 @@ def account_change_password(request):
 
 @login_required
 def profile_edit(request):
-    profile, _ = Profile.objects.get_or_create(user=request.user)
+    profile = get_profile(request.user)
 
     if request.method == "POST":
         u_form = UserUpdateForm(request.POST, instance=request.user)
         p_form = ProfileForm(request.POST, request.FILES, instance=profile)
 
         if u_form.is_valid() and p_form.is_valid():
-            u_form.save()
-            p_form.save()
+            save_changed(u_form)
+            save_changed(p_form)
             messages.success(request, "Your profile has been updated ✅")
             return redirect("store:account_dashboard")
     else:
@@ -522,6 +708,7 @@ def add_to_cart(request, slug):
         cart[project_id] += 1
     else:
         cart[project_id] = 1
+        hits.record(hits.KIND_CART, project.pk)
 
     request.session["cart"] = cart
     messages.success(request, f"'{project.title}' added to your cart.")
@@ -573,3 +760,11 @@ def remove_from_cart(request, project_id):
         request.session["cart"] = cart
         messages.success(request, "Item removed from cart.")
     return redirect("store:view_cart")
+
+
+# -------------------------------------------------------------------
+# OPS: RATE LIMIT COUNTERS (staff only)
+# -------------------------------------------------------------------
+@staff_member_required
+def ratelimit_stats(request):
+    return JsonResponse({"ratelimit": get_ratelimit_stats()})
@@ -14,3 +14,13 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'techsense.settings')
 
 application = get_asgi_application()
+
+# stop order event streams (store/events.py) when the browser goes away
+from store.events import cancel_on_disconnect  # noqa: E402
+
+application = cancel_on_disconnect(application)
+
+# build the per-process autocomplete index before the first request
+from store.search_index import warm_index  # noqa: E402
+
+warm_index()
@@ -4,6 +4,7 @@ Local development version (no deployment extras).
 """
 
 from pathlib import Path
+import importlib.util
 import os
 import dj_database_url
 #from django.conf import settings  # already imported at top? then skip this
@@ -56,6 +57,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.sitemaps',
 
     'store',
     # if you later install django-widget-tweaks, you can add:
@@ -68,14 +70,21 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    'store.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'store.routers.PrimaryPinningMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'store.http_cache.ConditionalCatalogMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Dynamic HTML/JSON compression (store/compression.py)
+COMPRESSION_MIN_SIZE = 1024          # bytes; smaller bodies are sent as-is
+COMPRESSION_BROTLI_QUALITY = 5       # 0-11; 4-6 is the sweet spot for dynamic pages
+
 ROOT_URLCONF = 'techsense.urls'
 
 # ----------------------------------------------------
@@ -93,6 +102,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'store.context_processors.catalog',
             ],
         },
     },
@@ -119,6 +129,130 @@ if DATABASE_URL:
         ssl_require=True,
     )
 
+# Read replicas for catalog/blog reads (store/routers.py).
+# DATABASE_REPLICA_URLS is a comma-separated list of database URLs.
+DATABASE_REPLICAS = []
+for i, replica_url in enumerate(
+    u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()
+):
+    alias = f"replica_{i}"
+    DATABASES[alias] = dj_database_url.parse(
+        replica_url,
+        conn_max_age=600,
+        ssl_require=not replica_url.startswith("sqlite"),
+    )
+    # tests run against the primary's test database
+    DATABASES[alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["store.routers.ReplicaRouter"]
+
+# after a write, keep that browser on the primary for this many seconds
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "5"))
+
+# SQLite tuning: applied on every new connection by store/db.py.
+# WAL lets readers keep going while a contact form / order insert commits.
+SQLITE_TUNING = os.getenv("SQLITE_TUNING", "True") == "True"
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",        # safe with WAL, fsync only at checkpoints
+    "mmap_size": 134217728,         # 128 MB memory-mapped reads
+    "cache_size": -20000,           # ~20 MB page cache (negative = KiB)
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,           # wait up to 5s instead of "database is locked"
+}
+
+
+# ----------------------------------------------------
+# Cache – shared Redis in production, per-process memory locally
+# ----------------------------------------------------
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
+# ----------------------------------------------------
+# Rate limiting (store/ratelimit.py) – "<scope>:<key>": "<n>/<period>"
+# ----------------------------------------------------
+RATELIMIT_ENABLED = os.getenv("RATELIMIT_ENABLED", "True") == "True"
+# Number of proxies in front of the app that append to X-Forwarded-For
+# (1 on Railway). The client address is taken that many entries from the
+# right; anything further left was sent by the client and can be forged.
+# 0 = use REMOTE_ADDR (behind a proxy every visitor would share its bucket).
+# Without an X-Forwarded-For header, e.g. runserver, REMOTE_ADDR is used.
+RATELIMIT_TRUSTED_PROXIES = int(os.getenv("RATELIMIT_TRUSTED_PROXIES", "1"))
+RATELIMIT_RATES = {
+    "send_otp:ip": "10/h",
+    "send_otp:phone": "3/10m",
+    "verify_otp:ip": "20/h",
+    "verify_otp:phone": "5/10m",
+    "login:ip": "30/10m",
+    "login:username": "10/10m",
+    "signup:ip": "5/h",
+    "contact:ip": "5/h",
+}
+
+
+# ----------------------------------------------------
+# Background jobs (store/jobs.py) – run `python manage.py run_worker`.
+# With JOBS_EAGER, jobs run in the web process right after commit instead.
+# ----------------------------------------------------
+JOBS_EAGER = os.getenv("JOBS_EAGER", str(DEBUG)) == "True"
+# finished jobs are deleted by the workers after this many days
+JOBS_KEEP_DONE_DAYS = int(os.getenv("JOBS_KEEP_DONE_DAYS", "7"))
+
+
+# Live order updates (store/events.py): how often an open stream checks
+# for changes made by other processes
+ORDER_EVENTS_POLL_SECONDS = int(os.getenv("ORDER_EVENTS_POLL_SECONDS", "15"))
+
+
+# ----------------------------------------------------
+# Password hashing – "argon2" (needs argon2-cffi) or Django's "pbkdf2".
+# Old hashes keep verifying and are upgraded on the user's next login.
+# ----------------------------------------------------
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "19456"))  # KiB (OWASP minimum)
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+
+PASSWORD_HASHER_PROFILES = {
+    "argon2": [
+        "store.hashers.TunedArgon2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+        "django.contrib.auth.hashers.ScryptPasswordHasher",
+    ],
+    "pbkdf2": [
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+        "django.contrib.auth.hashers.Argon2PasswordHasher",
+        "django.contrib.auth.hashers.ScryptPasswordHasher",
+    ],
+}
+PASSWORD_HASHER_PROFILE = os.getenv(
+    "PASSWORD_HASHER_PROFILE",
+    "argon2" if importlib.util.find_spec("argon2") else "pbkdf2",
+)
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]
+
+# ModelBackend keeps sessions logged in before LoginBackend valid (see store/backends.py)
+AUTHENTICATION_BACKENDS = [
+    "store.backends.LoginBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
 
 # ----------------------------------------------------
 # Password validation
@@ -165,6 +299,16 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Resumable deliverable uploads (store/uploads.py). Keep the directory on
+# the same filesystem as MEDIA_ROOT so finished files are renamed, not copied.
+CHUNKED_UPLOAD_DIR = Path(os.getenv("CHUNKED_UPLOAD_DIR", BASE_DIR / "upload_parts"))
+CHUNKED_UPLOAD_MAX_SIZE = int(os.getenv("CHUNKED_UPLOAD_MAX_SIZE", str(2 * 1024 ** 3)))
+
+# Page views (store/hits.py) are buffered and written in one batch this often.
+VIEW_COUNT_FLUSH_SECONDS = int(os.getenv("VIEW_COUNT_FLUSH_SECONDS", "30"))
+# "Trending" = views with exponential decay; a view counts half after this long.
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "24"))
+
 # ----------------------------------------------------
 # Default primary key field type
 # ----------------------------------------------------
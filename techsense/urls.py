@@ -2,15 +2,16 @@
 
 from django.contrib import admin
 from django.urls import path, include, re_path
-from django.conf import settings
-from django.views.static import serve
+
+from store.storage import serve_media
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("store.urls")),  # main app
 ]
 
-# Explicit media URL pattern (works even if DEBUG=False)
+# Explicit media URL pattern (works even if DEBUG=False);
+# content-addressed uploads are served as immutable
 urlpatterns += [
-    re_path(r"^media/(?P<path>.*)$", serve, {"document_root": settings.MEDIA_ROOT}),
+    re_path(r"^media/(?P<path>.*)$", serve_media),
 ]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'techsense.settings')
 
 application = get_wsgi_application()
+
+# build the per-process autocomplete index before the first request
+from store.search_index import warm_index  # noqa: E402
+
+warm_index()